@@ -1,12 +1,22 @@
+import argparse
 import logging
-import sys
+import os
+import time
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
 
+from algokit_utils import ApplicationSpecification
 from dotenv import load_dotenv
 
-from smart_contracts._helpers.build import build
-from smart_contracts._helpers.config import contracts
+from smart_contracts._helpers import build as build_module
+from smart_contracts._helpers.build import OFFLINE_BUILD, build, log_cache_summary
+from smart_contracts._helpers.clients import get_algod_client
+from smart_contracts._helpers.config import SmartContract, load_contracts
 from smart_contracts._helpers.deploy import deploy
+from smart_contracts._helpers.loadtest import WORKLOADS, BenchmarkConfig, run_benchmark
+from smart_contracts._helpers.profiler import BASELINE_FILE_NAME, DEFAULT_SIZES, ProfileConfig, run_profile
 
 # Uncomment the following lines to enable auto generation of AVM Debugger compliant sourcemap and simulation trace file.
 # Learn more about using AlgoKit AVM Debugger to debug your TEAL source codes and inspect various kinds of
@@ -24,49 +34,242 @@ load_dotenv()
 root_path = Path(__file__).parent
 
 
-def main(action: str, contract_name: str | None = None) -> None:
+def _find_app_spec(output_dir: Path) -> Path:
+    app_spec_path = next(
+        (file for file in output_dir.iterdir() if file.is_file() and file.suffixes == [".arc32", ".json"]),
+        None,
+    )
+    if app_spec_path is None:
+        raise Exception("Could not deploy app, .arc32.json file not found")
+    return app_spec_path
+
+
+def _build_contract(
+    output_dir: Path, contract_path: Path, *, offline: bool, use_cache: bool = True
+) -> tuple[Path, float, Counter[str]]:
+    """Chạy trong tiến trình con: build một hợp đồng, trả về app spec, thời gian và thống kê bộ nhớ đệm"""
+    before = Counter(build_module.cache_stats)
+    started = time.perf_counter()
+    app_spec_path = build(output_dir, contract_path, use_cache=use_cache, offline=offline)
+    return app_spec_path, time.perf_counter() - started, build_module.cache_stats - before
+
+
+def build_all(
+    selected: list[SmartContract],
+    artifact_path: Path,
+    jobs: int,
+    timings: dict[str, dict[str, float]],
+    *,
+    offline: bool = False,
+    use_cache: bool = True,
+) -> dict[str, Path]:
+    """Build các hợp đồng song song trong nhóm tiến trình, trả về app spec theo tên hợp đồng"""
+    stats: Counter[str] = Counter()
+    app_specs = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for contract in selected:
+            logger.info(f"Building app at {contract.path}")
+            futures[contract.name] = executor.submit(
+                _build_contract, artifact_path / contract.name, contract.path, offline=offline, use_cache=use_cache
+            )
+        for name, future in futures.items():
+            app_specs[name], timings[name]["build"], worker_stats = future.result()
+            stats.update(worker_stats)
+    log_cache_summary(stats)
+    return app_specs
+
+
+def deploy_order(selected: Iterable[SmartContract]) -> dict[str, set[str]]:
+    """Phụ thuộc còn lại của từng hợp đồng trong phạm vi được chọn; ném lỗi nếu có chu trình"""
+    selected = list(selected)
+    names = {contract.name for contract in selected}
+    pending = {}
+    for contract in selected:
+        for dependency in set(contract.depends_on) - names:
+            # Hợp đồng phụ thuộc nằm ngoài phạm vi được coi là đã được triển khai trước đó
+            logger.warning(f"{contract.name} phụ thuộc {dependency} nằm ngoài phạm vi triển khai, bỏ qua")
+        pending[contract.name] = set(contract.depends_on) & names
+
+    # Loại dần các hợp đồng không còn phụ thuộc để phát hiện chu trình trước khi gửi giao dịch nào
+    remaining = {name: set(dependencies) for name, dependencies in pending.items()}
+    while remaining:
+        ready = {name for name, dependencies in remaining.items() if not dependencies}
+        if not ready:
+            raise Exception(f"Phụ thuộc triển khai tạo thành chu trình: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for dependencies in remaining.values():
+            dependencies -= ready
+    return pending
+
+
+def deploy_all(
+    selected: list[SmartContract],
+    app_specs: dict[str, Path],
+    jobs: int,
+    timings: dict[str, dict[str, float]],
+    *,
+    dry_run: bool = False,
+) -> None:
+    """Triển khai đồng thời các hợp đồng, mỗi hợp đồng chỉ bắt đầu khi các phụ thuộc đã triển khai xong"""
+    by_name = {contract.name: contract for contract in selected}
+    pending = deploy_order(selected)
+
+    def run(contract: SmartContract) -> float:
+        started = time.perf_counter()
+        if contract.deploy:
+            logger.info(f"Deploying app {contract.name}")
+            deploy(app_specs[contract.name], contract.deploy, dry_run=dry_run)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        running: dict[Future[float], str] = {}
+        while pending or running:
+            for name in [name for name, dependencies in pending.items() if not dependencies]:
+                del pending[name]
+                running[executor.submit(run, by_name[name])] = name
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                # Lỗi triển khai dừng toàn bộ, các hợp đồng phụ thuộc không được triển khai
+                timings[name]["deploy"] = future.result()
+                for dependencies in pending.values():
+                    dependencies.discard(name)
+
+
+def log_timings(timings: dict[str, dict[str, float]]) -> None:
+    for name, phases in timings.items():
+        report = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in phases.items())
+        if report:
+            logger.info(f"{name}: {report}")
+
+
+def bench_all(selected: list[SmartContract], artifact_path: Path, config: BenchmarkConfig) -> None:
+    """Đo tải từng hợp đồng trên một ứng dụng mới, dùng app spec đã build"""
+    algod_client = get_algod_client()
+    for contract in selected:
+        app_spec = ApplicationSpecification.from_json(_find_app_spec(artifact_path / contract.name).read_text())
+        run_benchmark(algod_client, app_spec, config)
+
+
+def profile_all(selected: list[SmartContract], artifact_path: Path, config: ProfileConfig) -> None:
+    """Đo chi phí từng phương thức và so với baseline cạnh mã hợp đồng; ném lỗi khi có hồi quy"""
+    algod_client = get_algod_client()
+    regressions = []
+    for contract in selected:
+        app_spec = ApplicationSpecification.from_json(_find_app_spec(artifact_path / contract.name).read_text())
+        baseline_path = contract.path.parent / BASELINE_FILE_NAME
+        found = run_profile(algod_client, app_spec, baseline_path, config)
+        regressions += [f"{contract.name}: {line}" for line in found]
+    for line in regressions:
+        logger.error(line)
+    if regressions:
+        raise Exception(f"{len(regressions)} hồi quy so với baseline, chạy lại với --update-baseline nếu là chủ ý")
+
+
+def main(
+    action: str,
+    contract_name: str | None = None,
+    jobs: int | None = None,
+    *,
+    offline: bool = False,
+    dry_run: bool = False,
+    bench: BenchmarkConfig | None = None,
+    profile: ProfileConfig | None = None,
+    use_cache: bool = True,
+) -> None:
     artifact_path = root_path / "artifacts"
+    jobs = jobs or os.cpu_count() or 1
 
     # Filter contracts if a specific contract name is provided
     filtered_contracts = [
-        c for c in contracts if contract_name is None or c.name == contract_name
+        c for c in load_contracts() if contract_name is None or c.name == contract_name
     ]
+    timings: dict[str, dict[str, float]] = {c.name: {} for c in filtered_contracts}
 
     match action:
         case "build":
-            for contract in filtered_contracts:
-                logger.info(f"Building app at {contract.path}")
-                build(artifact_path / contract.name, contract.path)
+            build_all(filtered_contracts, artifact_path, jobs, timings, offline=offline, use_cache=use_cache)
         case "deploy":
-            for contract in filtered_contracts:
-                output_dir = artifact_path / contract.name
-                app_spec_file_name = next(
-                    (
-                        file.name
-                        for file in output_dir.iterdir()
-                        if file.is_file() and file.suffixes == [".arc32", ".json"]
-                    ),
-                    None,
-                )
-                if app_spec_file_name is None:
-                    raise Exception("Could not deploy app, .arc32.json file not found")
-                app_spec_path = output_dir / app_spec_file_name
-                if contract.deploy:
-                    logger.info(f"Deploying app {contract.name}")
-                    deploy(app_spec_path, contract.deploy)
+            app_specs = {c.name: _find_app_spec(artifact_path / c.name) for c in filtered_contracts}
+            deploy_all(filtered_contracts, app_specs, jobs, timings, dry_run=dry_run)
         case "all":
-            for contract in filtered_contracts:
-                logger.info(f"Building app at {contract.path}")
-                app_spec_path = build(artifact_path / contract.name, contract.path)
-                if contract.deploy:
-                    logger.info(f"Deploying {contract.path.name}")
-                    deploy(app_spec_path, contract.deploy)
+            app_specs = build_all(
+                filtered_contracts, artifact_path, jobs, timings, offline=offline, use_cache=use_cache
+            )
+            deploy_all(filtered_contracts, app_specs, jobs, timings, dry_run=dry_run)
+        case "bench":
+            bench_all(filtered_contracts, artifact_path, bench or BenchmarkConfig())
+        case "profile":
+            profile_all(filtered_contracts, artifact_path, profile or ProfileConfig())
+    log_timings(timings)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build và triển khai các hợp đồng thông minh")
+    parser.add_argument("action", nargs="?", default="all", choices=["build", "deploy", "all", "bench", "profile"])
+    parser.add_argument("contract_name", nargs="?", default=None)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Số tiến trình build/luồng triển khai song song")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        default=OFFLINE_BUILD,
+        help="Build không cần algod, bỏ qua bước biên dịch TEAL",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Bỏ qua bộ nhớ đệm build, luôn biên dịch lại")
+    parser.add_argument("--dry-run", action="store_true", help="Chỉ in kế hoạch triển khai, không gửi giao dịch")
+
+    bench = parser.add_argument_group("bench", "Đo tải trên LocalNet")
+    defaults = BenchmarkConfig()
+    bench.add_argument(
+        "--workload",
+        default=defaults.workload,
+        help=f"{', '.join(WORKLOADS)} hoặc tỉ lệ tùy chỉnh, ví dụ add_document=1,search_documents=3",
+    )
+    bench.add_argument("--rate", type=float, default=defaults.rate, help="Tổng số lời gọi mỗi giây")
+    bench.add_argument("--duration", type=float, default=defaults.duration, help="Thời gian đo (giây)")
+    bench.add_argument("--workers", type=int, default=defaults.workers, help="Số tài khoản gửi lời gọi")
+    bench.add_argument("--seed-documents", type=int, default=defaults.seed_documents, help="Số tài liệu nạp trước")
+    bench.add_argument("--output-dir", type=Path, default=defaults.output_dir, help="Thư mục lưu báo cáo JSON")
+    bench.add_argument("--baseline", type=Path, default=None, help="Báo cáo JSON cũ để so sánh")
+
+    profile = parser.add_argument_group("profile", "Đo opcode và I/O box theo kích thước trạng thái")
+    profile.add_argument(
+        "--sizes",
+        type=lambda value: tuple(int(size) for size in value.split(",")),
+        default=DEFAULT_SIZES,
+        help="Các số tài liệu cần đo, ví dụ 0,10,50,100",
+    )
+    profile.add_argument("--tolerance", type=float, default=ProfileConfig().tolerance, help="Mức tăng cho phép")
+    profile.add_argument("--update-baseline", action="store_true", help="Ghi kết quả làm baseline mới")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
-        main(sys.argv[1], sys.argv[2])
-    elif len(sys.argv) > 1:
-        main(sys.argv[1])
-    else:
-        main("all")
+    args = _parse_args()
+    bench_config = BenchmarkConfig(
+        workload=args.workload,
+        rate=args.rate,
+        duration=args.duration,
+        workers=args.workers,
+        seed_documents=args.seed_documents,
+        output_dir=args.output_dir,
+        baseline=args.baseline,
+    )
+    profile_config = ProfileConfig(
+        sizes=args.sizes,
+        tolerance=args.tolerance,
+        update_baseline=args.update_baseline,
+        output_dir=args.output_dir,
+    )
+    main(
+        args.action,
+        args.contract_name,
+        args.jobs,
+        offline=args.offline,
+        dry_run=args.dry_run,
+        bench=bench_config,
+        profile=profile_config,
+        use_cache=not args.no_cache,
+    )
@@ -0,0 +1,402 @@
+"""Client bất đồng bộ cho hợp đồng: gửi nhiều giao dịch song song, xác nhận theo từng vòng.
+
+- Hàng đợi gửi: submit() chỉ đưa nhóm giao dịch vào hàng đợi, các tác vụ gửi chuyển chúng tới
+  algod song song; số nhóm chưa được xác nhận bị giới hạn bởi max_in_flight.
+- Một bộ thăm dò duy nhất chờ từng khối mới, lấy danh sách txid của khối và giải quyết mọi
+  giao dịch đang chờ nằm trong đó bằng một yêu cầu, thay vì mỗi giao dịch tự gọi
+  wait_for_confirmation.
+- Suggested params được lưu lại và chỉ làm mới khi có vòng mới.
+"""
+
+import asyncio
+import base64
+import dataclasses
+import itertools
+import logging
+from collections.abc import Sequence
+from typing import Any
+from urllib import parse
+
+import httpx
+from algokit_utils import Account, AlgoClientConfig
+from algosdk import abi, encoding, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts._helpers.batcher import PAD_BUDGET_METHOD
+from smart_contracts._helpers.boxes import (
+    ABI_RETURN_PREFIX,
+    MAX_BOX_REFS_PER_TXN,
+    MAX_READ_LENGTH,
+    access_check_boxes,
+    resource_read_boxes,
+    resource_size_box,
+    user_groups_box,
+)
+from smart_contracts._helpers.clients import _config_from_environment, _error_message, _retry_delay
+from smart_contracts._helpers.config import CLIENT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CREATE_RESOURCE_METHOD = abi.Method.from_signature("create_resource(string)uint64")
+ACCESS_RESOURCE_WITH_SESSION_METHOD = abi.Method.from_signature(
+    "access_resource_with_session(string,string,uint64,uint64)string"
+)
+ACCESS_RESOURCE_WITH_TOKENS_METHOD = abi.Method.from_signature("access_resource(string,uint64)string")
+
+USER_GROUPS_TYPE = abi.ABIType.from_string("string[]")
+# Số vòng một giao dịch còn hiệu lực (giống suggested_params của algosdk)
+VALIDITY_ROUNDS = 1000
+DEFAULT_MAX_IN_FLIGHT = 256
+DEFAULT_SENDERS = 8
+# algod giữ yêu cầu wait-for-block-after tối đa khoảng một phút
+_WAIT_FOR_BLOCK_TIMEOUT = 90.0
+# Số lần thăm dò thất bại liên tiếp trước khi bỏ theo dõi các giao dịch đang chờ
+MAX_POLL_FAILURES = 10
+# algod trả lỗi này khi một lần gửi lại trùng giao dịch đã được nhận trước đó
+_ALREADY_ACCEPTED_MARKERS = ("already in ledger", "already in pool")
+
+
+class TransactionRejectedError(Exception):
+    """Giao dịch bị algod từ chối hoặc hết hạn trước khi được xác nhận"""
+
+
+class TransactionOutcomeUnknownError(Exception):
+    """Không biết giao dịch đã được xác nhận hay chưa (mất kết nối tới algod)
+
+    Khác với TransactionRejectedError: giao dịch có thể đã được ghi vào sổ cái, không được gửi lại
+    các lời gọi không lũy đẳng như access_resource hay transfer_tokens.
+    """
+
+
+@dataclasses.dataclass
+class _Pending:
+    future: asyncio.Future[dict[str, Any]]
+    last_valid: int
+
+
+@dataclasses.dataclass
+class _Submission:
+    payload: bytes
+    txids: list[str]
+
+
+class AsyncAlgodClient:
+    """Kết nối algod bất đồng bộ với hàng đợi gửi và bộ thăm dò xác nhận dùng chung
+
+    Dùng trong `async with`: các tác vụ nền được khởi động khi vào và dừng khi ra.
+    """
+
+    def __init__(
+        self,
+        config: AlgoClientConfig | None = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        senders: int = DEFAULT_SENDERS,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        config = config or _config_from_environment("ALGOD", "algod")
+        self.address = config.server
+        self._headers = {"X-Algo-API-Token": config.token}
+        self._http = httpx.AsyncClient(
+            timeout=CLIENT_CONFIG["timeout"],
+            limits=httpx.Limits(
+                max_connections=CLIENT_CONFIG["max_connections"],
+                max_keepalive_connections=CLIENT_CONFIG["max_keepalive_connections"],
+            ),
+            transport=transport,
+        )
+        self._senders = senders
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._queue: asyncio.Queue[_Submission] = asyncio.Queue()
+        self._pending: dict[str, _Pending] = {}
+        self._tasks: list[asyncio.Task[None]] = []
+        self._round: int | None = None
+        self._params: transaction.SuggestedParams | None = None
+        self._params_round: int | None = None
+        self._params_lock = asyncio.Lock()
+        self._block_txids_supported = True
+
+    async def __aenter__(self) -> "AsyncAlgodClient":
+        self._round = (await self._request("GET", "/v2/status"))["last-round"]
+        self._tasks = [asyncio.create_task(self._poll())]
+        self._tasks += [asyncio.create_task(self._send_loop()) for _ in range(self._senders)]
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for pending in self._pending.values():
+            pending.future.cancel()
+        self._pending.clear()
+        await self._http.aclose()
+
+    @property
+    def last_round(self) -> int | None:
+        return self._round
+
+    async def _request(
+        self, method: str, path: str, content: bytes | None = None, timeout: float | None = None
+    ) -> dict[str, Any]:
+        """Gửi yêu cầu tới algod, thử lại với thời gian chờ tăng dần khi bị giới hạn hoặc lỗi máy chủ"""
+        headers = dict(self._headers)
+        if content is not None:
+            headers["Content-Type"] = "application/x-binary"
+        max_retries = CLIENT_CONFIG["max_retries"]
+        for attempt in itertools.count():
+            response = None
+            try:
+                response = await self._http.request(
+                    method,
+                    self.address + path,
+                    headers=headers,
+                    content=content,
+                    timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+                )
+            except httpx.TransportError:
+                if attempt >= max_retries:
+                    raise
+            else:
+                if response.status_code not in CLIENT_CONFIG["retry_status_codes"] or attempt >= max_retries:
+                    break
+            await asyncio.sleep(_retry_delay(attempt, response))
+        if response.is_error:
+            message, _ = _error_message(response)
+            raise httpx.HTTPStatusError(message, request=response.request, response=response)
+        return response.json() if response.content else {}
+
+    async def suggested_params(self) -> transaction.SuggestedParams:
+        """Suggested params của vòng hiện tại, chỉ gọi algod một lần cho mỗi vòng"""
+        async with self._params_lock:
+            if self._params is None or self._params_round != self._round:
+                params = await self._request("GET", "/v2/transactions/params")
+                self._params = transaction.SuggestedParams(
+                    params["fee"],
+                    params["last-round"],
+                    params["last-round"] + VALIDITY_ROUNDS,
+                    params["genesis-hash"],
+                    params["genesis-id"],
+                    flat_fee=False,
+                    consensus_version=params["consensus-version"],
+                    min_fee=params["min-fee"],
+                )
+                self._params_round = self._round
+            return self._params
+
+    async def submit(
+        self, signed_txns: Sequence[transaction.SignedTransaction]
+    ) -> list[asyncio.Future[dict[str, Any]]]:
+        """Đưa một nhóm giao dịch đã ký vào hàng đợi gửi
+
+        Trả về một future cho mỗi giao dịch, nhận thông tin giao dịch đã xác nhận (logs, ...).
+        Chờ khi số nhóm chưa được xác nhận đã đạt max_in_flight.
+        """
+        await self._in_flight.acquire()
+        loop = asyncio.get_running_loop()
+        futures = []
+        txids = []
+        for stxn in signed_txns:
+            txid = stxn.get_txid()
+            future: asyncio.Future[dict[str, Any]] = loop.create_future()
+            self._pending[txid] = _Pending(future, stxn.transaction.last_valid_round)
+            futures.append(future)
+            txids.append(txid)
+        # Giải phóng chỗ khi cả nhóm đã có kết quả
+        asyncio.gather(*futures, return_exceptions=True).add_done_callback(lambda _: self._in_flight.release())
+
+        payload = b"".join(base64.b64decode(encoding.msgpack_encode(stxn)) for stxn in signed_txns)
+        await self._queue.put(_Submission(payload, txids))
+        return futures
+
+    async def send_and_confirm(self, signed_txns: Sequence[transaction.SignedTransaction]) -> list[dict[str, Any]]:
+        return list(await asyncio.gather(*await self.submit(signed_txns)))
+
+    def _reject(self, txids: Sequence[str], reason: str) -> None:
+        for txid in txids:
+            pending = self._pending.pop(txid, None)
+            if pending is not None and not pending.future.done():
+                pending.future.set_exception(TransactionRejectedError(f"{txid}: {reason}"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        pending, self._pending = self._pending, {}
+        for txid, entry in pending.items():
+            if not entry.future.done():
+                entry.future.set_exception(
+                    TransactionOutcomeUnknownError(f"{txid}: không xác định được kết quả ({error})")
+                )
+
+    async def _send_loop(self) -> None:
+        while True:
+            submission = await self._queue.get()
+            try:
+                await self._request("POST", "/v2/transactions", content=submission.payload)
+            except httpx.HTTPStatusError as e:
+                # Lần gửi trước có thể đã tới algod dù bị hết thời gian chờ: trùng giao dịch nghĩa là đã được nhận
+                if not any(marker in str(e) for marker in _ALREADY_ACCEPTED_MARKERS):
+                    self._reject(submission.txids, str(e))
+            except (httpx.TransportError, ValueError) as e:
+                # Không biết algod đã nhận nhóm hay chưa: tiếp tục chờ, bộ thăm dò sẽ thấy giao dịch
+                # được xác nhận hoặc hết hạn sau last_valid
+                logger.warning(f"Không xác định được kết quả gửi {submission.txids[0]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _poll(self) -> None:
+        """Bộ thăm dò duy nhất: chờ từng khối và giải quyết mọi giao dịch đang chờ trong đó
+
+        Khi thăm dò lỗi, các giao dịch đang chờ được giữ lại và hỏi lại từng giao dịch khi algod
+        phản hồi bình thường trở lại. Chỉ sau MAX_POLL_FAILURES lần lỗi liên tiếp chúng mới bị bỏ
+        với TransactionOutcomeUnknownError, vì có thể đã được xác nhận.
+        """
+        failures = 0
+        while True:
+            try:
+                status = await self._request(
+                    "GET", f"/v2/status/wait-for-block-after/{self._round}", timeout=_WAIT_FOR_BLOCK_TIMEOUT
+                )
+                latest = status["last-round"]
+                if failures:
+                    await self._recheck_pending()
+                for round_ in range(self._round + 1, latest + 1):
+                    await self._resolve_round(round_)
+                    self._round = round_
+                failures = 0
+                continue
+            except httpx.HTTPError as e:
+                logger.warning(f"Lỗi khi thăm dò khối sau vòng {self._round}: {e}")
+                error: Exception = e
+            except Exception as e:
+                logger.exception(f"Bộ thăm dò gặp lỗi sau vòng {self._round}")
+                error = e
+            failures += 1
+            if failures >= MAX_POLL_FAILURES:
+                self._fail_pending(error)
+                failures = 0
+            await asyncio.sleep(_retry_delay(0, None))
+
+    async def get_box(self, app_id: int, name: bytes) -> bytes | None:
+        """Nội dung box của ứng dụng, None nếu box không tồn tại"""
+        encoded_name = base64.b64encode(name).decode()
+        try:
+            response = await self._request(
+                "GET", f"/v2/applications/{app_id}/box?name={parse.quote(f'b64:{encoded_name}')}"
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+        return base64.b64decode(response["value"])
+
+    async def _pending_info(self, txid: str) -> dict[str, Any]:
+        return await self._request("GET", f"/v2/transactions/pending/{txid}")
+
+    async def _recheck_pending(self) -> None:
+        """Hỏi lại từng giao dịch đang chờ, các khối bị bỏ lỡ khi thăm dò lỗi có thể đã xác nhận chúng"""
+        await self._apply_pending_info(list(self._pending))
+
+    async def _apply_pending_info(self, txids: list[str]) -> None:
+        infos = await asyncio.gather(*(self._pending_info(txid) for txid in txids), return_exceptions=True)
+        for txid, info in zip(txids, infos, strict=True):
+            if isinstance(info, BaseException) or txid not in self._pending:
+                continue
+            if info.get("pool-error"):
+                self._reject([txid], info["pool-error"])
+            elif info.get("confirmed-round"):
+                pending = self._pending.pop(txid)
+                if not pending.future.done():
+                    pending.future.set_result(info)
+
+    async def _resolve_round(self, round_: int) -> None:
+        if not self._pending:
+            return
+        confirmed = list(self._pending)
+        if self._block_txids_supported:
+            try:
+                block_txids = (await self._request("GET", f"/v2/blocks/{round_}/txids"))["blockTxids"]
+                confirmed = [txid for txid in block_txids if txid in self._pending]
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 404:
+                    raise
+                # algod cũ không có endpoint txids của khối: hỏi từng giao dịch đang chờ
+                self._block_txids_supported = False
+
+        await self._apply_pending_info(confirmed)
+
+        expired = [txid for txid, pending in self._pending.items() if pending.last_valid < round_]
+        self._reject(expired, f"hết hạn sau vòng {round_}")
+
+
+def abi_return(method: abi.Method, info: dict[str, Any]) -> Any:
+    """Giải mã giá trị trả về của phương thức ABI từ log cuối của giao dịch đã xác nhận"""
+    if method.returns.type == abi.Returns.VOID:
+        return None
+    log = base64.b64decode(info.get("logs", [""])[-1])
+    if not log.startswith(ABI_RETURN_PREFIX):
+        raise ValueError(f"Giao dịch không trả về giá trị cho {method.name}")
+    return method.returns.type.decode(log[len(ABI_RETURN_PREFIX) :])
+
+
+class AsyncContractClient:
+    """Gọi các phương thức ABI của hợp đồng qua AsyncAlgodClient"""
+
+    def __init__(self, algod: AsyncAlgodClient, app_id: int, sender: Account) -> None:
+        self.algod = algod
+        self.app_id = app_id
+        self.sender = sender
+        self.signer = AccountTransactionSigner(sender.private_key)
+        # Lời gọi giống hệt nhau trong cùng vòng sẽ trùng txid, nên mỗi lời gọi mang một note riêng
+        self._nonce = itertools.count()
+
+    def _app_call(
+        self, sp: transaction.SuggestedParams, method: abi.Method, app_args: list[bytes], boxes: Sequence[bytes]
+    ) -> transaction.ApplicationCallTxn:
+        return transaction.ApplicationCallTxn(
+            self.sender.address,
+            sp,
+            self.app_id,
+            transaction.OnComplete.NoOpOC,
+            app_args=app_args,
+            boxes=[(0, name) for name in boxes],
+            note=next(self._nonce).to_bytes(8, "big"),
+        )
+
+    async def call(self, method: abi.Method, args: Sequence[Any], boxes: Sequence[bytes] = ()) -> Any:
+        """Gọi phương thức; box vượt quá MAX_BOX_REFS_PER_TXN được khai báo trên các lời gọi pad_budget cùng nhóm"""
+        sp = await self.algod.suggested_params()
+        app_args = [method.get_selector()] + [
+            arg.type.encode(value) for arg, value in zip(method.args, args, strict=True)  # type: ignore[union-attr]
+        ]
+        box_chunks = [boxes[i : i + MAX_BOX_REFS_PER_TXN] for i in range(0, len(boxes), MAX_BOX_REFS_PER_TXN)] or [()]
+        txns = [self._app_call(sp, method, app_args, box_chunks[0])]
+        txns += [self._app_call(sp, PAD_BUDGET_METHOD, [PAD_BUDGET_METHOD.get_selector()], c) for c in box_chunks[1:]]
+        if len(txns) > 1:
+            transaction.assign_group_id(txns)
+        infos = await self.algod.send_and_confirm(self.signer.sign_transactions(txns, list(range(len(txns)))))
+        return abi_return(method, infos[0])
+
+    async def user_groups(self, user_address: str) -> list[str]:
+        """Các nhóm của người dùng, đọc từ box thành viên"""
+        raw = await self.algod.get_box(self.app_id, user_groups_box(user_address))
+        return [] if raw is None else list(USER_GROUPS_TYPE.decode(raw))
+
+    async def create_resource(self, name: str) -> int:
+        return await self.call(CREATE_RESOURCE_METHOD, [name])  # type: ignore[no-any-return]
+
+    async def access_resource_with_session(
+        self, resource_id: str, user_token: str, offset: int = 0, length: int = MAX_READ_LENGTH
+    ) -> str:
+        """offset và length tính bằng byte UTF-8; đoạn tiếp theo bắt đầu sau số byte của chuỗi trả về"""
+        boxes = resource_read_boxes(resource_id, offset, length)
+        return await self.call(  # type: ignore[no-any-return]
+            ACCESS_RESOURCE_WITH_SESSION_METHOD, [resource_id, user_token, offset, length], boxes
+        )
+
+    async def access_resource_with_tokens(
+        self, resource_id: str, token_amount: int, group_ids: Sequence[str] | None = None
+    ) -> str:
+        """Kiểm tra quyền có thể cần tới quyền của các nhóm: group_ids mặc định đọc từ box thành viên"""
+        if group_ids is None:
+            group_ids = await self.user_groups(self.sender.address)
+        boxes = [resource_size_box(resource_id), *access_check_boxes(resource_id, self.sender.address, group_ids)]
+        return await self.call(  # type: ignore[no-any-return]
+            ACCESS_RESOURCE_WITH_TOKENS_METHOD, [resource_id, token_amount], boxes
+        )
@@ -0,0 +1,288 @@
+"""Gom các lời gọi ABI thành nhóm nguyên tử tối đa 16 giao dịch.
+
+Trong một nhóm, reference (account, app, asset, box) và ngân sách opcode được dùng chung, nên
+các reference của mọi lời gọi được gộp lại rồi chia đều cho các giao dịch. Khi reference hoặc
+ngân sách vượt quá sức chứa của các lời gọi, nhóm được bổ sung lời gọi pad_budget. Nhóm được
+gửi khi đầy (max_group_size) hoặc khi lời gọi cũ nhất đã chờ quá max_delay giây.
+"""
+
+import dataclasses
+import itertools
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from algokit_utils import Account
+from algosdk import abi
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, AtomicTransactionComposer
+from algosdk.transaction import SuggestedParams
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers.boxes import (
+    APP_CALL_OPCODE_BUDGET,
+    MAX_ACCOUNT_REFS_PER_TXN,
+    MAX_BOX_REFS_PER_TXN,
+    MAX_GROUP_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+PAD_BUDGET_METHOD = abi.Method.from_signature("pad_budget()void")
+
+DEFAULT_MAX_DELAY = 0.05  # giây
+DEFAULT_MAX_IN_FLIGHT = 4
+_WAIT_ROUNDS = 4
+# Làm mới suggested params sau số nhóm này
+_PARAMS_REFRESH_GROUPS = 50
+
+
+@dataclasses.dataclass
+class PendingCall:
+    method: abi.Method
+    args: list[Any]
+    boxes: Counter[bytes]
+    accounts: set[str]
+    foreign_apps: set[int]
+    foreign_assets: set[int]
+    budget: int
+    future: Future[Any]
+    queued_at: float
+
+
+@dataclasses.dataclass
+class _References:
+    """Reference dùng chung của cả nhóm; box giữ số lần lặp lớn nhất để đủ hạn mức đọc/ghi"""
+
+    boxes: Counter[bytes] = dataclasses.field(default_factory=Counter)
+    accounts: set[str] = dataclasses.field(default_factory=set)
+    foreign_apps: set[int] = dataclasses.field(default_factory=set)
+    foreign_assets: set[int] = dataclasses.field(default_factory=set)
+    budget: int = 0
+
+    def add(self, call: PendingCall) -> "_References":
+        return _References(
+            self.boxes | call.boxes,
+            self.accounts | call.accounts,
+            self.foreign_apps | call.foreign_apps,
+            self.foreign_assets | call.foreign_assets,
+            self.budget + call.budget,
+        )
+
+    def txn_count(self, call_count: int) -> int:
+        """Số giao dịch cần để chứa call_count lời gọi cùng toàn bộ reference và ngân sách opcode"""
+        ref_count = sum(self.boxes.values()) + len(self.accounts) + len(self.foreign_apps) + len(self.foreign_assets)
+        return max(
+            call_count,
+            -(-ref_count // MAX_BOX_REFS_PER_TXN),
+            -(-len(self.accounts) // MAX_ACCOUNT_REFS_PER_TXN),
+            -(-self.budget // APP_CALL_OPCODE_BUDGET),
+        )
+
+
+@dataclasses.dataclass
+class _TxnRefs:
+    boxes: list[bytes] = dataclasses.field(default_factory=list)
+    accounts: list[str] = dataclasses.field(default_factory=list)
+    foreign_apps: list[int] = dataclasses.field(default_factory=list)
+    foreign_assets: list[int] = dataclasses.field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.boxes) + len(self.accounts) + len(self.foreign_apps) + len(self.foreign_assets)
+
+
+def distribute_references(refs: _References, txn_count: int) -> list[_TxnRefs]:
+    """Chia reference của nhóm cho txn_count giao dịch, mỗi giao dịch tối đa 8 reference và 4 account"""
+    slots = [_TxnRefs() for _ in range(txn_count)]
+
+    def place(items: Iterable[Any], field: str, limit: int) -> None:
+        for item in items:
+            slot = next(s for s in slots if s.size < MAX_BOX_REFS_PER_TXN and len(getattr(s, field)) < limit)
+            getattr(slot, field).append(item)
+
+    # Account được đặt trước vì có giới hạn riêng
+    place(sorted(refs.accounts), "accounts", MAX_ACCOUNT_REFS_PER_TXN)
+    place(sorted(refs.foreign_apps), "foreign_apps", MAX_BOX_REFS_PER_TXN)
+    place(sorted(refs.foreign_assets), "foreign_assets", MAX_BOX_REFS_PER_TXN)
+    place(sorted(refs.boxes.elements()), "boxes", MAX_BOX_REFS_PER_TXN)
+    return slots
+
+
+class CallBatcher:
+    """Gom các lời gọi ABI tới một ứng dụng thành nhóm nguyên tử và gửi ở luồng nền
+
+    submit() trả về Future nhận giá trị trả về của phương thức. Các lời gọi trong cùng nhóm
+    thành công hoặc thất bại cùng nhau.
+    """
+
+    def __init__(
+        self,
+        algod_client: AlgodClient,
+        app_id: int,
+        sender: Account,
+        max_group_size: int = MAX_GROUP_SIZE,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> None:
+        if not 1 <= max_group_size <= MAX_GROUP_SIZE:
+            raise ValueError(f"max_group_size phải nằm trong khoảng 1..{MAX_GROUP_SIZE}")
+        self.algod_client = algod_client
+        self.app_id = app_id
+        self.sender = sender
+        self.signer = AccountTransactionSigner(sender.private_key)
+        self.max_group_size = max_group_size
+        self.max_delay = max_delay
+        self._pending: list[PendingCall] = []
+        # Các lời gọi chưa có kết quả, kể cả nhóm đang được gửi
+        self._outstanding: set[Future[Any]] = set()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._flush_requested = False
+        self._sp: SuggestedParams | None = None
+        self._sp_lock = threading.Lock()
+        self._groups_sent = 0
+        # Lời gọi giống hệt nhau trong cùng nhóm sẽ trùng txid, nên mỗi giao dịch mang một note riêng
+        self._nonce = itertools.count()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def __enter__(self) -> "CallBatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def submit(
+        self,
+        method: abi.Method,
+        args: Sequence[Any] = (),
+        boxes: Iterable[bytes] = (),
+        accounts: Iterable[str] = (),
+        foreign_apps: Iterable[int] = (),
+        foreign_assets: Iterable[int] = (),
+        budget: int = APP_CALL_OPCODE_BUDGET,
+    ) -> Future[Any]:
+        """Đưa một lời gọi vào hàng chờ; budget là ngân sách opcode ước tính của lời gọi
+
+        Box lặp lại nhiều lần trong boxes được giữ nguyên để có đủ hạn mức đọc/ghi cho box lớn.
+        """
+        call = PendingCall(
+            method,
+            list(args),
+            Counter(boxes),
+            set(accounts),
+            set(foreign_apps),
+            set(foreign_assets),
+            budget,
+            Future(),
+            time.monotonic(),
+        )
+        if _References().add(call).txn_count(1) > self.max_group_size:
+            raise ValueError(f"Lời gọi {method.name} cần nhiều hơn {self.max_group_size} giao dịch")
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("CallBatcher đã đóng")
+            self._pending.append(call)
+            self._outstanding.add(call.future)
+            self._condition.notify()
+        call.future.add_done_callback(self._outstanding.discard)
+        return call.future
+
+    def flush(self) -> None:
+        """Gửi ngay mọi lời gọi đang chờ và đợi đến khi tất cả có kết quả"""
+        with self._condition:
+            futures = list(self._outstanding)
+            self._flush_requested = True
+            self._condition.notify()
+        for future in futures:
+            future.exception()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._flusher.join()
+        self._executor.shutdown(wait=True)
+
+    def _take_group(self) -> tuple[list[PendingCall], _References]:
+        """Lấy các lời gọi đầu hàng chờ nhiều nhất có thể mà nhóm vẫn không vượt max_group_size"""
+        refs = _References()
+        taken = 0
+        for call in self._pending:
+            candidate = refs.add(call)
+            if candidate.txn_count(taken + 1) > self.max_group_size:
+                break
+            refs = candidate
+            taken += 1
+        group, self._pending = self._pending[:taken], self._pending[taken:]
+        return group, refs
+
+    def _group_is_full(self) -> bool:
+        refs = _References()
+        for count, call in enumerate(self._pending, 1):
+            refs = refs.add(call)
+            if refs.txn_count(count) >= self.max_group_size:
+                return True
+        return False
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if self._pending and (self._closed or self._flush_requested or self._group_is_full()):
+                        break
+                    if not self._pending:
+                        self._flush_requested = False
+                        if self._closed:
+                            return
+                        self._condition.wait()
+                        continue
+                    remaining = self._pending[0].queued_at + self.max_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                group, refs = self._take_group()
+            self._executor.submit(self._send_group, group, refs)
+
+    def _suggested_params(self) -> SuggestedParams:
+        with self._sp_lock:
+            if self._sp is None or self._groups_sent % _PARAMS_REFRESH_GROUPS == 0:
+                self._sp = self.algod_client.suggested_params()
+            self._groups_sent += 1
+            return self._sp
+
+    def _send_group(self, group: list[PendingCall], refs: _References) -> None:
+        txn_count = refs.txn_count(len(group))
+        slots = distribute_references(refs, txn_count)
+        try:
+            sp = self._suggested_params()
+            atc = AtomicTransactionComposer()
+            calls = [(call.method, call.args) for call in group]
+            calls += [(PAD_BUDGET_METHOD, [])] * (txn_count - len(group))
+            for (method, args), slot in zip(calls, slots, strict=True):
+                atc.add_method_call(
+                    app_id=self.app_id,
+                    method=method,
+                    sender=self.sender.address,
+                    sp=sp,
+                    signer=self.signer,
+                    method_args=args,
+                    accounts=slot.accounts,
+                    foreign_apps=slot.foreign_apps,
+                    foreign_assets=slot.foreign_assets,
+                    boxes=[(0, name) for name in slot.boxes],
+                    note=next(self._nonce).to_bytes(8, "big"),
+                )
+            results = atc.execute(self.algod_client, _WAIT_ROUNDS).abi_results
+        except Exception as e:
+            for call in group:
+                call.future.set_exception(e)
+            return
+        logger.debug(f"Đã gửi nhóm {len(group)} lời gọi, {txn_count - len(group)} lời gọi đệm")
+        for call, result in zip(group, results, strict=False):
+            call.future.set_result(result.return_value)
@@ -0,0 +1,138 @@
+"""Bố cục box và các hằng số của hợp đồng, dùng phía client.
+
+Các hằng số ở đây phải khớp với smart_contracts/contract/contract.py.
+"""
+
+import base64
+from collections.abc import Iterable
+
+from algosdk import abi
+
+# Kích thước mỗi khối dữ liệu tài nguyên lưu trong box; kích thước, offset và độ dài tài nguyên
+# đều tính bằng byte UTF-8, không phải số ký tự
+RESOURCE_CHUNK_SIZE = 1024
+# Số byte tối đa hợp đồng trả về trong một lần đọc
+MAX_READ_LENGTH = 1000
+# Số box reference tối đa của một giao dịch (giới hạn chung của foreign references)
+MAX_BOX_REFS_PER_TXN = 8
+# Trong các reference của một giao dịch, tối đa 4 account
+MAX_ACCOUNT_REFS_PER_TXN = 4
+# Số giao dịch tối đa trong một nhóm nguyên tử
+MAX_GROUP_SIZE = 16
+# Ngân sách opcode của mỗi lời gọi ứng dụng, được cộng dồn trong nhóm
+APP_CALL_OPCODE_BUDGET = 700
+# Tổng kích thước tối đa của app args trong một giao dịch
+MAX_APP_ARGS_SIZE = 2048
+
+# Tiền tố của log chứa giá trị trả về ABI (ARC-4)
+ABI_RETURN_PREFIX = bytes.fromhex("151f7c75")
+
+RESOURCE_SIZE_PREFIX = b"r"
+RESOURCE_CHUNK_PREFIX = b"c"
+ACCESS_RIGHTS_PREFIX = b"a"
+GROUP_RIGHTS_PREFIX = b"g"
+USER_GROUPS_PREFIX = b"m"
+DATA_ANCHOR_PREFIX = b"h"
+MERKLE_ROOT_PREFIX = b"t"
+
+# Số nhóm tối đa của một người dùng, mỗi nhóm là một box quyền cần tra khi kiểm tra quyền
+MAX_GROUPS_PER_USER = 8
+
+# Các bit quyền truy cập
+RIGHT_READ = 1
+RIGHT_WRITE = 2
+RIGHT_DELETE = 4
+RIGHT_ADMIN = 8
+ACCESS_RIGHT_BITS = {
+    "read": RIGHT_READ,
+    "write": RIGHT_WRITE,
+    "delete": RIGHT_DELETE,
+    "admin": RIGHT_ADMIN,
+}
+
+# Các trường của một tài liệu theo thứ tự của struct DocumentInput
+DOCUMENT_FIELDS = ("doc_id", "title", "author", "year", "field", "content")
+DOCUMENT_TUPLE_TYPE = abi.ABIType.from_string("(string,string,string,uint64,string,string)")
+ADD_DOCUMENT_METHOD = abi.Method.from_signature("add_document(string,string,string,uint64,string,string)string")
+ADD_DOCUMENTS_METHOD = abi.Method.from_signature("add_documents((string,string,string,uint64,string,string)[])string")
+
+
+def parse_rights(rights: str) -> int:
+    """Chuyển chuỗi quyền dạng "read,write" thành bitmask (giống set_access_rights)"""
+    mask = 0
+    for action in rights.replace(",", " ").split():
+        mask |= ACCESS_RIGHT_BITS.get(action, 0)
+    return mask
+
+
+def return_message(txn: dict) -> str | None:
+    """Lấy chuỗi trả về ABI từ log của giao dịch (dạng JSON của algod hoặc Indexer)"""
+    for log in reversed(txn.get("logs", [])):
+        raw = base64.b64decode(log)
+        if raw.startswith(ABI_RETURN_PREFIX):
+            return abi.StringType().decode(raw[len(ABI_RETURN_PREFIX) :])
+    return None
+
+
+def resource_size_box(resource_id: str) -> bytes:
+    """Tên box lưu kích thước của tài nguyên"""
+    return RESOURCE_SIZE_PREFIX + resource_id.encode("utf-8")
+
+
+def resource_chunk_box(resource_id: str, index: int) -> bytes:
+    """Tên box lưu khối dữ liệu thứ index của tài nguyên"""
+    return RESOURCE_CHUNK_PREFIX + f"{resource_id}/{index}".encode()
+
+
+def utf8_size(text: str) -> int:
+    """Kích thước dữ liệu tài nguyên như hợp đồng lưu (byte UTF-8)"""
+    return len(text.encode("utf-8"))
+
+
+def resource_box_names(resource_id: str, size: int) -> list[bytes]:
+    """Toàn bộ tên box mà việc ghi một tài nguyên có size byte UTF-8 sẽ chạm tới"""
+    chunk_count = (size + RESOURCE_CHUNK_SIZE - 1) // RESOURCE_CHUNK_SIZE
+    return [resource_size_box(resource_id)] + [resource_chunk_box(resource_id, i) for i in range(chunk_count)]
+
+
+def resource_read_boxes(resource_id: str, offset: int, length: int) -> list[bytes]:
+    """Các box mà việc đọc đoạn byte [offset, offset + length) của tài nguyên có thể chạm tới"""
+    names = [resource_size_box(resource_id)]
+    if length > 0:
+        first, last = offset // RESOURCE_CHUNK_SIZE, (offset + length - 1) // RESOURCE_CHUNK_SIZE
+        names += [resource_chunk_box(resource_id, i) for i in range(first, last + 1)]
+    return names
+
+
+def access_rights_box(resource_id: str, user_address: str) -> bytes:
+    """Tên box lưu bitmask quyền của người dùng đối với tài nguyên"""
+    return ACCESS_RIGHTS_PREFIX + f"{resource_id}:{user_address}".encode()
+
+
+def group_rights_box(resource_id: str, group_id: str) -> bytes:
+    """Tên box lưu bitmask quyền của nhóm đối với tài nguyên"""
+    return GROUP_RIGHTS_PREFIX + f"{resource_id}:{group_id}".encode()
+
+
+def user_groups_box(user_address: str) -> bytes:
+    """Tên box lưu danh sách nhóm (string[]) của người dùng"""
+    return USER_GROUPS_PREFIX + user_address.encode()
+
+
+def access_check_boxes(resource_id: str, user_address: str, group_ids: Iterable[str] = ()) -> list[bytes]:
+    """Các box mà việc kiểm tra quyền của người dùng trên tài nguyên có thể chạm tới (giống _has_right)"""
+    return [
+        access_rights_box(resource_id, user_address),
+        user_groups_box(user_address),
+        *(group_rights_box(resource_id, group_id) for group_id in group_ids),
+    ]
+
+
+def data_anchor_box(digest: bytes) -> bytes:
+    """Tên box lưu thông tin neo của digest SHA-256"""
+    return DATA_ANCHOR_PREFIX + digest
+
+
+def merkle_root_box(root: bytes) -> bytes:
+    """Tên box lưu thông tin của một gốc Merkle đã neo"""
+    return MERKLE_ROOT_PREFIX + root
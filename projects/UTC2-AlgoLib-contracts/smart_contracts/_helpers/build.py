@@ -1,14 +1,35 @@
+import base64
+import hashlib
+import importlib.metadata
+import json
 import logging
+import os
 import subprocess
+from collections import Counter
+from functools import cache
 from pathlib import Path
-from shutil import rmtree
-from algosdk.v2client.algod import AlgodClient
-from pyteal import compileTeal, Mode
+from shutil import copytree, rmtree
+from typing import Any
+
 from algosdk.abi import Contract
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers.clients import get_algod_client
 
 logger = logging.getLogger(__name__)
 deployment_extension = "py"
 
+# Cờ biên dịch được đưa vào khóa bộ nhớ đệm build
+COMPILE_FLAGS = ["--output-arc32", "--debug-level=0"]
+# Thư mục bộ nhớ đệm build, khóa theo hash của mã nguồn hợp đồng, phiên bản trình biên dịch và cờ
+BUILD_CACHE_DIR = Path(os.environ.get("ALGOKIT_BUILD_CACHE_DIR", Path(__file__).parent.parent / ".build_cache"))
+# Kết quả biên dịch TEAL của algod, khóa theo hash của mã TEAL
+TEAL_CACHE_DIR = BUILD_CACHE_DIR / "teal"
+# Chế độ ngoại tuyến: không gọi algod, chỉ kiểm tra đầu ra của puyapy
+OFFLINE_BUILD = os.environ.get("ALGOKIT_OFFLINE_BUILD", "").lower() in ("1", "true", "yes")
+# Thống kê trúng/trượt bộ nhớ đệm trong tiến trình hiện tại
+cache_stats: Counter[str] = Counter()
+
 def _get_output_path(output_dir: Path, deployment_extension: str) -> Path:
     return output_dir / Path(
         "{contract_name}"
@@ -16,8 +37,109 @@ def _get_output_path(output_dir: Path, deployment_extension: str) -> Path:
         + f".{deployment_extension}"
     )
 
-def build(output_dir: Path, contract_path: Path) -> Path:
+@cache
+def _compiler_version() -> str:
+    """Phiên bản AlgoKit CLI và puyapy, thay đổi phiên bản sẽ làm mất hiệu lực bộ nhớ đệm"""
+    algokit_version = subprocess.run(
+        ["algokit", "--version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    ).stdout.strip()
+    try:
+        puyapy_version = importlib.metadata.version("puyapy")
+    except importlib.metadata.PackageNotFoundError:
+        puyapy_version = "unknown"
+    return f"{algokit_version}|puyapy {puyapy_version}"
+
+
+def _cache_key(contract_path: Path, *, offline: bool) -> str:
+    """Hash của mã nguồn hợp đồng (cả các module cùng thư mục), phiên bản trình biên dịch và cờ build
+
+    Build ngoại tuyến bỏ qua bước biên dịch TEAL qua algod nên có khóa riêng: kết quả của nó
+    không được dùng thay cho một build đầy đủ.
+
+    Chỉ các file trong thư mục hợp đồng được băm, module import từ ngoài thư mục (như
+    smart_contracts._helpers) không thuộc khóa; hợp đồng không được phụ thuộc vào chúng.
+    """
+    digest = hashlib.sha256()
+    digest.update(_compiler_version().encode())
+    digest.update("\0".join([*COMPILE_FLAGS, deployment_extension, f"offline={offline}"]).encode())
+    source_dir = contract_path.parent if contract_path.is_file() else contract_path
+    for source in sorted(source_dir.rglob("*.py")):
+        digest.update(source.relative_to(source_dir).as_posix().encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def log_cache_summary(stats: Counter[str] | None = None) -> None:
+    """Ghi log tỉ lệ trúng bộ nhớ đệm; stats dùng để gộp thống kê từ các tiến trình build con"""
+    stats = cache_stats if stats is None else stats
+    total = stats["hit"] + stats["miss"]
+    if total:
+        logger.info(f"Bộ nhớ đệm build: {stats['hit']}/{total} trúng, {stats['miss']} trượt")
+
+
+def build(output_dir: Path, contract_path: Path, *, use_cache: bool = True, offline: bool | None = None) -> Path:
     output_dir = output_dir.resolve()
+    offline = OFFLINE_BUILD if offline is None else offline
+    cache_entry = BUILD_CACHE_DIR / _cache_key(contract_path, offline=offline)
+    if use_cache and cache_entry.is_dir():
+        cache_stats["hit"] += 1
+        if output_dir.exists():
+            rmtree(output_dir)
+        copytree(cache_entry, output_dir)
+        logger.info(f"Trúng bộ nhớ đệm build cho {contract_path}, khôi phục từ {cache_entry}")
+        return next(output_dir.glob("*.arc32.json"))
+
+    cache_stats["miss"] += 1
+    app_spec_path = _build(output_dir, contract_path, offline=offline)
+    if use_cache:
+        # Ghi vào thư mục tạm rồi đổi tên để tiến trình khác không đọc phải bộ nhớ đệm dở dang
+        staging = cache_entry.with_name(f"{cache_entry.name}.{os.getpid()}.tmp")
+        copytree(output_dir, staging, dirs_exist_ok=True)
+        try:
+            staging.rename(cache_entry)
+        except OSError:
+            rmtree(staging, ignore_errors=True)
+    return app_spec_path
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    staging.write_text(text)
+    staging.replace(path)
+
+
+def compile_teal(algod_client: AlgodClient, teal: str) -> dict[str, Any]:
+    """Biên dịch TEAL qua algod; kết quả (hash, result) được lưu theo hash của mã TEAL"""
+    cache_file = TEAL_CACHE_DIR / f"{hashlib.sha256(teal.encode()).hexdigest()}.json"
+    if cache_file.exists():
+        return json.loads(cache_file.read_text())
+    result = algod_client.compile(teal)
+    if "result" not in result:
+        raise Exception("Không thể biên dịch chương trình TEAL")
+    _write_atomic(cache_file, json.dumps({"hash": result["hash"], "result": result["result"]}))
+    return result
+
+
+def _validate_app_spec(app_spec_path: Path) -> dict[str, str]:
+    """Kiểm tra app spec do puyapy sinh ra, trả về mã TEAL của chương trình approval và clear"""
+    app_spec = json.loads(app_spec_path.read_text())
+    # Phân tích lại các phương thức ABI, kiểu không hợp lệ sẽ ném lỗi
+    Contract.undictify(app_spec["contract"])
+
+    programs = {}
+    for name in ("approval", "clear"):
+        encoded = app_spec.get("source", {}).get(name)
+        if not encoded:
+            raise Exception(f"{app_spec_path.name} thiếu chương trình {name}")
+        teal = base64.b64decode(encoded).decode("utf-8")
+        if not teal.startswith("#pragma version"):
+            raise Exception(f"Chương trình {name} trong {app_spec_path.name} không phải mã TEAL hợp lệ")
+        programs[name] = teal
+    return programs
+
+
+def _build(output_dir: Path, contract_path: Path, *, offline: bool) -> Path:
     if output_dir.exists():
         rmtree(output_dir)
     output_dir.mkdir(exist_ok=True, parents=True)
@@ -32,8 +154,7 @@ def build(output_dir: Path, contract_path: Path) -> Path:
             "python",
             contract_path.absolute(),
             f"--out-dir={output_dir}",
-            "--output-arc32",
-            "--debug-level=0",
+            *COMPILE_FLAGS,
         ],
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
@@ -42,25 +163,18 @@ def build(output_dir: Path, contract_path: Path) -> Path:
     if build_result.returncode:
         raise Exception(f"Không thể biên dịch hợp đồng:\n{build_result.stdout}")
 
-    # Bước 2: Kiểm tra tính hợp lệ của các phương thức ABI
+    # Bước 2: Kiểm tra trực tiếp đầu ra của puyapy (phương thức ABI và mã TEAL)
     app_spec_file_names = [file.name for file in output_dir.glob("*.arc32.json")]
-    for app_spec_file_name in app_spec_file_names:
-        with open(output_dir / app_spec_file_name, 'r') as f:
-            contract = Contract.from_json(f.read())
-        for method in contract.methods:
-            if not method.is_valid():
-                raise Exception(f"Phương thức ABI không hợp lệ: {method.name}")
-
-    # Bước 3: Kiểm tra trạng thái hợp đồng
-    algod_client = AlgodClient("", "http://localhost:4001")
-    approval_program = compileTeal(contract.approval_program(), mode=Mode.Application, version=6)
-    clear_program = compileTeal(contract.clear_program(), mode=Mode.Application, version=6)
-    
-    approval_result = algod_client.compile(approval_program)
-    clear_result = algod_client.compile(clear_program)
-    
-    if 'result' not in approval_result or 'result' not in clear_result:
-        raise Exception("Không thể biên dịch chương trình approval hoặc clear")
+    programs = [_validate_app_spec(output_dir / app_spec_file_name) for app_spec_file_name in app_spec_file_names]
+
+    # Bước 3: Biên dịch mã TEAL qua algod, bỏ qua khi build ngoại tuyến
+    if offline:
+        logger.info("Build ngoại tuyến, bỏ qua bước biên dịch TEAL qua algod")
+    else:
+        algod_client = get_algod_client()
+        for program in programs:
+            for teal in program.values():
+                compile_teal(algod_client, teal)
 
     # Bước 4: Tạo client được định kiểu
     for app_spec_file_name in app_spec_file_names:
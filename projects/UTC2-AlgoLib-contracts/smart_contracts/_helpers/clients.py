@@ -0,0 +1,215 @@
+"""Client algod/indexer dùng chung cho triển khai và kiểm thử.
+
+Các client cùng địa chỉ dùng chung một httpx.Client nên kết nối TCP/TLS được giữ lại giữa
+các lần gọi. Yêu cầu bị giới hạn tốc độ (429) hoặc lỗi máy chủ (5xx) được thử lại với thời
+gian chờ tăng theo cấp số nhân có nhiễu, ưu tiên header Retry-After nếu có.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any
+from urllib import parse
+
+import httpx
+from algokit_utils import AlgoClientConfig, get_default_localnet_config
+from algosdk import constants, error
+from algosdk.v2client.algod import AlgodClient, api_version_path_prefix
+from algosdk.v2client.indexer import IndexerClient
+
+from smart_contracts._helpers.config import CLIENT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_http_clients: dict[str, httpx.Client] = {}
+_clients: dict[tuple[str, str, str], AlgodClient | IndexerClient] = {}
+
+
+def _http_client(base_url: str) -> httpx.Client:
+    """Một httpx.Client cho mỗi máy chủ, giữ kết nối sống giữa các yêu cầu"""
+    with _lock:
+        http = _http_clients.get(base_url)
+        if http is None:
+            http = httpx.Client(
+                timeout=CLIENT_CONFIG["timeout"],
+                limits=httpx.Limits(
+                    max_connections=CLIENT_CONFIG["max_connections"],
+                    max_keepalive_connections=CLIENT_CONFIG["max_keepalive_connections"],
+                ),
+            )
+            _http_clients[base_url] = http
+        return http
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), CLIENT_CONFIG["backoff_max"])
+    return random.uniform(0, min(CLIENT_CONFIG["backoff_max"], CLIENT_CONFIG["backoff_base"] * 2**attempt))
+
+
+def _send(
+    http: httpx.Client,
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    data: bytes | None,
+    timeout: float | None,
+) -> httpx.Response:
+    """Gửi yêu cầu, thử lại khi lỗi kết nối hoặc mã trạng thái nằm trong retry_status_codes
+
+    Gửi lại giao dịch đã ký là an toàn: cùng một giao dịch không thể được xác nhận hai lần.
+    """
+    max_retries = CLIENT_CONFIG["max_retries"]
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = http.request(
+                method,
+                url,
+                headers=headers,
+                content=data,
+                timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+            )
+        except httpx.TransportError as e:
+            if attempt == max_retries:
+                raise
+            logger.debug(f"Lỗi kết nối tới {url}: {e}, thử lại lần {attempt + 1}")
+        else:
+            if response.status_code not in CLIENT_CONFIG["retry_status_codes"] or attempt == max_retries:
+                return response
+            logger.debug(f"{url} trả về {response.status_code}, thử lại lần {attempt + 1}")
+        time.sleep(_retry_delay(attempt, response))
+        attempt += 1
+
+
+def _request_url(address: str, requrl: str, params: Mapping[str, Any] | None) -> str:
+    if requrl not in constants.unversioned_paths:
+        requrl = api_version_path_prefix + requrl
+    if params:
+        requrl = requrl + "?" + parse.urlencode(params)
+    return address + requrl
+
+
+def _error_message(response: httpx.Response) -> tuple[str, dict[str, Any]]:
+    try:
+        body = response.json()
+        return body["message"], body
+    except (ValueError, KeyError, TypeError):
+        return response.text, {}
+
+
+class PooledAlgodClient(AlgodClient):
+    """AlgodClient gửi yêu cầu qua kết nối dùng chung và tự thử lại khi bị giới hạn"""
+
+    def algod_request(  # type: ignore[override]
+        self,
+        method: str,
+        requrl: str,
+        params: Mapping[str, Any] | None = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        response_format: str | None = "json",
+        timeout: float | None = None,
+    ) -> dict[str, Any] | bytes:
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header.update({constants.algod_auth_header: self.algod_token})
+
+        url = _request_url(self.algod_address, requrl, params)
+        response = _send(_http_client(self.algod_address), method, url, header, data, timeout)
+        if response.is_error:
+            message, body = _error_message(response)
+            raise error.AlgodHTTPError(message, response.status_code, body.get("data"))
+        if response_format != "json":
+            return response.content
+        # Một số phản hồi của algod là 200 OK với nội dung rỗng
+        if not response.content:
+            return {}
+        try:
+            return response.json()
+        except ValueError as e:
+            raise error.AlgodResponseError("Failed to parse JSON response from algod") from e
+
+
+class PooledIndexerClient(IndexerClient):
+    """IndexerClient gửi yêu cầu qua kết nối dùng chung và tự thử lại khi bị giới hạn"""
+
+    def indexer_request(  # type: ignore[override]
+        self,
+        method: str,
+        requrl: str,
+        params: Mapping[str, Any] | None = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> dict[str, Any]:
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth and self.indexer_token:
+            header.update({constants.indexer_auth_header: self.indexer_token})
+
+        url = _request_url(self.indexer_address, requrl, params)
+        response = _send(_http_client(self.indexer_address), method, url, header, data, timeout)
+        if response.is_error:
+            raise error.IndexerHTTPError(_error_message(response)[0])
+        return json.loads(response.content, object_pairs_hook=lambda pairs: dict(sorted(pairs)))
+
+
+def _config_from_environment(prefix: str, kind: str) -> AlgoClientConfig:
+    """Địa chỉ từ biến môi trường <prefix>_SERVER/_PORT/_TOKEN, mặc định là LocalNet"""
+    server = os.environ.get(f"{prefix}_SERVER")
+    if not server:
+        return get_default_localnet_config(kind)  # type: ignore[arg-type]
+    port = os.environ.get(f"{prefix}_PORT")
+    if port:
+        parsed = parse.urlparse(server)
+        server = parsed._replace(netloc=f"{parsed.hostname}:{port}").geturl()
+    return AlgoClientConfig(server=server.rstrip("/"), token=os.environ.get(f"{prefix}_TOKEN", ""))
+
+
+def get_algod_client(config: AlgoClientConfig | None = None) -> AlgodClient:
+    """Client algod dùng chung theo địa chỉ; không có config thì đọc từ biến môi trường"""
+    config = config or _config_from_environment("ALGOD", "algod")
+    key = ("algod", config.server, config.token)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = PooledAlgodClient(config.token, config.server, {"X-Algo-API-Token": config.token})
+            _clients[key] = client
+    return client  # type: ignore[return-value]
+
+
+def get_indexer_client(config: AlgoClientConfig | None = None) -> IndexerClient:
+    """Client indexer dùng chung theo địa chỉ; không có config thì đọc từ biến môi trường"""
+    config = config or _config_from_environment("INDEXER", "indexer")
+    key = ("indexer", config.server, config.token)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = PooledIndexerClient(config.token, config.server)
+            _clients[key] = client
+    return client  # type: ignore[return-value]
+
+
+def close_clients() -> None:
+    """Đóng mọi kết nối đang giữ"""
+    with _lock:
+        for http in _http_clients.values():
+            http.close()
+        _http_clients.clear()
+        _clients.clear()
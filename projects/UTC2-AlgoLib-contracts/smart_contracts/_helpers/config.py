@@ -3,17 +3,60 @@ import importlib
 from collections.abc import Callable
 from pathlib import Path
 
-from algokit_utils import Account, ApplicationSpecification
 from algosdk.v2client.algod import AlgodClient
 from algosdk.v2client.indexer import IndexerClient
 
 
+@dataclasses.dataclass
+class SmartContract:
+    path: Path
+    name: str
+    deploy: Callable[..., None] | None = None
+    # Tên các hợp đồng phải được triển khai trước hợp đồng này
+    depends_on: list[str] = dataclasses.field(default_factory=list)
+
+
+def import_contract(folder: Path) -> Path:
+    """Trả về đường dẫn contract.py trong thư mục hợp đồng"""
+    contract_path = folder / "contract.py"
+    if contract_path.exists():
+        return contract_path
+    else:
+        raise Exception(f"Không tìm thấy hợp đồng trong {folder}")
+
+
+def import_deploy_config(folder: Path) -> tuple[Callable[..., None] | None, list[str]]:
+    """Nạp hàm deploy và danh sách DEPENDS_ON từ deploy_config.py nếu có
+
+    Chỉ việc thiếu chính deploy_config.py mới có nghĩa là "không triển khai"; lỗi import bên trong
+    file (ví dụ thiếu client được sinh ra) được ném tiếp thay vì âm thầm bỏ qua hợp đồng.
+    """
+    module_name = f"{folder.parent.name}.{folder.name}.deploy_config"
+    try:
+        deploy_module = importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        if e.name != module_name:
+            raise
+        return None, []
+    return deploy_module.deploy, list(getattr(deploy_module, "DEPENDS_ON", []))
+
+
+def has_contract_file(directory: Path) -> bool:
+    return (directory / "contract.py").exists()
+
+
 import os
 from Crypto.Random import get_random_bytes
 
 # Cấu hình khóa AES
 AES_KEY_SIZE = 32  # 256 bit
-AES_KEY = os.environ.get('AES_KEY') or get_random_bytes(AES_KEY_SIZE)
+
+
+# Khóa AES chính được nạp từ kho khóa (KEY_STORAGE_CONFIG) nên giữ nguyên giữa các tiến trình
+def get_aes_key() -> bytes:
+    from smart_contracts._helpers.keystore import load_master_key
+
+    return load_master_key()
 
 # Cấu hình mã hóa
 ENCRYPTION_CONFIG = {
@@ -44,4 +87,40 @@ SECURITY_CONFIG = {
 KEY_STORAGE_CONFIG = {
     'use_keyring': True,
     'keyring_service_name': 'UTC2-AlgoLib',
+    'master_key_name': 'master_key',
+    # File thay thế khi không có keyring (ví dụ trên máy CI)
+    'key_file': os.environ.get('UTC2_KEY_FILE', str(Path.home() / '.utc2-algolib' / 'master.key')),
+    # Bộ nhớ đệm khóa dữ liệu đã giải bọc
+    'data_key_cache_size': 1024,
+    'data_key_cache_ttl': 10 * 60,  # 10 phút
 }
+
+# Cấu hình kết nối algod/indexer; địa chỉ lấy từ ALGOD_SERVER/ALGOD_PORT/ALGOD_TOKEN và
+# INDEXER_SERVER/INDEXER_PORT/INDEXER_TOKEN, mặc định là LocalNet
+CLIENT_CONFIG = {
+    'timeout': float(os.environ.get('ALGOD_TIMEOUT', 30)),  # giây
+    'max_retries': int(os.environ.get('ALGOD_MAX_RETRIES', 5)),
+    # Thử lại khi bị giới hạn tốc độ hoặc lỗi máy chủ, chờ tăng theo cấp số nhân
+    'retry_status_codes': (429, 500, 502, 503, 504),
+    'backoff_base': 0.25,  # giây
+    'backoff_max': 8.0,  # giây
+    'max_connections': 32,
+    'max_keepalive_connections': 16,
+}
+
+
+base_dir = Path(__file__).parent.parent
+
+
+def load_contracts() -> list[SmartContract]:
+    """Tìm các hợp đồng và nạp deploy_config của chúng
+
+    Gọi khi cần thay vì lúc import module: deploy_config dùng các helper (clients, ...) vốn
+    import lại module này, nạp sớm sẽ tạo vòng import.
+    """
+    return [
+        SmartContract(path=import_contract(folder), name=folder.name, deploy=deploy, depends_on=depends_on)
+        for folder in sorted(base_dir.iterdir())
+        if folder.is_dir() and has_contract_file(folder)
+        for deploy, depends_on in [import_deploy_config(folder)]
+    ]
@@ -11,8 +11,6 @@ from algokit_utils import (
     EnsureBalanceParameters,
     ensure_funded,
     get_account,
-    get_algod_client,
-    get_indexer_client,
     OnSchemaBreak,
     OnUpdate,
 )
@@ -20,6 +18,8 @@ from algosdk.util import algos_to_microalgos
 from algosdk.v2client.algod import AlgodClient
 from algosdk.v2client.indexer import IndexerClient
 
+from smart_contracts._helpers.clients import get_algod_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -67,3 +67,31 @@ def secure_deploy(client: AlgodClient, app_spec: ApplicationSpecification, deplo
 
 # Sử dụng hàm secure_deploy thay vì client.deploy trong quá trình triển khai
 
+
+def deploy(
+    app_spec_path: Path,
+    deploy_callback: Callable[..., None],
+    deployer_initial_funds: int = 2,
+    *,
+    dry_run: bool = False,
+) -> None:
+    """Nạp app spec, chuẩn bị tài khoản triển khai rồi gọi hàm deploy của hợp đồng
+
+    Với dry_run, tài khoản không được nạp thêm tiền và hàm deploy chỉ in kế hoạch triển khai.
+    """
+    algod_client = get_algod_client()
+    app_spec = ApplicationSpecification.from_json(app_spec_path.read_text())
+    deployer = get_account(algod_client, "DEPLOYER", fund_with_algos=0)
+    if dry_run:
+        deploy_callback(app_spec, deployer, dry_run=True)
+        return
+    minimum_funds_micro_algos = algos_to_microalgos(deployer_initial_funds)
+    ensure_funded(
+        algod_client,
+        EnsureBalanceParameters(
+            account_to_fund=deployer,
+            min_spending_balance_micro_algos=minimum_funds_micro_algos,
+            min_funding_increment_micro_algos=minimum_funds_micro_algos,
+        ),
+    )
+    deploy_callback(app_spec, deployer)
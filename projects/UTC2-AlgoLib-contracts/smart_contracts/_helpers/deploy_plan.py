@@ -0,0 +1,302 @@
+"""Lập kế hoạch triển khai: chỉ gửi giao dịch khi chương trình hoặc schema thực sự thay đổi.
+
+Mỗi lần triển khai ghi một bản ghi cục bộ (app id, hash của mã TEAL và của chương trình đã
+biên dịch, schema) theo từng mạng. Lần sau, nếu mã TEAL không đổi và ứng dụng trên chuỗi vẫn
+chạy đúng chương trình trong bản ghi, kế hoạch là "skip" mà không cần biên dịch lại.
+"""
+
+import base64
+import dataclasses
+import enum
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from algokit_utils import Account, ApplicationSpecification
+from algokit_utils.application_specification import CallConfig
+from algosdk import transaction
+from algosdk.error import AlgodHTTPError
+from algosdk.logic import get_application_address
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers.build import compile_teal
+
+logger = logging.getLogger(__name__)
+
+# Thư mục bản ghi triển khai, mỗi mạng (genesis id) một thư mục con
+DEPLOY_STATE_DIR = Path(os.environ.get("ALGOKIT_DEPLOY_STATE_DIR", Path(__file__).parent.parent / ".deploy_state"))
+# Kích thước một trang chương trình; chương trình dài hơn cần thêm trang (tối đa 3)
+APP_PAGE_SIZE = 2048
+MAX_EXTRA_PAGES = 3
+# Số microAlgo nạp cho tài khoản ứng dụng mới tạo: hợp đồng lưu tài nguyên, quyền và hash neo trong box,
+# mỗi box làm tăng số dư tối thiểu của tài khoản ứng dụng
+APP_FUNDS = int(os.environ.get("ALGOKIT_DEPLOY_APP_FUNDS", 1_000_000))
+_WAIT_ROUNDS = 4
+
+
+class DeployAction(enum.StrEnum):
+    CREATE = "create"
+    SKIP = "skip"
+    UPDATE = "update"
+    REPLACE = "replace"
+
+
+@dataclasses.dataclass
+class Schema:
+    global_ints: int
+    global_bytes: int
+    local_ints: int
+    local_bytes: int
+    extra_pages: int
+
+    def fits_in(self, other: "Schema") -> bool:
+        """Schema và số trang của ứng dụng other đủ chỗ cho schema này (không đổi được khi update)"""
+        return all(getattr(self, field.name) <= getattr(other, field.name) for field in dataclasses.fields(self))
+
+
+@dataclasses.dataclass
+class DeployRecord:
+    app_id: int
+    genesis_hash: str
+    teal_hash: str
+    approval_hash: str
+    clear_hash: str
+    schema: Schema
+
+
+@dataclasses.dataclass
+class DeployPlan:
+    contract_name: str
+    action: DeployAction
+    reason: str
+    app_id: int | None
+    teal_hash: str
+    genesis_id: str
+    genesis_hash: str
+    # Chương trình đã biên dịch, chỉ có khi cần gửi giao dịch
+    approval_program: bytes | None = None
+    clear_program: bytes | None = None
+    schema: Schema | None = None
+    delete_replaced: bool = False
+    # Số microAlgo nạp cho tài khoản ứng dụng sau khi tạo (create/replace)
+    app_funds: int = 0
+
+    def describe(self) -> str:
+        target = f"ứng dụng {self.app_id}" if self.app_id else "ứng dụng mới"
+        description = f"{self.contract_name} trên {self.genesis_id}: {self.action} {target} ({self.reason})"
+        if self.app_funds:
+            description += f", nạp {self.app_funds} microAlgo cho tài khoản ứng dụng mới"
+        return description
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _teal_hash(app_spec: ApplicationSpecification) -> str:
+    """Hash của mã TEAL và schema khai báo trong app spec"""
+    global_schema, local_schema = app_spec.global_state_schema, app_spec.local_state_schema
+    schema = (
+        global_schema.num_uints,
+        global_schema.num_byte_slices,
+        local_schema.num_uints,
+        local_schema.num_byte_slices,
+    )
+    return _sha256(f"{app_spec.approval_program}\0{app_spec.clear_program}\0{schema}".encode())
+
+
+def _record_path(genesis_id: str, contract_name: str) -> Path:
+    return DEPLOY_STATE_DIR / genesis_id / f"{contract_name}.json"
+
+
+def load_record(genesis_id: str, contract_name: str) -> DeployRecord | None:
+    path = _record_path(genesis_id, contract_name)
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text())
+    return DeployRecord(**{**data, "schema": Schema(**data["schema"])})
+
+
+def save_record(genesis_id: str, contract_name: str, record: DeployRecord) -> None:
+    path = _record_path(genesis_id, contract_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(dataclasses.asdict(record), indent=2) + "\n")
+
+
+def _required_schema(app_spec: ApplicationSpecification, approval: bytes, clear: bytes) -> Schema:
+    extra_pages = min(MAX_EXTRA_PAGES, max(0, -(-(len(approval) + len(clear)) // APP_PAGE_SIZE) - 1))
+    return Schema(
+        global_ints=app_spec.global_state_schema.num_uints or 0,
+        global_bytes=app_spec.global_state_schema.num_byte_slices or 0,
+        local_ints=app_spec.local_state_schema.num_uints or 0,
+        local_bytes=app_spec.local_state_schema.num_byte_slices or 0,
+        extra_pages=extra_pages,
+    )
+
+
+def _onchain_schema(params: dict[str, Any]) -> Schema:
+    global_schema = params.get("global-state-schema", {})
+    local_schema = params.get("local-state-schema", {})
+    return Schema(
+        global_ints=global_schema.get("num-uint", 0),
+        global_bytes=global_schema.get("num-byte-slice", 0),
+        local_ints=local_schema.get("num-uint", 0),
+        local_bytes=local_schema.get("num-byte-slice", 0),
+        extra_pages=params.get("extra-program-pages", 0),
+    )
+
+
+def _allows(app_spec: ApplicationSpecification, on_complete: str) -> bool:
+    """Hợp đồng có chấp nhận lời gọi update_application/delete_application hay không"""
+    call_configs = [app_spec.bare_call_config, *(hints.call_config for hints in app_spec.hints.values())]
+    return any(
+        config.get(on_complete, CallConfig.NEVER) & CallConfig.CALL  # type: ignore[call-overload]
+        for config in call_configs
+    )
+
+
+def plan_deploy(
+    algod_client: AlgodClient, app_spec: ApplicationSpecification, *, app_funds: int = APP_FUNDS
+) -> DeployPlan:
+    """So sánh app spec với bản ghi cục bộ và ứng dụng trên chuỗi để chọn create/skip/update/replace
+
+    Ứng dụng được tạo mới (create/replace) được nạp app_funds microAlgo để có thể tạo box.
+    """
+    sp = algod_client.suggested_params()
+    name = app_spec.contract.name
+    teal_hash = _teal_hash(app_spec)
+    plan = DeployPlan(name, DeployAction.CREATE, "", None, teal_hash, sp.gen, sp.gh)
+
+    record = load_record(sp.gen, name)
+    if record is not None and record.genesis_hash != sp.gh:
+        # Mạng đã được khởi tạo lại (ví dụ LocalNet reset), bản ghi không còn giá trị
+        record = None
+
+    params = None
+    if record is not None:
+        try:
+            params = algod_client.application_info(record.app_id)["params"]
+        except AlgodHTTPError as e:
+            if e.code != 404:
+                raise
+    if record is None or params is None:
+        plan.reason = "chưa có bản ghi triển khai" if record is None else f"ứng dụng {record.app_id} không còn tồn tại"
+    else:
+        plan.app_id = record.app_id
+        onchain_approval = _sha256(base64.b64decode(params["approval-program"]))
+        onchain_clear = _sha256(base64.b64decode(params["clear-state-program"]))
+        onchain_matches_record = (onchain_approval, onchain_clear) == (record.approval_hash, record.clear_hash)
+        if record.teal_hash == teal_hash and onchain_matches_record:
+            # Mã TEAL giống lần triển khai trước và chương trình trên chuỗi chưa bị đổi: không cần biên dịch
+            plan.action = DeployAction.SKIP
+            plan.reason = "chương trình không đổi"
+            return plan
+
+    approval = base64.b64decode(compile_teal(algod_client, app_spec.approval_program)["result"])
+    clear = base64.b64decode(compile_teal(algod_client, app_spec.clear_program)["result"])
+    plan.approval_program, plan.clear_program = approval, clear
+    plan.schema = _required_schema(app_spec, approval, clear)
+    if params is None:
+        plan.app_funds = app_funds
+        return plan
+
+    if not plan.schema.fits_in(_onchain_schema(params)):
+        plan.action = DeployAction.REPLACE
+        plan.reason = "schema hoặc số trang chương trình tăng"
+    elif (_sha256(approval), _sha256(clear)) == (onchain_approval, onchain_clear):
+        plan.action = DeployAction.SKIP
+        plan.reason = "chương trình đã biên dịch trùng với ứng dụng trên chuỗi"
+    elif not _allows(app_spec, "update_application"):
+        plan.action = DeployAction.REPLACE
+        plan.reason = "chương trình thay đổi nhưng hợp đồng không cho phép update"
+    else:
+        plan.action = DeployAction.UPDATE
+        plan.reason = "chương trình thay đổi"
+    if plan.action == DeployAction.REPLACE:
+        plan.app_funds = app_funds
+        plan.delete_replaced = _allows(app_spec, "delete_application")
+    return plan
+
+
+def _send(algod_client: AlgodClient, txn: transaction.Transaction, deployer: Account) -> dict[str, Any]:
+    txid = algod_client.send_transaction(txn.sign(deployer.private_key))
+    return transaction.wait_for_confirmation(algod_client, txid, _WAIT_ROUNDS)
+
+
+def _create_txn(
+    sender: str, sp: transaction.SuggestedParams, approval: bytes, clear: bytes, schema: Schema
+) -> transaction.ApplicationCreateTxn:
+    return transaction.ApplicationCreateTxn(
+        sender,
+        sp,
+        transaction.OnComplete.NoOpOC,
+        approval,
+        clear,
+        transaction.StateSchema(schema.global_ints, schema.global_bytes),
+        transaction.StateSchema(schema.local_ints, schema.local_bytes),
+        extra_pages=schema.extra_pages,
+    )
+
+
+def create_app(algod_client: AlgodClient, app_spec: ApplicationSpecification, deployer: Account) -> int:
+    """Luôn tạo một ứng dụng mới và không ghi bản ghi triển khai (dùng cho kiểm thử và đo tải)"""
+    approval = base64.b64decode(compile_teal(algod_client, app_spec.approval_program)["result"])
+    clear = base64.b64decode(compile_teal(algod_client, app_spec.clear_program)["result"])
+    txn = _create_txn(
+        deployer.address, algod_client.suggested_params(), approval, clear, _required_schema(app_spec, approval, clear)
+    )
+    return _send(algod_client, txn, deployer)["application-index"]  # type: ignore[no-any-return]
+
+
+def execute_plan(algod_client: AlgodClient, plan: DeployPlan, deployer: Account) -> int:
+    """Thực hiện kế hoạch, ghi lại bản ghi triển khai và trả về app id đang dùng"""
+    if plan.approval_program is None:
+        # Bỏ qua mà không cần biên dịch: bản ghi đã đúng
+        assert plan.app_id is not None
+        return plan.app_id
+    assert plan.clear_program is not None and plan.schema is not None
+
+    sp = algod_client.suggested_params()
+    schema = plan.schema
+    if plan.action == DeployAction.SKIP:
+        # Chỉ mã TEAL thay đổi, chương trình biên dịch giữ nguyên: cập nhật bản ghi để lần sau khỏi biên dịch
+        assert plan.app_id is not None
+        app_id = plan.app_id
+    elif plan.action == DeployAction.UPDATE:
+        assert plan.app_id is not None
+        app_id = plan.app_id
+        txn: transaction.Transaction = transaction.ApplicationUpdateTxn(
+            deployer.address, sp, app_id, plan.approval_program, plan.clear_program
+        )
+        _send(algod_client, txn, deployer)
+    else:
+        txn = _create_txn(deployer.address, sp, plan.approval_program, plan.clear_program, schema)
+        app_id = _send(algod_client, txn, deployer)["application-index"]
+        if plan.app_funds:
+            # Lần ghi box đầu tiên sẽ thất bại nếu tài khoản ứng dụng không đủ số dư tối thiểu
+            payment = transaction.PaymentTxn(deployer.address, sp, get_application_address(app_id), plan.app_funds)
+            _send(algod_client, payment, deployer)
+            logger.info(f"Đã nạp {plan.app_funds} microAlgo cho tài khoản ứng dụng {app_id}")
+        if plan.action == DeployAction.REPLACE and plan.app_id is not None:
+            if plan.delete_replaced:
+                _send(algod_client, transaction.ApplicationDeleteTxn(deployer.address, sp, plan.app_id), deployer)
+                logger.info(f"Đã xóa ứng dụng cũ {plan.app_id}")
+            else:
+                logger.warning(f"Hợp đồng không cho phép xóa, ứng dụng cũ {plan.app_id} vẫn còn trên chuỗi")
+
+    save_record(
+        plan.genesis_id,
+        plan.contract_name,
+        DeployRecord(
+            app_id=app_id,
+            genesis_hash=plan.genesis_hash,
+            teal_hash=plan.teal_hash,
+            approval_hash=_sha256(plan.approval_program),
+            clear_hash=_sha256(plan.clear_program),
+            schema=schema,
+        ),
+    )
+    return app_id
@@ -0,0 +1,182 @@
+import base64
+import heapq
+import logging
+import math
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Iterator
+
+from algosdk.v2client.indexer import IndexerClient
+
+from smart_contracts._helpers.boxes import ADD_DOCUMENT_METHOD, ADD_DOCUMENTS_METHOD, DOCUMENT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Tham số BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str, *, fold_diacritics: bool = True) -> list[str]:
+    """Tách văn bản thành các từ chữ thường, mặc định bỏ dấu tiếng Việt để tìm kiếm không phân biệt dấu"""
+    text = unicodedata.normalize("NFC", text).lower()
+    if fold_diacritics:
+        text = text.replace("đ", "d")
+        text = "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+    return _TOKEN_PATTERN.findall(text)
+
+
+def _encode_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_postings(data: bytes) -> Iterator[tuple[int, int]]:
+    """Giải mã danh sách posting dạng (khoảng cách doc, tần suất) mã hóa varint"""
+    doc_num = 0
+    values = []
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = 0
+        shift = 0
+        if len(values) == 2:
+            doc_num += values[0]
+            yield doc_num, values[1]
+            values = []
+
+
+class InvertedIndex:
+    """Chỉ mục đảo ngược ngoài chuỗi trên tiêu đề và nội dung tài liệu
+
+    Danh sách posting được mã hóa delta + varint; tài liệu được đánh số tăng dần theo
+    thứ tự thêm vào nên mỗi posting chỉ cần nối thêm vào cuối.
+    """
+
+    def __init__(self, *, fold_diacritics: bool = True) -> None:
+        self.fold_diacritics = fold_diacritics
+        self.doc_ids: list[str] = []  # Số thứ tự nội bộ -> doc_id trên chuỗi
+        self.doc_numbers: dict[str, int] = {}
+        self.doc_lengths: list[int] = []
+        self.total_length = 0
+        self.postings: dict[str, bytearray] = {}
+        self.last_doc_number: dict[str, int] = {}
+        self.document_frequency: Counter[str] = Counter()
+        self.last_round = 0  # Vòng cuối cùng đã đồng bộ từ indexer
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add_document(self, doc_id: str, title: str, content: str) -> bool:
+        """Thêm tài liệu vào chỉ mục, bỏ qua nếu doc_id đã tồn tại (giống add_document trên chuỗi)"""
+        if doc_id in self.doc_numbers:
+            return False
+
+        doc_number = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.doc_numbers[doc_id] = doc_number
+
+        fold = self.fold_diacritics
+        terms = tokenize(title, fold_diacritics=fold) + tokenize(content, fold_diacritics=fold)
+        self.doc_lengths.append(len(terms))
+        self.total_length += len(terms)
+        for term, frequency in Counter(terms).items():
+            postings = self.postings.setdefault(term, bytearray())
+            _encode_varint(doc_number - self.last_doc_number.get(term, 0), postings)
+            _encode_varint(frequency, postings)
+            self.last_doc_number[term] = doc_number
+            self.document_frequency[term] += 1
+        return True
+
+    def _term_postings(self, term: str) -> Iterator[tuple[int, int]]:
+        return _decode_postings(self.postings.get(term, b""))
+
+    def search(self, query: str, limit: int = 10, *, rank: bool = True) -> list[str]:
+        """Tìm các doc_id chứa mọi từ khóa trong truy vấn
+
+        Khi rank=True kết quả được xếp hạng theo BM25, ngược lại trả về theo thứ tự thêm vào.
+        """
+        terms = list(dict.fromkeys(tokenize(query, fold_diacritics=self.fold_diacritics)))
+        if not terms or any(term not in self.postings for term in terms):
+            return []
+
+        # Giao các danh sách posting, bắt đầu từ từ hiếm nhất
+        terms.sort(key=lambda term: self.document_frequency[term])
+        matches = {doc_number: {terms[0]: tf} for doc_number, tf in self._term_postings(terms[0])}
+        for term in terms[1:]:
+            next_matches = {}
+            for doc_number, tf in self._term_postings(term):
+                if doc_number in matches:
+                    matches[doc_number][term] = tf
+                    next_matches[doc_number] = matches[doc_number]
+            matches = next_matches
+            if not matches:
+                return []
+
+        if not rank:
+            return [self.doc_ids[doc_number] for doc_number in sorted(matches)[:limit]]
+
+        scored = heapq.nlargest(limit, ((self._bm25(n, tfs), n) for n, tfs in matches.items()))
+        return [self.doc_ids[doc_number] for _, doc_number in scored]
+
+    def _bm25(self, doc_number: int, term_frequencies: dict[str, int]) -> float:
+        doc_count = len(self.doc_ids)
+        average_length = self.total_length / doc_count
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_number] / average_length)
+        score = 0.0
+        for term, tf in term_frequencies.items():
+            df = self.document_frequency[term]
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            score += idf * tf * (BM25_K1 + 1) / (tf + length_norm)
+        return score
+
+
+def decode_document_call(app_args: list[bytes]) -> list[dict]:
+    """Giải mã các tài liệu từ app args của một lần gọi add_document/add_documents"""
+    if not app_args:
+        return []
+
+    selector = app_args[0]
+    if selector == ADD_DOCUMENT_METHOD.get_selector():
+        values = [arg.type.decode(raw) for arg, raw in zip(ADD_DOCUMENT_METHOD.args, app_args[1:], strict=False)]
+        return [dict(zip(DOCUMENT_FIELDS, values, strict=True))]
+    if selector == ADD_DOCUMENTS_METHOD.get_selector():
+        items = ADD_DOCUMENTS_METHOD.args[0].type.decode(app_args[1])
+        return [dict(zip(DOCUMENT_FIELDS, item, strict=True)) for item in items]
+    return []
+
+
+def sync_from_indexer(index: InvertedIndex, indexer_client: IndexerClient, app_id: int) -> int:
+    """Cập nhật chỉ mục từ các lần gọi add_document đã được xác nhận kể từ lần đồng bộ trước"""
+    added = 0
+    next_page = None
+    max_round = index.last_round
+    while True:
+        response = indexer_client.search_transactions(
+            application_id=app_id,
+            txn_type="appl",
+            min_round=index.last_round + 1,
+            next_page=next_page,
+        )
+        for txn in response.get("transactions", []):
+            app_args = [base64.b64decode(arg) for arg in txn["application-transaction"].get("application-args", [])]
+            for document in decode_document_call(app_args):
+                added += index.add_document(document["doc_id"], document["title"], document["content"])
+            max_round = max(max_round, txn["confirmed-round"])
+        next_page = response.get("next-token")
+        if not next_page:
+            break
+
+    index.last_round = max_round
+    logger.info(f"Đã thêm {added} tài liệu vào chỉ mục toàn văn (vòng {index.last_round})")
+    return added
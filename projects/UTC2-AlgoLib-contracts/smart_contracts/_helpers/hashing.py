@@ -0,0 +1,60 @@
+import hashlib
+import logging
+from pathlib import Path
+from typing import BinaryIO
+
+from algokit_utils import Account
+from algosdk import abi
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, AtomicTransactionComposer
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers.boxes import data_anchor_box
+from smart_contracts._helpers.readonly import VERIFY_DATA_HASH_METHOD, ReadOnlyClient
+
+logger = logging.getLogger(__name__)
+
+ANCHOR_DATA_HASH_METHOD = abi.Method.from_signature("anchor_data_hash(byte[],string)string")
+
+# Kích thước mỗi lần đọc khi băm file
+HASH_READ_SIZE = 1024 * 1024
+
+
+def sha256_stream(stream: BinaryIO, read_size: int = HASH_READ_SIZE) -> bytes:
+    """Tính digest SHA-256 của luồng dữ liệu với bộ nhớ cố định"""
+    digest = hashlib.sha256()
+    while chunk := stream.read(read_size):
+        digest.update(chunk)
+    return digest.digest()
+
+
+def sha256_file(path: Path, read_size: int = HASH_READ_SIZE) -> bytes:
+    """Tính digest SHA-256 của file trong một lượt đọc tuần tự"""
+    with Path(path).open("rb") as f:
+        return sha256_stream(f, read_size)
+
+
+def anchor_file(algod_client: AlgodClient, app_id: int, sender: Account, path: Path, label: str = "") -> bytes:
+    """Băm file ngoài chuỗi và chỉ neo digest 32 byte lên hợp đồng"""
+    digest = sha256_file(path)
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        app_id=app_id,
+        method=ANCHOR_DATA_HASH_METHOD,
+        sender=sender.address,
+        sp=algod_client.suggested_params(),
+        signer=AccountTransactionSigner(sender.private_key),
+        method_args=[digest, label],
+        boxes=[(0, data_anchor_box(digest))],
+    )
+    result = atc.execute(algod_client, 4).abi_results[0].return_value
+    logger.info(f"Neo {path} ({digest.hex()}): {result}")
+    return digest
+
+
+def verify_file(algod_client: AlgodClient, app_id: int, sender: str, path: Path) -> str:
+    """Băm file ngoài chuỗi và kiểm tra digest đã được neo hay chưa
+
+    Chỉ đọc nên được mô phỏng qua ReadOnlyClient: không ký, không trả phí; sender là địa chỉ người gọi.
+    """
+    client = ReadOnlyClient(algod_client, app_id, sender)
+    return client.call(VERIFY_DATA_HASH_METHOD, [sha256_file(path)])  # type: ignore[no-any-return]
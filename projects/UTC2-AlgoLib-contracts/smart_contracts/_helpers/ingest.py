@@ -0,0 +1,193 @@
+import csv
+import dataclasses
+import json
+import logging
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from algokit_utils import Account
+from algosdk import transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, AtomicTransactionComposer
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers.boxes import (
+    ADD_DOCUMENTS_METHOD,
+    DOCUMENT_FIELDS,
+    DOCUMENT_TUPLE_TYPE,
+    MAX_APP_ARGS_SIZE,
+    MAX_BOX_REFS_PER_TXN,
+    MAX_GROUP_SIZE,
+    resource_box_names,
+    utf8_size,
+)
+
+logger = logging.getLogger(__name__)
+
+# Phần app args dành cho danh sách tài liệu: trừ selector (4 byte) và độ dài mảng (2 byte)
+_DOCUMENTS_ARG_BUDGET = MAX_APP_ARGS_SIZE - 4 - 2
+# Số vòng tối đa chờ một nhóm giao dịch được xác nhận
+_WAIT_ROUNDS = 4
+# Làm mới suggested params sau số nhóm này
+_PARAMS_REFRESH_GROUPS = 50
+
+
+@dataclasses.dataclass
+class DocumentGroup:
+    """Một nhóm nguyên tử gồm các lần gọi add_documents và các box reference dùng chung"""
+
+    calls: list[list[dict]]
+    boxes: list[bytes]
+
+    @property
+    def txn_count(self) -> int:
+        # Cần thêm giao dịch rỗng nếu box reference vượt quá sức chứa của các lần gọi
+        return max(len(self.calls), -(-len(self.boxes) // MAX_BOX_REFS_PER_TXN))
+
+    @property
+    def document_count(self) -> int:
+        return sum(len(call) for call in self.calls)
+
+
+@dataclasses.dataclass
+class IngestStats:
+    groups: int = 0
+    transactions: int = 0
+    documents: int = 0
+    seconds: float = 0.0
+
+
+def read_records(path: Path) -> Iterator[dict]:
+    """Đọc các bản ghi tài liệu từ file JSONL hoặc CSV"""
+    path = Path(path)
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix == ".jsonl":
+            rows: Iterable[dict] = (json.loads(line) for line in f if line.strip())
+        elif path.suffix == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            raise ValueError(f"Định dạng file không được hỗ trợ: {path.suffix}")
+
+        for row in rows:
+            missing = [name for name in DOCUMENT_FIELDS if name not in row]
+            if missing:
+                raise ValueError(f"Bản ghi thiếu trường {', '.join(missing)}: {row}")
+            record = {name: str(row[name]) for name in DOCUMENT_FIELDS}
+            record["year"] = int(row["year"])
+            yield record
+
+
+def _record_values(record: dict) -> list:
+    return [record[name] for name in DOCUMENT_FIELDS]
+
+
+def pack_groups(records: Iterable[dict]) -> Iterator[DocumentGroup]:
+    """Gom các bản ghi thành các nhóm nguyên tử lớn nhất có thể
+
+    Mỗi lần gọi chứa nhiều tài liệu nhất mà app args cho phép; box reference được dùng
+    chung trong cả nhóm nên chỉ cần tổng số box không vượt quá sức chứa của nhóm.
+    """
+    group = DocumentGroup(calls=[[]], boxes=[])
+    call_size = 0
+    for record in records:
+        # Mỗi phần tử của mảng động gồm 2 byte offset ở phần đầu cộng phần mã hóa của tuple
+        record_size = len(DOCUMENT_TUPLE_TYPE.encode(_record_values(record))) + 2
+        if record_size > _DOCUMENTS_ARG_BUDGET:
+            raise ValueError(f"Tài liệu {record['doc_id']} vượt quá giới hạn app args, hãy thêm bằng add_resource")
+        record_boxes = resource_box_names(record["doc_id"], utf8_size(record["content"]))
+
+        new_call = call_size + record_size > _DOCUMENTS_ARG_BUDGET
+        call_count = len(group.calls) + (1 if new_call else 0)
+        box_txns = -(-(len(group.boxes) + len(record_boxes)) // MAX_BOX_REFS_PER_TXN)
+        if max(call_count, box_txns) > MAX_GROUP_SIZE:
+            yield group
+            group = DocumentGroup(calls=[[]], boxes=[])
+            call_size = 0
+        elif new_call:
+            group.calls.append([])
+            call_size = 0
+
+        group.calls[-1].append(record)
+        group.boxes.extend(record_boxes)
+        call_size += record_size
+
+    if group.document_count:
+        yield group
+
+
+def _compose_group(
+    group: DocumentGroup,
+    app_id: int,
+    sender: Account,
+    signer: AccountTransactionSigner,
+    sp: transaction.SuggestedParams,
+) -> AtomicTransactionComposer:
+    atc = AtomicTransactionComposer()
+    calls = group.calls + [[] for _ in range(group.txn_count - len(group.calls))]
+    for i, call in enumerate(calls):
+        boxes = group.boxes[i * MAX_BOX_REFS_PER_TXN : (i + 1) * MAX_BOX_REFS_PER_TXN]
+        atc.add_method_call(
+            app_id=app_id,
+            method=ADD_DOCUMENTS_METHOD,
+            sender=sender.address,
+            sp=sp,
+            signer=signer,
+            method_args=[[_record_values(record) for record in call]],
+            boxes=[(0, name) for name in boxes],
+        )
+    return atc
+
+
+def submit_groups(
+    algod_client: AlgodClient,
+    app_id: int,
+    sender: Account,
+    groups: Iterable[DocumentGroup],
+    max_in_flight: int = 4,
+) -> IngestStats:
+    """Gửi các nhóm giao dịch theo kiểu pipeline, tối đa max_in_flight nhóm đang chờ xác nhận"""
+    signer = AccountTransactionSigner(sender.private_key)
+    stats = IngestStats()
+    pending: deque[tuple[str, DocumentGroup]] = deque()
+    started = time.perf_counter()
+    sp = algod_client.suggested_params()
+
+    def confirm_oldest() -> None:
+        tx_id, confirmed_group = pending.popleft()
+        transaction.wait_for_confirmation(algod_client, tx_id, _WAIT_ROUNDS)
+        stats.groups += 1
+        stats.transactions += confirmed_group.txn_count
+        stats.documents += confirmed_group.document_count
+
+    for sent, group in enumerate(groups):
+        if sent and sent % _PARAMS_REFRESH_GROUPS == 0:
+            sp = algod_client.suggested_params()
+        signed = _compose_group(group, app_id, sender, signer, sp).gather_signatures()
+        pending.append((algod_client.send_transactions(signed), group))
+        if len(pending) >= max_in_flight:
+            confirm_oldest()
+
+    while pending:
+        confirm_oldest()
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def ingest_file(
+    algod_client: AlgodClient,
+    app_id: int,
+    sender: Account,
+    path: Path,
+    max_in_flight: int = 4,
+) -> IngestStats:
+    """Nạp toàn bộ tài liệu trong file JSONL/CSV vào hợp đồng bằng add_documents"""
+    logger.info(f"Đang nạp tài liệu từ {path} vào ứng dụng {app_id}")
+    stats = submit_groups(algod_client, app_id, sender, pack_groups(read_records(path)), max_in_flight)
+    rate = stats.documents / stats.seconds if stats.seconds else 0.0
+    logger.info(
+        f"Đã nạp {stats.documents} tài liệu trong {stats.groups} nhóm "
+        f"({stats.transactions} giao dịch, {stats.seconds:.1f}s, {rate:.0f} tài liệu/s)"
+    )
+    return stats
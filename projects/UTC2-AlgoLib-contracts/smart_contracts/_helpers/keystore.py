@@ -0,0 +1,158 @@
+"""Mã hóa phong bì: mỗi tài nguyên có khóa dữ liệu riêng, được bọc bởi khóa chính.
+
+Khóa chính nạp từ keyring theo KEY_STORAGE_CONFIG, hoặc từ file khi không có keyring.
+Khóa dữ liệu đã giải bọc được giữ trong bộ nhớ đệm LRU có thời hạn để các lần đọc
+liên tiếp không phải giải mã base64 và giải bọc khóa lại.
+"""
+
+import base64
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from pathlib import Path
+
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+
+from smart_contracts._helpers.config import AES_KEY_SIZE, KEY_STORAGE_CONFIG
+
+try:
+    import keyring
+except ImportError:  # keyring là phụ thuộc tùy chọn
+    keyring = None
+
+logger = logging.getLogger(__name__)
+
+_NONCE_SIZE = 12
+_TAG_SIZE = 16
+
+
+def _load_from_keyring() -> bytes:
+    service = KEY_STORAGE_CONFIG["keyring_service_name"]
+    name = KEY_STORAGE_CONFIG["master_key_name"]
+    stored = keyring.get_password(service, name)
+    if stored is None:
+        key = get_random_bytes(AES_KEY_SIZE)
+        keyring.set_password(service, name, base64.b64encode(key).decode("ascii"))
+        logger.info(f"Đã tạo khóa chính mới trong keyring {service}")
+        return key
+    return base64.b64decode(stored)
+
+
+def _read_key_file(path: Path, attempts: int = 50, delay: float = 0.01) -> bytes:
+    """Đọc file khóa; chờ nếu tiến trình tạo file chưa ghi xong nội dung"""
+    for _ in range(attempts):
+        content = path.read_text().strip()
+        if content:
+            return base64.b64decode(content)
+        time.sleep(delay)
+    raise ValueError(f"File khóa chính rỗng: {path}")
+
+
+def _load_from_file(path: Path) -> bytes:
+    if path.exists():
+        return _read_key_file(path)
+
+    key = get_random_bytes(AES_KEY_SIZE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Chỉ chủ sở hữu được đọc file khóa
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Tiến trình khác vừa tạo file: dùng khóa của nó để mọi tiến trình có cùng khóa chính
+        return _read_key_file(path)
+    with os.fdopen(fd, "w") as f:
+        f.write(base64.b64encode(key).decode("ascii"))
+    logger.info(f"Đã tạo khóa chính mới tại {path}")
+    return key
+
+
+def load_master_key() -> bytes:
+    """Nạp khóa chính: biến môi trường AES_KEY (base64), keyring, hoặc file thay thế"""
+    env_key = os.environ.get("AES_KEY")
+    if env_key:
+        return base64.b64decode(env_key)
+    if KEY_STORAGE_CONFIG["use_keyring"] and keyring is not None:
+        return _load_from_keyring()
+    return _load_from_file(Path(KEY_STORAGE_CONFIG["key_file"]))
+
+
+def wrap_data_key(master_key: bytes, data_key: bytes, resource_id: str) -> str:
+    """Bọc khóa dữ liệu bằng khóa chính; resource_id được gắn làm AAD để khóa không bị tráo giữa tài nguyên"""
+    nonce = get_random_bytes(_NONCE_SIZE)
+    cipher = AES.new(master_key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(resource_id.encode("utf-8"))
+    ciphertext, tag = cipher.encrypt_and_digest(data_key)
+    return base64.b64encode(nonce + tag + ciphertext).decode("ascii")
+
+
+def unwrap_data_key(master_key: bytes, wrapped_key: str, resource_id: str) -> bytes:
+    """Giải bọc khóa dữ liệu, ném ValueError nếu khóa bị sửa hoặc thuộc tài nguyên khác"""
+    raw = base64.b64decode(wrapped_key)
+    nonce = raw[:_NONCE_SIZE]
+    tag = raw[_NONCE_SIZE : _NONCE_SIZE + _TAG_SIZE]
+    ciphertext = raw[_NONCE_SIZE + _TAG_SIZE :]
+    cipher = AES.new(master_key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(resource_id.encode("utf-8"))
+    return cipher.decrypt_and_verify(ciphertext, tag)
+
+
+class KeyCache:
+    """Bộ nhớ đệm LRU có thời hạn cho khóa đã giải mã: khóa bí mật không nằm lại trong bộ nhớ quá ttl giây"""
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, tuple[bytes, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        self._entries[key] = (value, self.clock() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class EnvelopeKeyring:
+    """Cấp và giải bọc khóa dữ liệu cho từng tài nguyên, có bộ nhớ đệm khóa đã giải bọc"""
+
+    def __init__(self, master_key: bytes | None = None, cache: KeyCache | None = None) -> None:
+        self.master_key = master_key if master_key is not None else load_master_key()
+        if cache is None:
+            cache = KeyCache(KEY_STORAGE_CONFIG["data_key_cache_size"], KEY_STORAGE_CONFIG["data_key_cache_ttl"])
+        self.cache = cache
+
+    def new_data_key(self, resource_id: str) -> tuple[bytes, str]:
+        """Tạo khóa dữ liệu mới cho tài nguyên, trả về (khóa, khóa đã bọc để lưu cùng tài nguyên)"""
+        data_key = get_random_bytes(AES_KEY_SIZE)
+        wrapped_key = wrap_data_key(self.master_key, data_key, resource_id)
+        self.cache.put((resource_id, wrapped_key), data_key)
+        return data_key, wrapped_key
+
+    def data_key(self, resource_id: str, wrapped_key: str) -> bytes:
+        """Lấy khóa dữ liệu đã giải bọc, chỉ giải bọc khi chưa có trong bộ nhớ đệm"""
+        cache_key = (resource_id, wrapped_key)
+        data_key = self.cache.get(cache_key)
+        if data_key is None:
+            data_key = unwrap_data_key(self.master_key, wrapped_key, resource_id)
+            self.cache.put(cache_key, data_key)
+        return data_key
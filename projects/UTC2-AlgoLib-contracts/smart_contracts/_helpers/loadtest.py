@@ -0,0 +1,400 @@
+"""Đo tải hợp đồng trên LocalNet: thông lượng và độ trễ xác nhận theo từng phương thức.
+
+Mỗi lần chạy tạo một ứng dụng mới, nạp sẵn seed_documents tài liệu và cấp tiền cho các tài
+khoản worker, rồi phát lời gọi theo tỉ lệ của workload với tốc độ cố định (vòng hở: lời gọi
+được lên lịch theo thời gian, không chờ lời gọi trước xong). Phương thức ghi được gửi thành
+giao dịch và chờ xác nhận qua AsyncAlgodClient; phương thức chỉ đọc chạy qua simulate giống
+cách client dùng chúng. Báo cáo JSON ghi kèm commit để so sánh giữa các lần chạy.
+"""
+
+import asyncio
+import dataclasses
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from algokit_utils import Account, ApplicationSpecification, get_localnet_default_account
+from algosdk import abi, account
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    TransactionWithSigner,
+)
+from algosdk.logic import get_application_address
+from algosdk.transaction import PaymentTxn
+from algosdk.util import algos_to_microalgos
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers.async_client import AsyncAlgodClient, AsyncContractClient
+from smart_contracts._helpers.boxes import ADD_DOCUMENT_METHOD, MAX_GROUP_SIZE, MAX_READ_LENGTH, resource_box_names
+from smart_contracts._helpers.deploy_plan import create_app
+from smart_contracts._helpers.readonly import (
+    CHECK_ACCESS_RIGHTS_BATCH_METHOD,
+    CHECK_ACCESS_RIGHTS_METHOD,
+    GET_DOCUMENT_CONTENT_METHOD,
+    GET_TOKEN_BALANCE_METHOD,
+    SEARCH_DOCUMENTS_METHOD,
+    ReadOnlyClient,
+)
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_TOKENS_METHOD = abi.Method.from_signature("transfer_tokens(string,uint64)string")
+
+# Thư mục lưu báo cáo đo tải
+BENCHMARK_DIR = Path(os.environ.get("ALGOKIT_BENCHMARK_DIR", Path(__file__).parent.parent.parent / "benchmarks"))
+
+# Tỉ lệ lời gọi của từng workload
+WORKLOADS: dict[str, dict[str, float]] = {
+    "ingest": {"add_document": 1},
+    "search": {"search_documents": 3, "get_document_content": 1},
+    "access": {"check_access_rights": 3, "check_access_rights_batch": 1},
+    "tokens": {"transfer_tokens": 3, "get_token_balance": 1},
+    "mixed": {
+        "add_document": 1,
+        "search_documents": 3,
+        "get_document_content": 2,
+        "check_access_rights": 2,
+        "transfer_tokens": 1,
+        "get_token_balance": 1,
+    },
+}
+
+_FIELDS = ("toan", "vat-ly", "hoa-hoc", "sinh-hoc", "tin-hoc", "van-hoc", "lich-su", "kinh-te")
+_AUTHORS = tuple(f"tac-gia-{i}" for i in range(32))
+_YEARS = tuple(range(2000, 2025))
+_CONTENT_SIZE = 600
+_ACCESS_BATCH_SIZE = 4
+
+
+@dataclasses.dataclass
+class BenchmarkConfig:
+    workload: str = "mixed"
+    # Tổng số lời gọi mỗi giây
+    rate: float = 20.0
+    duration: float = 30.0
+    workers: int = 8
+    seed_documents: int = 50
+    worker_funds: float = 10.0  # Algo
+    app_funds: float = 100.0  # Algo, trả phí số dư tối thiểu cho box
+    seed: int = 0
+    output_dir: Path = BENCHMARK_DIR
+    baseline: Path | None = None
+
+    def __post_init__(self) -> None:
+        """Kiểm tra cấu hình trước khi triển khai ứng dụng, tránh lỗi giữa chừng khi đang đo
+
+        Thao tác đọc có thể chạy trước khi add_document đầu tiên được xác nhận nên cần tài liệu nạp sẵn.
+        """
+        if self.rate <= 0 or self.duration <= 0:
+            raise ValueError("rate và duration phải lớn hơn 0")
+        if self.workers < 1:
+            raise ValueError("Cần ít nhất một worker")
+        if self.seed_documents < 0:
+            raise ValueError("seed_documents không được âm")
+        mix = parse_workload(self.workload)
+        reads = sorted(name for name, weight in mix.items() if weight > 0 and name in DOCUMENT_OPERATIONS)
+        if reads and self.seed_documents == 0:
+            raise ValueError(f"{', '.join(reads)} cần tài liệu có sẵn, đặt seed_documents lớn hơn 0")
+
+
+def parse_workload(workload: str) -> dict[str, float]:
+    """Tên workload có sẵn hoặc tỉ lệ tùy chỉnh dạng "add_document=1,search_documents=3" """
+    if workload in WORKLOADS:
+        return WORKLOADS[workload]
+    mix = {}
+    for part in workload.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Không có thao tác đo tải {name}, chọn trong: {', '.join(sorted(OPERATIONS))}")
+        mix[name] = float(weight) if weight else 1.0
+        if mix[name] < 0:
+            raise ValueError(f"Tỉ lệ của {name} không được âm")
+    if not any(mix.values()):
+        raise ValueError(f"Workload {workload} không có thao tác nào có tỉ lệ dương")
+    return mix
+
+
+@dataclasses.dataclass
+class _Worker:
+    index: int
+    account: Account
+    client: AsyncContractClient
+    reader: ReadOnlyClient
+
+
+@dataclasses.dataclass
+class _Context:
+    documents: list[str]
+    rng: random.Random
+
+
+def _document(doc_id: str, rng: random.Random) -> list[Any]:
+    return [
+        doc_id,
+        f"Tiêu đề {doc_id}",
+        rng.choice(_AUTHORS),
+        rng.choice(_YEARS),
+        rng.choice(_FIELDS),
+        "x" * _CONTENT_SIZE,
+    ]
+
+
+async def _add_document(worker: _Worker, ctx: _Context, seq: int) -> object:
+    doc_id = f"bench-{worker.index}-{seq}"
+    result = await worker.client.call(
+        ADD_DOCUMENT_METHOD, _document(doc_id, ctx.rng), resource_box_names(doc_id, _CONTENT_SIZE)
+    )
+    ctx.documents.append(doc_id)
+    return result
+
+
+async def _search_documents(worker: _Worker, ctx: _Context, seq: int) -> object:
+    args = [ctx.rng.choice(_FIELDS), "", 0, ctx.rng.choice(_YEARS), 0]
+    return await asyncio.to_thread(worker.reader.call, SEARCH_DOCUMENTS_METHOD, args)
+
+
+async def _get_document_content(worker: _Worker, ctx: _Context, seq: int) -> object:
+    args = [ctx.rng.choice(ctx.documents), 0, MAX_READ_LENGTH]
+    return await asyncio.to_thread(worker.reader.call, GET_DOCUMENT_CONTENT_METHOD, args)
+
+
+async def _check_access_rights(worker: _Worker, ctx: _Context, seq: int) -> object:
+    args = [ctx.rng.choice(ctx.documents), worker.account.address, "read"]
+    return await asyncio.to_thread(worker.reader.call, CHECK_ACCESS_RIGHTS_METHOD, args)
+
+
+async def _check_access_rights_batch(worker: _Worker, ctx: _Context, seq: int) -> object:
+    checks = [(ctx.rng.choice(ctx.documents), worker.account.address, 1) for _ in range(_ACCESS_BATCH_SIZE)]
+    return await asyncio.to_thread(worker.reader.call, CHECK_ACCESS_RIGHTS_BATCH_METHOD, [checks])
+
+
+async def _transfer_tokens(worker: _Worker, ctx: _Context, seq: int) -> object:
+    recipient = account.generate_account()[1]
+    return await worker.client.call(TRANSFER_TOKENS_METHOD, [recipient, 1])
+
+
+async def _get_token_balance(worker: _Worker, ctx: _Context, seq: int) -> object:
+    return await asyncio.to_thread(worker.reader.call, GET_TOKEN_BALANCE_METHOD)
+
+
+OPERATIONS: dict[str, Callable[[_Worker, _Context, int], Awaitable[object]]] = {
+    "add_document": _add_document,
+    "search_documents": _search_documents,
+    "get_document_content": _get_document_content,
+    "check_access_rights": _check_access_rights,
+    "check_access_rights_batch": _check_access_rights_batch,
+    "transfer_tokens": _transfer_tokens,
+    "get_token_balance": _get_token_balance,
+}
+# Các thao tác chọn ngẫu nhiên một tài liệu đã nạp
+DOCUMENT_OPERATIONS = frozenset({"get_document_content", "check_access_rights", "check_access_rights_batch"})
+# Các thao tác chạy qua simulate, độ trễ là một vòng HTTP thay vì thời gian chờ xác nhận
+SIMULATED_OPERATIONS = frozenset(
+    {
+        "search_documents",
+        "get_document_content",
+        "check_access_rights",
+        "check_access_rights_batch",
+        "get_token_balance",
+    }
+)
+
+
+@dataclasses.dataclass
+class _Sample:
+    operation: str
+    latency: float
+    ok: bool
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Phân vị theo hạng gần nhất; values phải đã được sắp xếp"""
+    if not values:
+        return 0.0
+    return values[max(1, math.ceil(fraction * len(values))) - 1]
+
+
+def summarize(samples: list[_Sample], seconds: float) -> dict[str, dict[str, Any]]:
+    """Số lời gọi, TPS, tỉ lệ lỗi và độ trễ p50/p95/p99 (ms) của từng thao tác và của tổng"""
+    groups: dict[str, list[_Sample]] = {}
+    for sample in samples:
+        groups.setdefault(sample.operation, []).append(sample)
+    groups["total"] = samples
+
+    report = {}
+    for name, group in sorted(groups.items()):
+        latencies = sorted(sample.latency * 1000 for sample in group if sample.ok)
+        failures = sum(not sample.ok for sample in group)
+        report[name] = {
+            "calls": len(group),
+            "failures": failures,
+            "failure_rate": failures / len(group) if group else 0.0,
+            "tps": len(latencies) / seconds if seconds else 0.0,
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+        }
+        if name != "total":
+            report[name]["mode"] = "simulate" if name in SIMULATED_OPERATIONS else "confirmed"
+    return report
+
+
+def fund_accounts(algod_client: AlgodClient, dispenser: Account, addresses: list[str], micro_algos: int) -> None:
+    """Chuyển micro_algos cho từng địa chỉ, tối đa 16 giao dịch thanh toán mỗi nhóm"""
+    signer = AccountTransactionSigner(dispenser.private_key)
+    sp = algod_client.suggested_params()
+    for start in range(0, len(addresses), MAX_GROUP_SIZE):
+        atc = AtomicTransactionComposer()
+        for address in addresses[start : start + MAX_GROUP_SIZE]:
+            atc.add_transaction(TransactionWithSigner(PaymentTxn(dispenser.address, sp, address, micro_algos), signer))
+        atc.execute(algod_client, 4)
+
+
+def deploy_benchmark_app(
+    algod_client: AlgodClient, app_spec: ApplicationSpecification, dispenser: Account, app_funds: float
+) -> int:
+    """Tạo ứng dụng mới cho lần đo và nạp tiền cho tài khoản ứng dụng để tạo box"""
+    app_id = create_app(algod_client, app_spec, dispenser)
+    fund_accounts(algod_client, dispenser, [get_application_address(app_id)], algos_to_microalgos(app_funds))
+    return app_id
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _seed(worker: _Worker, ctx: _Context, count: int) -> None:
+    async def add(i: int) -> None:
+        doc_id = f"seed-{i}"
+        boxes = resource_box_names(doc_id, _CONTENT_SIZE)
+        await worker.client.call(ADD_DOCUMENT_METHOD, _document(doc_id, ctx.rng), boxes)
+        ctx.documents.append(doc_id)
+
+    await asyncio.gather(*(add(i) for i in range(count)))
+
+
+async def _drive(
+    workers: list[_Worker], ctx: _Context, mix: dict[str, float], rate: float, duration: float
+) -> list[_Sample]:
+    names, weights = list(mix), list(mix.values())
+    samples: list[_Sample] = []
+    loop = asyncio.get_running_loop()
+
+    async def timed(name: str, worker: _Worker, seq: int, scheduled: float) -> None:
+        ok = True
+        try:
+            await OPERATIONS[name](worker, ctx, seq)
+        except Exception as e:
+            ok = False
+            logger.debug(f"{name} thất bại: {e}")
+        # Tính từ thời điểm lên lịch để độ trễ không bị che khuất khi client gửi chậm hơn tốc độ mục tiêu
+        samples.append(_Sample(name, loop.time() - scheduled, ok))
+
+    tasks = []
+    started = loop.time()
+    for seq in range(int(rate * duration)):
+        scheduled = started + seq / rate
+        await asyncio.sleep(max(0.0, scheduled - loop.time()))
+        name = ctx.rng.choices(names, weights)[0]
+        tasks.append(asyncio.create_task(timed(name, workers[seq % len(workers)], seq, scheduled)))
+    await asyncio.gather(*tasks)
+    return samples
+
+
+async def _run(
+    algod_client: AlgodClient, app_id: int, accounts: list[Account], config: BenchmarkConfig
+) -> dict[str, Any]:
+    mix = parse_workload(config.workload)
+    ctx = _Context(documents=[], rng=random.Random(config.seed))
+    async with AsyncAlgodClient() as algod:
+        workers = []
+        for i, sender in enumerate(accounts):
+            reader = ReadOnlyClient(algod_client, app_id, sender.address)
+            workers.append(_Worker(i, sender, AsyncContractClient(algod, app_id, sender), reader))
+        await _seed(workers[0], ctx, config.seed_documents)
+        logger.info(f"Đã nạp {config.seed_documents} tài liệu, bắt đầu đo workload {config.workload}")
+        started = time.perf_counter()
+        samples = await _drive(workers, ctx, mix, config.rate, config.duration)
+        seconds = time.perf_counter() - started
+    return {"seconds": seconds, "methods": summarize(samples, seconds)}
+
+
+def run_benchmark(algod_client: AlgodClient, app_spec: ApplicationSpecification, config: BenchmarkConfig) -> Path:
+    """Triển khai ứng dụng mới, chạy workload và ghi báo cáo JSON; trả về đường dẫn báo cáo"""
+    dispenser = get_localnet_default_account(algod_client)
+    app_id = deploy_benchmark_app(algod_client, app_spec, dispenser, config.app_funds)
+    accounts = []
+    for _ in range(config.workers):
+        private_key, address = account.generate_account()
+        accounts.append(Account(private_key=private_key, address=address))
+    funds = algos_to_microalgos(config.worker_funds)
+    fund_accounts(algod_client, dispenser, [worker.address for worker in accounts], funds)
+    logger.info(f"Ứng dụng đo tải {app_id}, {config.workers} worker")
+
+    result = asyncio.run(_run(algod_client, app_id, accounts, config))
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "started_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "contract": app_spec.contract.name,
+        "app_id": app_id,
+        "config": {
+            "workload": config.workload,
+            "mix": parse_workload(config.workload),
+            "rate": config.rate,
+            "duration": config.duration,
+            "workers": config.workers,
+            "seed_documents": config.seed_documents,
+            "seed": config.seed,
+        },
+        **result,
+    }
+    config.output_dir.mkdir(parents=True, exist_ok=True)
+    path = config.output_dir / f"{app_spec.contract.name}-{config.workload}-{commit or int(time.time())}.json"
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    log_report(report)
+    if config.baseline is not None:
+        for line in compare_reports(json.loads(config.baseline.read_text()), report):
+            logger.info(line)
+    logger.info(f"Đã ghi báo cáo đo tải vào {path}")
+    return path
+
+
+def log_report(report: dict[str, Any]) -> None:
+    for name, stats in report["methods"].items():
+        logger.info(
+            f"{name}: {stats['calls']} lời gọi, {stats['tps']:.1f} TPS, "
+            f"p50 {stats['p50_ms']:.0f}ms, p95 {stats['p95_ms']:.0f}ms, p99 {stats['p99_ms']:.0f}ms, "
+            f"lỗi {stats['failure_rate']:.1%}"
+        )
+
+
+def compare_reports(baseline: dict[str, Any], current: dict[str, Any]) -> list[str]:
+    """Chênh lệch TPS, p95 và tỉ lệ lỗi của từng thao tác so với báo cáo trước"""
+    lines = [f"So với {baseline.get('commit') or 'báo cáo cũ'}:"]
+    for name, stats in current["methods"].items():
+        old = baseline["methods"].get(name)
+        if old is None:
+            lines.append(f"  {name}: mới")
+            continue
+        lines.append(
+            f"  {name}: TPS {old['tps']:.1f} -> {stats['tps']:.1f}, "
+            f"p95 {old['p95_ms']:.0f}ms -> {stats['p95_ms']:.0f}ms, "
+            f"lỗi {old['failure_rate']:.1%} -> {stats['failure_rate']:.1%}"
+        )
+    return lines
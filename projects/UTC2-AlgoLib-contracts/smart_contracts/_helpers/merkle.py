@@ -0,0 +1,176 @@
+"""Cây Merkle cho việc neo dữ liệu theo lô.
+
+Lá = SHA-256(0x00 | dữ liệu), nút = SHA-256(0x01 | trái | phải). Cây được dựng theo kiểu
+luồng: các cây con hoàn chỉnh có cùng độ cao được gộp ngay khi xuất hiện, phần còn lại
+được gộp từ phải sang trái ở cuối. Bộ nhớ chỉ tỉ lệ với log(n) cộng số bằng chứng cần lấy.
+"""
+
+import dataclasses
+import hashlib
+import itertools
+import logging
+import os
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from algokit_utils import Account
+from algosdk import abi
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, AtomicTransactionComposer
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers.boxes import merkle_root_box
+
+logger = logging.getLogger(__name__)
+
+ANCHOR_MERKLE_ROOT_METHOD = abi.Method.from_signature("anchor_merkle_root(byte[],uint64,string)string")
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+# Số phần tử được băm song song trong một lượt
+DEFAULT_BATCH_SIZE = 4096
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+@dataclasses.dataclass
+class MerkleProof:
+    """Bằng chứng thuộc cây: các nút anh em từ lá lên gốc; bit i của path_bits bằng 1 khi anh em nằm bên trái"""
+
+    index: int
+    item: bytes
+    siblings: list[bytes]
+    path_bits: int
+
+    @property
+    def leaf(self) -> bytes:
+        return leaf_hash(self.item)
+
+    def encode(self) -> bytes:
+        """Dạng nhị phân gửi cho verify_merkle_inclusion: các hash 32 byte nối liền nhau"""
+        return b"".join(self.siblings)
+
+
+@dataclasses.dataclass
+class _Subtree:
+    height: int
+    hash: bytes
+    # Chỉ số lá cần bằng chứng -> danh sách (anh em, anh em nằm bên trái)
+    paths: dict[int, list[tuple[bytes, bool]]]
+
+
+def _merge(left: _Subtree, right: _Subtree) -> _Subtree:
+    for path in left.paths.values():
+        path.append((right.hash, False))
+    for path in right.paths.values():
+        path.append((left.hash, True))
+    return _Subtree(max(left.height, right.height) + 1, node_hash(left.hash, right.hash), left.paths | right.paths)
+
+
+@dataclasses.dataclass
+class MerkleTree:
+    root: bytes
+    leaf_count: int
+    proofs: dict[int, MerkleProof]
+
+
+def build_merkle_tree(
+    items: Iterable[bytes],
+    proof_indices: Iterable[int] = (),
+    max_workers: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> MerkleTree:
+    """Dựng cây Merkle từ luồng phần tử, băm lá song song theo từng lô
+
+    Chỉ các lá trong proof_indices được giữ bằng chứng, nên lô 10 triệu phần tử không cần
+    nằm hết trong bộ nhớ.
+    """
+    wanted = set(proof_indices)
+    wanted_items: dict[int, bytes] = {}
+    stack: list[_Subtree] = []
+    leaf_count = 0
+    iterator = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        while batch := list(itertools.islice(iterator, batch_size)):
+            for item, digest in zip(batch, executor.map(leaf_hash, batch), strict=True):
+                paths = {}
+                if leaf_count in wanted:
+                    paths[leaf_count] = []
+                    wanted_items[leaf_count] = item
+                stack.append(_Subtree(0, digest, paths))
+                leaf_count += 1
+                while len(stack) > 1 and stack[-1].height == stack[-2].height:
+                    right = stack.pop()
+                    stack.append(_merge(stack.pop(), right))
+
+    if not stack:
+        raise ValueError("Không thể dựng cây Merkle từ lô rỗng")
+    missing = wanted - wanted_items.keys()
+    if missing:
+        raise ValueError(f"Chỉ số nằm ngoài lô: {sorted(missing)}")
+
+    # Gộp các cây con còn lại từ phải sang trái
+    subtree = stack.pop()
+    while stack:
+        subtree = _merge(stack.pop(), subtree)
+
+    proofs = {}
+    for index, path in subtree.paths.items():
+        path_bits = sum(1 << level for level, (_, is_left) in enumerate(path) if is_left)
+        proofs[index] = MerkleProof(index, wanted_items[index], [sibling for sibling, _ in path], path_bits)
+    return MerkleTree(subtree.hash, leaf_count, proofs)
+
+
+def valid_proof_shape(leaf_count: int, proof_length: int, path_bits: int) -> bool:
+    """Độ dài bằng chứng có khớp độ sâu của lá trong cây leaf_count lá không (giống _valid_merkle_path)
+
+    Các cây con hoàn chỉnh ứng với các bit của leaf_count, lớn nhất bên trái, được gộp từ phải
+    sang trái; đi từ gốc xuống theo path_bits để tìm cây con chứa lá.
+    """
+    if leaf_count == 0 or path_bits >> proof_length:
+        return False
+    heights = [height for height in range(leaf_count.bit_length() - 1, -1, -1) if leaf_count >> height & 1]
+    level = proof_length
+    index = 0
+    while index < len(heights) - 1:
+        if level == 0:
+            return False
+        level -= 1
+        if not path_bits >> level & 1:
+            break
+        index += 1
+    return level == heights[index]
+
+
+def verify_proof(root: bytes, leaf_count: int, proof: MerkleProof) -> bool:
+    """Kiểm tra bằng chứng theo đúng thuật toán của verify_merkle_inclusion trên hợp đồng"""
+    if not valid_proof_shape(leaf_count, len(proof.siblings), proof.path_bits):
+        return False
+    node = proof.leaf
+    for level, sibling in enumerate(proof.siblings):
+        node = node_hash(sibling, node) if proof.path_bits >> level & 1 else node_hash(node, sibling)
+    return node == root
+
+
+def anchor_merkle_root(
+    algod_client: AlgodClient, app_id: int, sender: Account, tree: MerkleTree, label: str = ""
+) -> str:
+    """Neo gốc của cây Merkle lên hợp đồng bằng một giao dịch"""
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        app_id=app_id,
+        method=ANCHOR_MERKLE_ROOT_METHOD,
+        sender=sender.address,
+        sp=algod_client.suggested_params(),
+        signer=AccountTransactionSigner(sender.private_key),
+        method_args=[tree.root, tree.leaf_count, label],
+        boxes=[(0, merkle_root_box(tree.root))],
+    )
+    result = atc.execute(algod_client, 4).abi_results[0].return_value
+    logger.info(f"Neo gốc Merkle {tree.root.hex()} ({tree.leaf_count} phần tử): {result}")
+    return result
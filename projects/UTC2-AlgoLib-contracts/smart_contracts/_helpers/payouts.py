@@ -0,0 +1,125 @@
+import logging
+from collections import deque
+from collections.abc import Iterable, Iterator
+
+from algokit_utils import Account
+from algosdk import abi, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, AtomicTransactionComposer
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers.boxes import MAX_APP_ARGS_SIZE, MAX_GROUP_SIZE, return_message
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_TUPLE_TYPE = abi.ABIType.from_string("(string,uint64)")
+TRANSFER_TOKENS_BATCH_METHOD = abi.Method.from_signature("transfer_tokens_batch((string,uint64)[])string")
+
+# Phần app args dành cho danh sách khoản chuyển: trừ selector (4 byte) và độ dài mảng (2 byte)
+_TRANSFERS_ARG_BUDGET = MAX_APP_ARGS_SIZE - 4 - 2
+_WAIT_ROUNDS = 4
+
+
+class PayoutError(Exception):
+    """Một số khoản chi trả không được hợp đồng thực hiện
+
+    Hợp đồng báo lỗi bằng chuỗi trả về thay vì từ chối giao dịch, nên nhóm vẫn được xác nhận;
+    failed ánh xạ từng người nhận chưa được chi trả tới (số token, thông báo của hợp đồng).
+    """
+
+    def __init__(self, failed: dict[str, tuple[int, str]]) -> None:
+        self.failed = failed
+        super().__init__(f"{len(failed)} người nhận chưa được chi trả: {', '.join(failed)}")
+
+
+def net_payouts(payouts: Iterable[tuple[str, int]]) -> dict[str, int]:
+    """Gộp các khoản chi trả cùng người nhận để mỗi số dư chỉ được ghi một lần"""
+    totals: dict[str, int] = {}
+    for recipient, amount in payouts:
+        if amount <= 0:
+            raise ValueError(f"Số lượng token không hợp lệ cho {recipient}: {amount}")
+        totals[recipient] = totals.get(recipient, 0) + amount
+    return totals
+
+
+def pack_payout_groups(payouts: dict[str, int]) -> Iterator[list[list[tuple[str, int]]]]:
+    """Chia các khoản chi trả thành các nhóm nguyên tử đầy, mỗi lần gọi dùng hết giới hạn app args"""
+    group: list[list[tuple[str, int]]] = [[]]
+    call_size = 0
+    for recipient, amount in payouts.items():
+        # 2 byte offset của phần tử trong mảng động cộng phần mã hóa của tuple
+        item_size = len(TRANSFER_TUPLE_TYPE.encode([recipient, amount])) + 2
+        if call_size + item_size > _TRANSFERS_ARG_BUDGET:
+            if len(group) == MAX_GROUP_SIZE:
+                yield group
+                group = [[]]
+            else:
+                group.append([])
+            call_size = 0
+        group[-1].append((recipient, amount))
+        call_size += item_size
+
+    if group[0]:
+        yield group
+
+
+def _check_group(
+    algod_client: AlgodClient, txids: list[str], group: list[list[tuple[str, int]]], failed: dict[str, tuple[int, str]]
+) -> None:
+    """Đọc giá trị trả về của từng lời gọi trong nhóm đã xác nhận, ghi lại các người nhận bị từ chối"""
+    for txid, call in zip(txids, group, strict=True):
+        message = return_message(algod_client.pending_transaction_info(txid)) or "Không có giá trị trả về"
+        if not message.startswith("Đã"):
+            for recipient, amount in call:
+                failed[recipient] = (amount, message)
+
+
+def send_payouts(
+    algod_client: AlgodClient,
+    app_id: int,
+    sender: Account,
+    payouts: Iterable[tuple[str, int]],
+    max_in_flight: int = 4,
+) -> int:
+    """Chi trả token cho nhiều người nhận bằng transfer_tokens_batch, trả về số nhóm đã gửi
+
+    Mọi nhóm đều được gửi và chờ xác nhận; sau đó PayoutError liệt kê những người nhận mà
+    lời gọi tương ứng không trả về thông báo thành công.
+    """
+    signer = AccountTransactionSigner(sender.private_key)
+    totals = net_payouts(payouts)
+    sp = algod_client.suggested_params()
+    pending: deque[tuple[list[str], list[list[tuple[str, int]]]]] = deque()
+    failed: dict[str, tuple[int, str]] = {}
+    sent = 0
+
+    def confirm_oldest() -> None:
+        txids, group = pending.popleft()
+        transaction.wait_for_confirmation(algod_client, txids[-1], _WAIT_ROUNDS)
+        _check_group(algod_client, txids, group, failed)
+
+    for group in pack_payout_groups(totals):
+        atc = AtomicTransactionComposer()
+        for call in group:
+            atc.add_method_call(
+                app_id=app_id,
+                method=TRANSFER_TOKENS_BATCH_METHOD,
+                sender=sender.address,
+                sp=sp,
+                signer=signer,
+                method_args=[[list(item) for item in call]],
+            )
+        signed = atc.gather_signatures()
+        algod_client.send_transactions(signed)
+        pending.append(([txn.get_txid() for txn in signed], group))
+        sent += 1
+        if len(pending) >= max_in_flight:
+            confirm_oldest()
+
+    while pending:
+        confirm_oldest()
+
+    paid = {recipient: amount for recipient, amount in totals.items() if recipient not in failed}
+    logger.info(f"Đã chi trả {sum(paid.values())} token cho {len(paid)} người nhận trong {sent} nhóm")
+    if failed:
+        raise PayoutError(failed)
+    return sent
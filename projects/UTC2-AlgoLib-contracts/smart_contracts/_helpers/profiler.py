@@ -0,0 +1,346 @@
+"""Đo chi phí opcode và I/O box của từng phương thức ABI theo kích thước trạng thái.
+
+Với mỗi kích thước (số tài liệu đã nạp), mọi phương thức có tham số mẫu được mô phỏng qua
+simulate với exec trace: ngân sách opcode đã dùng, box được chạm tới và số byte box đọc/ghi,
+số lời gọi ứng dụng và giao dịch con. Kết quả là đường cong theo kích thước của từng phương
+thức; so với baseline đã lưu, phương thức nào tăng quá tolerance hoặc vượt giới hạn của một
+nhóm giao dịch được báo là hồi quy.
+"""
+
+import base64
+import dataclasses
+import hashlib
+import json
+import logging
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from algokit_utils import Account, ApplicationSpecification, get_localnet_default_account
+from algosdk import abi, account
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, EmptySigner
+from algosdk.error import AlgodHTTPError
+from algosdk.util import algos_to_microalgos
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.models import SimulateRequest, SimulateTraceConfig
+
+from smart_contracts._helpers.boxes import (
+    APP_CALL_OPCODE_BUDGET,
+    MAX_BOX_REFS_PER_TXN,
+    MAX_GROUP_SIZE,
+    MAX_READ_LENGTH,
+    RESOURCE_CHUNK_SIZE,
+)
+from smart_contracts._helpers.ingest import pack_groups, submit_groups
+from smart_contracts._helpers.loadtest import BENCHMARK_DIR, _git_commit, deploy_benchmark_app, fund_accounts
+
+logger = logging.getLogger(__name__)
+
+BASELINE_FILE_NAME = "profile_baseline.json"
+DEFAULT_SIZES = (0, 10, 50, 100)
+# Tăng quá tỉ lệ này so với baseline được coi là hồi quy
+DEFAULT_TOLERANCE = 0.05
+# Giới hạn của một nhóm giao dịch: ngân sách opcode dùng chung và số box reference
+GROUP_OPCODE_BUDGET = MAX_GROUP_SIZE * APP_CALL_OPCODE_BUDGET
+GROUP_BOX_REFS = MAX_GROUP_SIZE * MAX_BOX_REFS_PER_TXN
+# Ngân sách cộng thêm khi mô phỏng để đo được cả phương thức vượt ngân sách
+_EXTRA_OPCODE_BUDGET = 320_000
+# Mỗi box reference cho phép đọc/ghi RESOURCE_CHUNK_SIZE byte
+_BOX_IO_QUOTA = RESOURCE_CHUNK_SIZE
+_CONTENT_SIZE = 600
+_FIELDS = ("tin-hoc", "toan", "vat-ly", "kinh-te")
+METRICS = ("opcodes", "box_refs", "box_bytes_read", "box_bytes_written", "app_calls", "inner_txns")
+
+
+@dataclasses.dataclass
+class ProfileConfig:
+    sizes: tuple[int, ...] = DEFAULT_SIZES
+    tolerance: float = DEFAULT_TOLERANCE
+    update_baseline: bool = False
+    output_dir: Path = BENCHMARK_DIR
+
+
+@dataclasses.dataclass
+class _Probe:
+    """Giá trị mẫu dùng để dựng tham số cho các phương thức"""
+
+    sender: str
+    doc_id: str
+    digest: bytes = hashlib.sha256(b"profile").digest()
+
+
+_ARGS: dict[str, Callable[[_Probe], list[Any]]] = {
+    "add_resource": lambda p: ["profile-new", "x" * _CONTENT_SIZE],
+    "read_resource": lambda p: [p.doc_id, 0, MAX_READ_LENGTH],
+    "store_data_hash": lambda p: ["dữ liệu mẫu"],
+    "anchor_data_hash": lambda p: [p.digest, "nhãn"],
+    "verify_data_hash": lambda p: [p.digest],
+    "get_data_anchor": lambda p: [p.digest],
+    "anchor_merkle_root": lambda p: [p.digest, 4, "nhãn"],
+    # Bằng chứng 2 mức khớp với lô 4 phần tử ở trên
+    "verify_merkle_inclusion": lambda p: [p.digest, b"profile", p.digest * 2, 0],
+    "verify_data_integrity": lambda p: ["dữ liệu mẫu"],
+    "check_access_rights": lambda p: [p.doc_id, p.sender, "read"],
+    "check_access_rights_batch": lambda p: [[(p.doc_id, p.sender, 1)] * 4],
+    "buy_tokens": lambda p: [1],
+    "transfer_tokens": lambda p: [p.sender, 1],
+    "transfer_tokens_batch": lambda p: [[(p.sender, 1)] * 4],
+    # access_resource_with_session cần token phiên nên không có tham số mẫu
+    "access_resource": lambda p: [p.doc_id, 1],
+    "get_token_balance": lambda p: [],
+    "pad_budget": lambda p: [],
+    "add_document": lambda p: ["profile-new", "Tiêu đề", "tac-gia-0", 2020, _FIELDS[0], "x" * _CONTENT_SIZE],
+    "add_documents": lambda p: [
+        [(f"profile-new-{i}", "Tiêu đề", "tac-gia-0", 2020, _FIELDS[0], "x" * _CONTENT_SIZE) for i in range(2)]
+    ],
+    "search_documents": lambda p: [_FIELDS[0], "", 0, 0, 0],
+    "search_documents_page": lambda p: [_FIELDS[0], "", 0, 0, 20, ""],
+    "get_document_content": lambda p: [p.doc_id, 0, MAX_READ_LENGTH],
+    "create_token": lambda p: ["token"],
+    "get_token_owner": lambda p: [1],
+    "create_resource": lambda p: ["tài nguyên"],
+    "check_resource_access": lambda p: [1, p.sender],
+}
+
+
+def profiled_methods(app_spec: ApplicationSpecification) -> tuple[list[abi.Method], list[str]]:
+    """Các phương thức có tham số mẫu và tên các phương thức bị bỏ qua
+
+    Phương thức cần session token (tham số user_token) hoặc khóa mã hóa không có tham số mẫu.
+    """
+    methods, skipped = [], []
+    for method in app_spec.contract.methods:
+        if method.name in _ARGS and not any(arg.name == "user_token" for arg in method.args):
+            methods.append(method)
+        else:
+            skipped.append(method.get_signature())
+    return methods, skipped
+
+
+def _method_key(method: abi.Method, methods: list[abi.Method]) -> str:
+    # Phương thức nạp chồng (cùng tên) được phân biệt bằng chữ ký
+    overloaded = sum(other.name == method.name for other in methods) > 1
+    return method.get_signature() if overloaded else method.name
+
+
+def _iter_txn_results(txn_results: Iterable[dict[str, Any]]) -> Iterable[dict[str, Any]]:
+    """Duyệt kết quả giao dịch cùng toàn bộ giao dịch con lồng nhau"""
+    for result in txn_results:
+        yield result
+        yield from _iter_txn_results(result.get("inner-txns", []))
+
+
+def _box_writes(trace: dict[str, Any]) -> int:
+    written = 0
+    for step in trace.get("approval-program-trace", []):
+        for change in step.get("state-changes", []):
+            if change.get("app-state-type") == "b" and change.get("operation") == "w":
+                written += len(base64.b64decode(change.get("new-value", {}).get("bytes", "")))
+    for inner in trace.get("inner-trace", []):
+        written += _box_writes(inner)
+    return written
+
+
+def measure(group_result: dict[str, Any], box_size: Callable[[bytes], int]) -> dict[str, int]:
+    """Chỉ số của một nhóm đã mô phỏng; box_size trả về kích thước hiện tại của box theo tên"""
+    boxes: set[bytes] = set()
+    for resources in [group_result.get("unnamed-resources-accessed", {})] + [
+        result.get("unnamed-resources-accessed", {}) for result in group_result.get("txn-results", [])
+    ]:
+        boxes.update(base64.b64decode(box["name"]) for box in resources.get("boxes", []))
+
+    app_calls = inner_txns = written = 0
+    for result in group_result.get("txn-results", []):
+        written += _box_writes(result.get("exec-trace", {}))
+        inner = list(_iter_txn_results(result["txn-result"].get("inner-txns", [])))
+        inner_txns += len(inner)
+        app_calls += 1 + sum(item["txn"]["txn"].get("type") == "appl" for item in inner)
+
+    read = sum(box_size(name) for name in boxes)
+    return {
+        "opcodes": group_result.get("app-budget-consumed", 0),
+        # Box lớn cần thêm reference để đủ hạn mức đọc/ghi
+        "box_refs": max(len(boxes), -(-max(read, written) // _BOX_IO_QUOTA)),
+        "box_bytes_read": read,
+        "box_bytes_written": written,
+        "app_calls": app_calls,
+        "inner_txns": inner_txns,
+    }
+
+
+def limit_violations(point: dict[str, Any]) -> list[str]:
+    problems = []
+    if point["opcodes"] > GROUP_OPCODE_BUDGET:
+        problems.append(f"{point['opcodes']} opcode vượt ngân sách nhóm {GROUP_OPCODE_BUDGET}")
+    if point["box_refs"] > GROUP_BOX_REFS:
+        problems.append(f"{point['box_refs']} box reference vượt giới hạn nhóm {GROUP_BOX_REFS}")
+    return problems
+
+
+def _simulate(
+    algod_client: AlgodClient, app_id: int, sender: str, method: abi.Method, args: list[Any]
+) -> dict[str, Any]:
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        app_id=app_id,
+        method=method,
+        sender=sender,
+        sp=algod_client.suggested_params(),
+        signer=EmptySigner(),
+        method_args=args,
+    )
+    request = SimulateRequest(
+        txn_groups=[],
+        allow_empty_signatures=True,
+        allow_unnamed_resources=True,
+        extra_opcode_budget=_EXTRA_OPCODE_BUDGET,
+        exec_trace_config=SimulateTraceConfig(enable=True, state_change=True),
+    )
+    response = atc.simulate(algod_client, request)
+    group_result: dict[str, Any] = response.simulate_response["txn-groups"][0]
+    if response.failure_message:
+        group_result["failure-message"] = response.failure_message
+    return group_result
+
+
+def _box_size_lookup(algod_client: AlgodClient, app_id: int) -> Callable[[bytes], int]:
+    sizes: dict[bytes, int] = {}
+
+    def box_size(name: bytes) -> int:
+        if name not in sizes:
+            try:
+                value = algod_client.application_box_by_name(app_id, name)["value"]
+                sizes[name] = len(base64.b64decode(value))
+            except AlgodHTTPError as e:
+                if e.code != 404:
+                    raise
+                # Box được tạo trong chính lời gọi
+                sizes[name] = 0
+        return sizes[name]
+
+    return box_size
+
+
+def _records(start: int, stop: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "doc_id": f"doc-{i}",
+            "title": f"Tiêu đề {i}",
+            "author": f"tac-gia-{i % 16}",
+            "year": 2000 + i % 25,
+            "field": _FIELDS[i % len(_FIELDS)],
+            "content": "x" * _CONTENT_SIZE,
+        }
+        for i in range(start, stop)
+    ]
+
+
+def growth(points: list[dict[str, Any]], metric: str) -> float:
+    """Độ dốc bình phương tối thiểu của metric theo số tài liệu (chi phí thêm cho mỗi tài liệu)"""
+    if len(points) < 2:
+        return 0.0
+    xs = [point["size"] for point in points]
+    ys = [point[metric] for point in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys, strict=True)) / variance
+
+
+def profile_contract(algod_client: AlgodClient, app_spec: ApplicationSpecification, sizes: Iterable[int]) -> dict:
+    """Tạo ứng dụng mới, nạp dần tài liệu tới từng kích thước và đo mọi phương thức ở mỗi mức"""
+    dispenser = get_localnet_default_account(algod_client)
+    app_id = deploy_benchmark_app(algod_client, app_spec, dispenser, app_funds=100)
+    private_key, address = account.generate_account()
+    profiler = Account(private_key=private_key, address=address)
+    fund_accounts(algod_client, dispenser, [address], algos_to_microalgos(100))
+
+    methods, skipped = profiled_methods(app_spec)
+    if skipped:
+        logger.info(f"Bỏ qua các phương thức không có tham số mẫu: {', '.join(skipped)}")
+    curves: dict[str, list[dict[str, Any]]] = {_method_key(method, methods): [] for method in methods}
+
+    loaded = 0
+    for size in sorted(set(sizes)):
+        if size > loaded:
+            submit_groups(algod_client, app_id, profiler, pack_groups(_records(loaded, size)))
+            loaded = size
+        probe = _Probe(sender=address, doc_id="doc-0" if loaded else "missing")
+        box_size = _box_size_lookup(algod_client, app_id)
+        for method in methods:
+            group_result = _simulate(algod_client, app_id, address, method, _ARGS[method.name](probe))
+            point: dict[str, Any] = {"size": size, **measure(group_result, box_size)}
+            if "failure-message" in group_result:
+                point["error"] = group_result["failure-message"]
+            curves[_method_key(method, methods)].append(point)
+        logger.info(f"Đã đo {len(methods)} phương thức với {size} tài liệu")
+
+    return {
+        "contract": app_spec.contract.name,
+        "commit": _git_commit(),
+        "sizes": sorted(set(sizes)),
+        "methods": {
+            name: {"points": points, "growth": {metric: growth(points, metric) for metric in METRICS}}
+            for name, points in curves.items()
+        },
+    }
+
+
+def check_regressions(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """So sánh từng phương thức ở cùng kích thước với baseline; trả về danh sách hồi quy
+
+    Phương thức có trong baseline nhưng không còn được đo, và lời gọi trước đây chạy được nay bị
+    từ chối, cũng là hồi quy.
+    """
+    baseline_methods = baseline.get("methods", {})
+    missing = [name for name in baseline_methods if name not in current["methods"]]
+    regressions = [f"{name}: có trong baseline nhưng không còn được đo" for name in missing]
+    for name, profile in current["methods"].items():
+        old_points = {point["size"]: point for point in baseline_methods.get(name, {}).get("points", [])}
+        for point in profile["points"]:
+            old = old_points.get(point["size"])
+            if "error" in point:
+                if old is not None and "error" not in old:
+                    regressions.append(
+                        f"{name} @ {point['size']} tài liệu: baseline chạy được, nay lỗi {point['error']}"
+                    )
+                continue
+            regressions += [f"{name} @ {point['size']} tài liệu: {problem}" for problem in limit_violations(point)]
+            if old is None or "error" in old:
+                continue
+            for metric in METRICS:
+                # Cho phép tăng ít nhất 1 đơn vị để chỉ số nhỏ (0, 1) không báo hồi quy giả
+                allowed = max(old[metric] * (1 + tolerance), old[metric] + 1)
+                if point[metric] > allowed:
+                    regressions.append(
+                        f"{name} @ {point['size']} tài liệu: {metric} {old[metric]} -> {point[metric]}"
+                    )
+    return regressions
+
+
+def log_profile(profile: dict) -> None:
+    for name, data in profile["methods"].items():
+        curve = ", ".join(f"{point['size']}: {point['opcodes']}" for point in data["points"])
+        logger.info(
+            f"{name}: opcode theo số tài liệu [{curve}], "
+            f"+{data['growth']['opcodes']:.1f} opcode và +{data['growth']['box_bytes_read']:.0f} byte box/tài liệu"
+        )
+
+
+def run_profile(
+    algod_client: AlgodClient, app_spec: ApplicationSpecification, baseline_path: Path, config: ProfileConfig
+) -> list[str]:
+    """Đo, ghi báo cáo và so với baseline; trả về các hồi quy (rỗng khi đạt)"""
+    profile = profile_contract(algod_client, app_spec, config.sizes)
+    log_profile(profile)
+    config.output_dir.mkdir(parents=True, exist_ok=True)
+    report_path = config.output_dir / f"profile-{profile['contract']}-{profile['commit'] or 'local'}.json"
+    report_path.write_text(json.dumps(profile, indent=2) + "\n")
+    logger.info(f"Đã ghi báo cáo profile vào {report_path}")
+
+    if config.update_baseline or not baseline_path.exists():
+        baseline_path.write_text(json.dumps(profile, indent=2) + "\n")
+        logger.info(f"Đã cập nhật baseline {baseline_path}")
+        return []
+    return check_regressions(json.loads(baseline_path.read_text()), profile, config.tolerance)
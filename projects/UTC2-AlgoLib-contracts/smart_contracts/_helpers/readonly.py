@@ -0,0 +1,136 @@
+"""Gọi các phương thức chỉ đọc (readonly) của hợp đồng qua algod simulate.
+
+Không ký, không trả phí và không chờ vòng: mỗi nhóm tối đa 16 lời gọi được mô phỏng bằng một
+yêu cầu HTTP với chữ ký rỗng. Box và reference không cần khai báo trước vì yêu cầu bật
+allow_unnamed_resources.
+"""
+
+import itertools
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from algosdk import abi
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, EmptySigner
+from algosdk.transaction import SuggestedParams
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.models import SimulateRequest
+
+from smart_contracts._helpers.boxes import MAX_GROUP_SIZE, MAX_READ_LENGTH
+
+CHECK_ACCESS_RIGHTS_METHOD = abi.Method.from_signature("check_access_rights(string,string,string)string")
+CHECK_ACCESS_RIGHTS_BATCH_METHOD = abi.Method.from_signature(
+    "check_access_rights_batch((string,string,uint64)[])bool[]"
+)
+GET_TOKEN_BALANCE_METHOD = abi.Method.from_signature("get_token_balance()uint64")
+SEARCH_DOCUMENTS_METHOD = abi.Method.from_signature("search_documents(string,string,uint64,uint64,uint64)string")
+SEARCH_DOCUMENTS_PAGE_METHOD = abi.Method.from_signature(
+    "search_documents_page(string,string,uint64,uint64,uint64,string)((string,string,string,uint64,string)[],string)"
+)
+GET_DOCUMENT_CONTENT_METHOD = abi.Method.from_signature("get_document_content(string,uint64,uint64)string")
+READ_RESOURCE_METHOD = abi.Method.from_signature("read_resource(string,uint64,uint64)string")
+VERIFY_DATA_HASH_METHOD = abi.Method.from_signature("verify_data_hash(byte[])string")
+GET_TOKEN_OWNER_METHOD = abi.Method.from_signature("get_token_owner(uint64)address")
+CHECK_RESOURCE_ACCESS_METHOD = abi.Method.from_signature("check_resource_access(uint64,address)bool")
+
+# Suggested params còn hiệu lực 1000 vòng, làm mới sau khoảng thời gian này là đủ
+DEFAULT_PARAMS_TTL = 60.0  # giây
+DEFAULT_MAX_WORKERS = 4
+
+
+class ReadOnlyCallError(Exception):
+    """Lời gọi chỉ đọc thất bại khi mô phỏng"""
+
+
+class ReadOnlyClient:
+    """Thực thi các lời gọi chỉ đọc bằng simulate thay vì gửi giao dịch trả phí
+
+    sender là địa chỉ được dùng làm người gọi (ảnh hưởng tới get_token_balance, ...); tài
+    khoản phải tồn tại trên mạng nhưng không cần khóa bí mật.
+    """
+
+    def __init__(
+        self,
+        algod_client: AlgodClient,
+        app_id: int,
+        sender: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        params_ttl: float = DEFAULT_PARAMS_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.algod_client = algod_client
+        self.app_id = app_id
+        self.sender = sender
+        self.max_workers = max_workers
+        self.params_ttl = params_ttl
+        self.clock = clock
+        self._sp: SuggestedParams | None = None
+        self._sp_expires_at = 0.0
+
+    def _suggested_params(self) -> SuggestedParams:
+        if self._sp is None or self.clock() >= self._sp_expires_at:
+            self._sp = self.algod_client.suggested_params()
+            self._sp_expires_at = self.clock() + self.params_ttl
+        return self._sp
+
+    def call(self, method: abi.Method, args: Sequence[Any] = ()) -> Any:
+        return self.call_many([(method, args)])[0]
+
+    def call_many(self, calls: Iterable[tuple[abi.Method, Sequence[Any]]]) -> list[Any]:
+        """Mô phỏng nhiều lời gọi, mỗi nhóm 16 lời gọi là một yêu cầu simulate; giữ nguyên thứ tự kết quả"""
+        sp = self._suggested_params()
+        calls = list(calls)
+        groups = [calls[start : start + MAX_GROUP_SIZE] for start in range(0, len(calls), MAX_GROUP_SIZE)]
+        if len(groups) <= 1:
+            results = [self._simulate_group(group, sp) for group in groups]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(lambda group: self._simulate_group(group, sp), groups))
+        return list(itertools.chain.from_iterable(results))
+
+    def _simulate_group(self, calls: list[tuple[abi.Method, Sequence[Any]]], sp: SuggestedParams) -> list[Any]:
+        atc = AtomicTransactionComposer()
+        signer = EmptySigner()
+        for index, (method, args) in enumerate(calls):
+            atc.add_method_call(
+                app_id=self.app_id,
+                method=method,
+                sender=self.sender,
+                sp=sp,
+                signer=signer,
+                method_args=list(args),
+                # Các lời gọi giống hệt nhau trong cùng nhóm sẽ trùng txid
+                note=index.to_bytes(1, "big"),
+            )
+        request = SimulateRequest(txn_groups=[], allow_empty_signatures=True, allow_unnamed_resources=True)
+        response = atc.simulate(self.algod_client, request)
+        if response.failure_message:
+            method = calls[response.failed_at[0]][0] if response.failed_at else None
+            raise ReadOnlyCallError(f"{method.name if method else 'simulate'}: {response.failure_message}")
+        for result in response.abi_results:
+            if result.decode_error:
+                raise ReadOnlyCallError(f"{result.method.name}: {result.decode_error}")
+        return [result.return_value for result in response.abi_results]
+
+    def check_access_rights(self, resource_id: str, user_address: str, action: str) -> str:
+        return self.call(CHECK_ACCESS_RIGHTS_METHOD, [resource_id, user_address, action])  # type: ignore[no-any-return]
+
+    def get_token_balance(self) -> int:
+        return self.call(GET_TOKEN_BALANCE_METHOD)  # type: ignore[no-any-return]
+
+    def search_documents(
+        self, field: str = "", author: str = "", year: int = 0, year_from: int = 0, year_to: int = 0
+    ) -> str:
+        return self.call(  # type: ignore[no-any-return]
+            SEARCH_DOCUMENTS_METHOD, [field, author, year, year_from, year_to]
+        )
+
+    def get_document_content(self, doc_id: str, offset: int = 0, length: int = MAX_READ_LENGTH) -> str:
+        return self.call(GET_DOCUMENT_CONTENT_METHOD, [doc_id, offset, length])  # type: ignore[no-any-return]
+
+    def get_token_owner(self, token_id: int) -> str:
+        return self.call(GET_TOKEN_OWNER_METHOD, [token_id])  # type: ignore[no-any-return]
+
+    def check_resource_access(self, resource_id: int, address: str) -> bool:
+        return self.call(CHECK_RESOURCE_ACCESS_METHOD, [resource_id, address])  # type: ignore[no-any-return]
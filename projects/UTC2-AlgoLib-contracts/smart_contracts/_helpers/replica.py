@@ -0,0 +1,341 @@
+import base64
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from algosdk import abi
+from algosdk.v2client.indexer import IndexerClient
+
+from smart_contracts._helpers.boxes import (
+    ACCESS_RIGHT_BITS,
+    ADD_DOCUMENT_METHOD,
+    ADD_DOCUMENTS_METHOD,
+    parse_rights,
+    return_message,
+)
+
+logger = logging.getLogger(__name__)
+
+ADD_RESOURCE = abi.Method.from_signature("add_resource(string,string)string")
+SET_RESOURCE_OWNER = abi.Method.from_signature("set_resource_owner(string,string,string)string")
+SET_ACCESS_RIGHTS = abi.Method.from_signature("set_access_rights(string,string,string,string)string")
+BUY_TOKENS = abi.Method.from_signature("buy_tokens(uint64)string")
+TRANSFER_TOKENS = abi.Method.from_signature("transfer_tokens(string,uint64)string")
+TRANSFER_TOKENS_BATCH = abi.Method.from_signature("transfer_tokens_batch((string,uint64)[])string")
+ACCESS_RESOURCE = abi.Method.from_signature("access_resource(string,uint64)string")
+ADD_ENCRYPTED_RESOURCE = abi.Method.from_signature("add_encrypted_resource(string,string,string)string")
+ACCESS_ENCRYPTED_RESOURCE = abi.Method.from_signature("access_encrypted_resource(string,uint64,string)string")
+SET_GROUP_RIGHTS = abi.Method.from_signature("set_group_rights(string,string,string,string)string")
+ADD_GROUP_MEMBER = abi.Method.from_signature("add_group_member(string,string,string)string")
+REMOVE_GROUP_MEMBER = abi.Method.from_signature("remove_group_member(string,string,string)string")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    resource_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS encrypted_resources (
+    resource_id TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    field TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_field ON documents (field, doc_id);
+CREATE INDEX IF NOT EXISTS idx_documents_author ON documents (author, doc_id);
+CREATE INDEX IF NOT EXISTS idx_documents_year ON documents (year, doc_id);
+CREATE TABLE IF NOT EXISTS resource_owners (
+    resource_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resource_owners_owner ON resource_owners (owner);
+CREATE TABLE IF NOT EXISTS access_rights (
+    resource_id TEXT NOT NULL,
+    address TEXT NOT NULL,
+    mask INTEGER NOT NULL,
+    PRIMARY KEY (resource_id, address)
+);
+CREATE INDEX IF NOT EXISTS idx_access_rights_address ON access_rights (address);
+CREATE TABLE IF NOT EXISTS group_rights (
+    resource_id TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    mask INTEGER NOT NULL,
+    PRIMARY KEY (resource_id, group_id)
+);
+CREATE TABLE IF NOT EXISTS group_members (
+    address TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    PRIMARY KEY (address, group_id)
+);
+CREATE TABLE IF NOT EXISTS token_balances (
+    address TEXT PRIMARY KEY,
+    balance INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _decode_args(method: abi.Method, app_args: list[bytes]) -> list:
+    return [arg.type.decode(raw) for arg, raw in zip(method.args, app_args[1:], strict=False)]
+
+
+class StateReplica:
+    """Bản sao trạng thái hợp đồng trong SQLite, cập nhật từ các lần gọi đã xác nhận qua Indexer
+
+    Hợp đồng báo lỗi bằng chuỗi trả về thay vì từ chối giao dịch, nên chỉ những lần gọi
+    trả về thông báo thành công ("Đã ...") mới được áp dụng vào bản sao.
+
+    Tài nguyên thêm bằng add_encrypted_resource chỉ được ghi nhận là tồn tại (bảng
+    encrypted_resources): bản mã dùng nonce ngẫu nhiên sinh trên chuỗi, không có trong giao
+    dịch, nên bản sao không dựng lại được dữ liệu và get_resource trả về None cho các tài nguyên này.
+    """
+
+    def __init__(self, db_path: Path | str, indexer_client: IndexerClient, app_id: int) -> None:
+        self.indexer_client = indexer_client
+        self.app_id = app_id
+        self.db = sqlite3.connect(str(db_path))
+        self.db.executescript(_SCHEMA)
+        self._handlers = {
+            ADD_RESOURCE.get_selector(): (ADD_RESOURCE, self._apply_add_resource),
+            SET_RESOURCE_OWNER.get_selector(): (SET_RESOURCE_OWNER, self._apply_set_resource_owner),
+            SET_ACCESS_RIGHTS.get_selector(): (SET_ACCESS_RIGHTS, self._apply_set_access_rights),
+            BUY_TOKENS.get_selector(): (BUY_TOKENS, self._apply_buy_tokens),
+            TRANSFER_TOKENS.get_selector(): (TRANSFER_TOKENS, self._apply_transfer_tokens),
+            TRANSFER_TOKENS_BATCH.get_selector(): (TRANSFER_TOKENS_BATCH, self._apply_transfer_tokens_batch),
+            ACCESS_RESOURCE.get_selector(): (ACCESS_RESOURCE, self._apply_access_resource),
+            ADD_ENCRYPTED_RESOURCE.get_selector(): (ADD_ENCRYPTED_RESOURCE, self._apply_add_encrypted_resource),
+            ACCESS_ENCRYPTED_RESOURCE.get_selector(): (
+                ACCESS_ENCRYPTED_RESOURCE,
+                self._apply_access_encrypted_resource,
+            ),
+            SET_GROUP_RIGHTS.get_selector(): (SET_GROUP_RIGHTS, self._apply_set_group_rights),
+            ADD_GROUP_MEMBER.get_selector(): (ADD_GROUP_MEMBER, self._apply_add_group_member),
+            REMOVE_GROUP_MEMBER.get_selector(): (REMOVE_GROUP_MEMBER, self._apply_remove_group_member),
+            ADD_DOCUMENT_METHOD.get_selector(): (ADD_DOCUMENT_METHOD, self._apply_add_document),
+            ADD_DOCUMENTS_METHOD.get_selector(): (ADD_DOCUMENTS_METHOD, self._apply_add_documents),
+        }
+
+    @property
+    def last_round(self) -> int:
+        row = self.db.execute("SELECT value FROM sync_state WHERE key = 'last_round'").fetchone()
+        return row[0] if row else 0
+
+    def lag(self) -> int:
+        """Số vòng mà bản sao đang chậm hơn Indexer"""
+        return max(self.indexer_client.health()["round"] - self.last_round, 0)
+
+    def _set_last_round(self, round_: int) -> None:
+        self.db.execute(
+            "INSERT INTO sync_state (key, value) VALUES ('last_round', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (round_,),
+        )
+
+    def sync_once(self) -> int:
+        """Áp dụng các lần gọi mới kể từ vòng đã đồng bộ, trả về số giao dịch đã áp dụng
+
+        Sau mỗi trang, vòng đã đồng bộ được nâng lên current-round của Indexer (mọi giao dịch
+        tới vòng đó đã nằm trong kết quả), nên độ trễ không tăng dần khi ứng dụng không có lời gọi mới.
+        """
+        applied = 0
+        next_page = None
+        min_round = self.last_round + 1
+        max_round = self.last_round
+        with self.db:
+            while True:
+                response = self.indexer_client.search_transactions(
+                    application_id=self.app_id,
+                    txn_type="appl",
+                    min_round=min_round,
+                    next_page=next_page,
+                )
+                for txn in response.get("transactions", []):
+                    applied += self.apply_transaction(txn)
+                    max_round = max(max_round, txn["confirmed-round"])
+                max_round = max(max_round, response.get("current-round", 0))
+                self._set_last_round(max_round)
+                next_page = response.get("next-token")
+                if not next_page:
+                    break
+        return applied
+
+    def run(self, poll_interval: float = 2.0) -> None:
+        """Liên tục theo dõi chuỗi và cập nhật bản sao"""
+        while True:
+            applied = self.sync_once()
+            logger.info(f"Bản sao: áp dụng {applied} giao dịch, vòng {self.last_round}, chậm {self.lag()} vòng")
+            time.sleep(poll_interval)
+
+    def apply_transaction(self, txn: dict) -> bool:
+        app_args = [base64.b64decode(arg) for arg in txn["application-transaction"].get("application-args", [])]
+        if not app_args or app_args[0] not in self._handlers:
+            return False
+        message = return_message(txn)
+        if message is None or not message.startswith("Đã"):
+            return False
+
+        method, handler = self._handlers[app_args[0]]
+        handler(txn["sender"], *_decode_args(method, app_args))
+        return True
+
+    def _apply_add_resource(self, sender: str, resource_id: str, resource_data: str) -> None:
+        self.db.execute(
+            "INSERT INTO resources (resource_id, data) VALUES (?, ?) "
+            "ON CONFLICT (resource_id) DO UPDATE SET data = excluded.data",
+            (resource_id, resource_data),
+        )
+
+    def _apply_set_resource_owner(self, sender: str, resource_id: str, owner_address: str, user_token: str) -> None:
+        self.db.execute(
+            "INSERT INTO resource_owners (resource_id, owner) VALUES (?, ?) "
+            "ON CONFLICT (resource_id) DO UPDATE SET owner = excluded.owner",
+            (resource_id, owner_address),
+        )
+
+    def _apply_set_access_rights(
+        self, sender: str, resource_id: str, user_address: str, rights: str, user_token: str
+    ) -> None:
+        self.db.execute(
+            "INSERT INTO access_rights (resource_id, address, mask) VALUES (?, ?, ?) "
+            "ON CONFLICT (resource_id, address) DO UPDATE SET mask = excluded.mask",
+            (resource_id, user_address, parse_rights(rights)),
+        )
+
+    def _apply_set_group_rights(
+        self, sender: str, resource_id: str, group_id: str, rights: str, user_token: str
+    ) -> None:
+        mask = parse_rights(rights)
+        if not mask:
+            self.db.execute("DELETE FROM group_rights WHERE resource_id = ? AND group_id = ?", (resource_id, group_id))
+            return
+        self.db.execute(
+            "INSERT INTO group_rights (resource_id, group_id, mask) VALUES (?, ?, ?) "
+            "ON CONFLICT (resource_id, group_id) DO UPDATE SET mask = excluded.mask",
+            (resource_id, group_id, mask),
+        )
+
+    def _apply_add_group_member(self, sender: str, group_id: str, user_address: str, user_token: str) -> None:
+        self.db.execute(
+            "INSERT OR IGNORE INTO group_members (address, group_id) VALUES (?, ?)", (user_address, group_id)
+        )
+
+    def _apply_remove_group_member(self, sender: str, group_id: str, user_address: str, user_token: str) -> None:
+        self.db.execute("DELETE FROM group_members WHERE address = ? AND group_id = ?", (user_address, group_id))
+
+    def _add_balance(self, address: str, amount: int) -> None:
+        self.db.execute(
+            "INSERT INTO token_balances (address, balance) VALUES (?, ?) "
+            "ON CONFLICT (address) DO UPDATE SET balance = balance + excluded.balance",
+            (address, amount),
+        )
+
+    def _apply_buy_tokens(self, sender: str, amount: int) -> None:
+        self._add_balance(sender, amount)
+
+    def _apply_transfer_tokens(self, sender: str, recipient: str, amount: int) -> None:
+        self._add_balance(sender, -amount)
+        self._add_balance(recipient, amount)
+
+    def _apply_transfer_tokens_batch(self, sender: str, transfers: list) -> None:
+        for recipient, amount in transfers:
+            self._apply_transfer_tokens(sender, recipient, amount)
+
+    def _apply_access_resource(self, sender: str, resource_id: str, token_amount: int) -> None:
+        self._add_balance(sender, -token_amount)
+
+    def _resource_exists(self, resource_id: str) -> bool:
+        """Tương ứng với `resource_id in self.resources` trên chuỗi: tài nguyên thường hoặc đã mã hóa"""
+        return self.get_resource(resource_id) is not None or self.is_encrypted_resource(resource_id)
+
+    def _apply_add_encrypted_resource(
+        self, sender: str, resource_id: str, resource_data: str, encryption_key: str
+    ) -> None:
+        if self._resource_exists(resource_id):
+            return
+        self.db.execute("INSERT OR IGNORE INTO encrypted_resources (resource_id) VALUES (?)", (resource_id,))
+
+    def _apply_access_encrypted_resource(
+        self, sender: str, resource_id: str, token_amount: int, encryption_key: str
+    ) -> None:
+        self._add_balance(sender, -token_amount)
+
+    def _apply_add_document(
+        self, sender: str, doc_id: str, title: str, author: str, year: int, field: str, content: str
+    ) -> None:
+        # Hợp đồng bỏ qua doc_id đã tồn tại dưới dạng tài nguyên bất kỳ, kể cả trong add_documents
+        if self._resource_exists(doc_id):
+            return
+        self.db.execute(
+            "INSERT OR IGNORE INTO documents (doc_id, title, author, year, field) VALUES (?, ?, ?, ?, ?)",
+            (doc_id, title, author, year, field),
+        )
+        self.db.execute("INSERT INTO resources (resource_id, data) VALUES (?, ?)", (doc_id, content))
+
+    def _apply_add_documents(self, sender: str, documents: list) -> None:
+        for document in documents:
+            self._apply_add_document(sender, *document)
+
+    def get_token_balance(self, address: str) -> int:
+        row = self.db.execute("SELECT balance FROM token_balances WHERE address = ?", (address,)).fetchone()
+        return row[0] if row else 0
+
+    def get_resource(self, resource_id: str) -> str | None:
+        row = self.db.execute("SELECT data FROM resources WHERE resource_id = ?", (resource_id,)).fetchone()
+        return row[0] if row else None
+
+    def is_encrypted_resource(self, resource_id: str) -> bool:
+        row = self.db.execute("SELECT 1 FROM encrypted_resources WHERE resource_id = ?", (resource_id,)).fetchone()
+        return row is not None
+
+    def check_access_rights(self, resource_id: str, user_address: str, action: str) -> bool:
+        """Cùng quy tắc với check_access_rights trên chuỗi: quyền riêng, chủ sở hữu, rồi quyền của nhóm"""
+        right = ACCESS_RIGHT_BITS.get(action, 0)
+        row = self.db.execute(
+            "SELECT mask FROM access_rights WHERE resource_id = ? AND address = ?", (resource_id, user_address)
+        ).fetchone()
+        if row is not None:
+            return right != 0 and row[0] & right == right
+        row = self.db.execute("SELECT owner FROM resource_owners WHERE resource_id = ?", (resource_id,)).fetchone()
+        if row is not None and row[0] == user_address:
+            return True
+        group_masks = self.db.execute(
+            "SELECT r.mask FROM group_members m JOIN group_rights r ON r.group_id = m.group_id "
+            "WHERE m.address = ? AND r.resource_id = ?",
+            (user_address, resource_id),
+        ).fetchall()
+        mask = 0
+        for (group_mask,) in group_masks:
+            mask |= group_mask
+        return right != 0 and mask & right == right
+
+    def search_documents(
+        self,
+        field: str | None = None,
+        author: str | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        limit: int = 100,
+    ) -> list[tuple[str, str, str, int, str]]:
+        conditions = []
+        params: list = []
+        for column, operator, value in (
+            ("field", "=", field),
+            ("author", "=", author),
+            ("year", ">=", year_from),
+            ("year", "<=", year_to),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.db.execute(
+            f"SELECT doc_id, title, author, year, field FROM documents {where} ORDER BY doc_id LIMIT ?",
+            (*params, limit),
+        ).fetchall()
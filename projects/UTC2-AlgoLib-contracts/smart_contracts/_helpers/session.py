@@ -0,0 +1,114 @@
+import base64
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from nacl.exceptions import BadSignatureError
+from nacl.signing import SigningKey, VerifyKey
+
+from smart_contracts._helpers.config import SECURITY_CONFIG
+
+# Số token phiên tối đa giữ trong bộ nhớ đệm của bên xác thực
+DEFAULT_CACHE_SIZE = 10_000
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def _signing_key(private_key: str) -> SigningKey:
+    # Khóa bí mật Algorand là base64 của seed 32 byte nối với khóa công khai
+    return SigningKey(base64.b64decode(private_key)[:32])
+
+
+def issuer_public_key(private_key: str) -> bytes:
+    """Khóa công khai ed25519 cần đăng ký trên hợp đồng bằng set_session_issuer"""
+    return bytes(_signing_key(private_key).verify_key)
+
+
+def issue_session_token(
+    private_key: str,
+    address: str,
+    now: int | None = None,
+    timeout: int = SECURITY_CONFIG["session_timeout"],
+) -> str:
+    """Tạo token phiên cho address, hết hạn sau timeout giây"""
+    expiry = (int(time.time()) if now is None else now) + timeout
+    payload = f"{address}|{expiry}".encode()
+    signature = _signing_key(private_key).sign(payload).signature
+    return f"{_b64encode(payload)}.{_b64encode(signature)}"
+
+
+def parse_session_token(token: str) -> tuple[str, int, bytes, bytes]:
+    """Tách token thành (address, expiry, payload, signature), ném ValueError nếu sai định dạng"""
+    payload_part, _, signature_part = token.partition(".")
+    payload = base64.urlsafe_b64decode(payload_part)
+    signature = base64.urlsafe_b64decode(signature_part)
+    address, _, expiry = payload.decode("utf-8").partition("|")
+    return address, int(expiry), payload, signature
+
+
+class SessionVerifier:
+    """Xác thực token phiên phía máy chủ, lưu kết quả trong bộ nhớ đệm LRU có thời hạn
+
+    Mỗi token chỉ được kiểm tra chữ ký một lần; các yêu cầu sau trong cùng phiên chỉ còn
+    một lần tra cứu và so sánh thời hạn. Mục trong bộ nhớ đệm hết hạn cùng với token.
+    Token bị thu hồi được giữ trong danh sách chặn tới khi hết hạn.
+    """
+
+    def __init__(
+        self,
+        public_key: bytes,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.verify_key = VerifyKey(public_key)
+        self.max_size = max_size
+        self.clock = clock
+        self._cache: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        # Token đã thu hồi và thời điểm hết hạn, sau đó token tự bị từ chối nên không cần giữ
+        self._revoked: dict[str, int] = {}
+
+    def verify(self, token: str) -> str | None:
+        """Trả về địa chỉ của phiên nếu token hợp lệ và còn hạn, ngược lại trả về None"""
+        now = self.clock()
+        if token in self._revoked:
+            return None
+        cached = self._cache.get(token)
+        if cached is not None:
+            address, expiry = cached
+            if expiry > now:
+                self._cache.move_to_end(token)
+                return address
+            del self._cache[token]
+            return None
+
+        try:
+            address, expiry, payload, signature = parse_session_token(token)
+        except ValueError:
+            return None
+        if expiry <= now:
+            return None
+        try:
+            self.verify_key.verify(payload, signature)
+        except (BadSignatureError, ValueError):
+            # ValueError: chữ ký không đúng 64 byte
+            return None
+
+        self._cache[token] = (address, expiry)
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return address
+
+    def revoke(self, token: str) -> None:
+        """Thu hồi token: verify() từ chối token này cho tới khi nó hết hạn"""
+        self._cache.pop(token, None)
+        try:
+            _, expiry, _, _ = parse_session_token(token)
+        except ValueError:
+            # Token sai định dạng vốn đã bị verify() từ chối
+            return
+        now = self.clock()
+        self._revoked = {revoked: until for revoked, until in self._revoked.items() if until > now}
+        if expiry > now:
+            self._revoked[token] = expiry
@@ -0,0 +1,158 @@
+"""Mã hóa AES-GCM dạng luồng theo từng khối cho tài nguyên lớn.
+
+Định dạng:
+    header = MAGIC (4) | version (1) | chunk_size (4, big-endian) | nonce_prefix (8)
+    khối thứ i = ciphertext | tag (16)
+
+Nonce của khối i là nonce_prefix | i (4 byte); AAD gồm header, chỉ số khối và cờ khối cuối,
+nên việc đổi thứ tự, ghép khối từ luồng khác hoặc cắt bớt phần cuối đều bị phát hiện.
+"""
+
+import os
+import struct
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO
+
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+
+MAGIC = b"AGS1"
+VERSION = 1
+DEFAULT_CHUNK_SIZE = 64 * 1024
+TAG_SIZE = 16
+NONCE_PREFIX_SIZE = 8
+MAX_CHUNKS = 2**32
+# Giới hạn kích thước khối: header của luồng cần giải mã do bên ngoài cung cấp, một chunk_size
+# tùy ý sẽ khiến mỗi lần đọc (nhân với số luồng xử lý) chiếm bộ nhớ không giới hạn
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+
+_HEADER = struct.Struct(">4sBI8s")
+HEADER_SIZE = _HEADER.size
+
+
+def _read_exact(source: BinaryIO, size: int) -> bytes:
+    """Đọc đủ size byte hoặc tới hết luồng; luồng thô (socket, HTTP) có thể trả về ít hơn mỗi lần đọc"""
+    buffer = bytearray()
+    while len(buffer) < size and (piece := source.read(size - len(buffer))):
+        buffer += piece
+    return bytes(buffer)
+
+
+def _read_chunks(source: BinaryIO | Iterable[bytes], size: int) -> Iterator[bytes]:
+    """Chia nguồn dữ liệu (file hoặc iterator các đoạn bytes) thành các khối đúng size byte"""
+    if hasattr(source, "read"):
+        while chunk := _read_exact(source, size):
+            yield chunk
+        return
+
+    buffer = bytearray()
+    for piece in source:
+        buffer += piece
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _with_final_flag(chunks: Iterator[bytes]) -> Iterator[tuple[int, bytes, bool]]:
+    """Đánh dấu khối cuối bằng cách đọc trước một khối; luồng rỗng vẫn có một khối cuối rỗng"""
+    current = next(chunks, b"")
+    index = 0
+    for following in chunks:
+        yield index, current, False
+        current = following
+        index += 1
+    yield index, current, True
+
+
+def _check_chunk_size(chunk_size: int) -> None:
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"Kích thước khối phải trong khoảng (0, {MAX_CHUNK_SIZE}]: {chunk_size}")
+
+
+def _nonce(nonce_prefix: bytes, index: int) -> bytes:
+    if index >= MAX_CHUNKS:
+        raise ValueError("Luồng dữ liệu vượt quá số khối tối đa")
+    return nonce_prefix + struct.pack(">I", index)
+
+
+def _aad(header: bytes, index: int, *, final: bool) -> bytes:
+    return header + struct.pack(">Q?", index, final)
+
+
+def _encrypt_chunk(
+    key: bytes, header: bytes, nonce_prefix: bytes, index: int, chunk: bytes, *, final: bool
+) -> bytes:
+    cipher = AES.new(key, AES.MODE_GCM, nonce=_nonce(nonce_prefix, index))
+    cipher.update(_aad(header, index, final=final))
+    ciphertext, tag = cipher.encrypt_and_digest(chunk)
+    return ciphertext + tag
+
+
+def _decrypt_chunk(
+    key: bytes, header: bytes, nonce_prefix: bytes, index: int, chunk: bytes, *, final: bool
+) -> bytes:
+    if len(chunk) < TAG_SIZE:
+        raise ValueError("Khối dữ liệu mã hóa bị cắt cụt")
+    cipher = AES.new(key, AES.MODE_GCM, nonce=_nonce(nonce_prefix, index))
+    cipher.update(_aad(header, index, final=final))
+    return cipher.decrypt_and_verify(chunk[:-TAG_SIZE], chunk[-TAG_SIZE:])
+
+
+def _ordered_map(
+    func: Callable[..., bytes], jobs: Iterator[tuple[int, bytes, bool]], max_workers: int | None, *args: bytes
+) -> Iterator[bytes]:
+    """Xử lý các khối song song nhưng trả kết quả theo thứ tự, giới hạn số khối trong bộ nhớ"""
+    max_workers = max_workers or os.cpu_count() or 1
+    in_flight: deque[Future[bytes]] = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for index, chunk, final in jobs:
+            in_flight.append(executor.submit(func, *args, index, chunk, final=final))
+            if len(in_flight) >= 2 * max_workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def encrypt_stream(
+    key: bytes,
+    source: BinaryIO | Iterable[bytes],
+    sink: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int | None = None,
+) -> int:
+    """Mã hóa dữ liệu từ source vào sink với bộ nhớ cố định, trả về số byte đã ghi"""
+    _check_chunk_size(chunk_size)
+    nonce_prefix = get_random_bytes(NONCE_PREFIX_SIZE)
+    header = _HEADER.pack(MAGIC, VERSION, chunk_size, nonce_prefix)
+    sink.write(header)
+    written = len(header)
+    jobs = _with_final_flag(_read_chunks(source, chunk_size))
+    for encrypted in _ordered_map(_encrypt_chunk, jobs, max_workers, key, header, nonce_prefix):
+        sink.write(encrypted)
+        written += len(encrypted)
+    return written
+
+
+def decrypt_stream(key: bytes, source: BinaryIO, sink: BinaryIO, max_workers: int | None = None) -> int:
+    """Giải mã luồng do encrypt_stream tạo ra, ném ValueError nếu dữ liệu bị sửa, đảo hoặc cắt bớt
+
+    Các khối được ghi ra sink ngay khi xác thực xong; nếu có lỗi, phần đã ghi phải bị loại bỏ.
+    """
+    header = _read_exact(source, HEADER_SIZE)
+    if len(header) != HEADER_SIZE:
+        raise ValueError("Thiếu header của luồng mã hóa")
+    magic, version, chunk_size, nonce_prefix = _HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Định dạng luồng mã hóa không được hỗ trợ")
+    _check_chunk_size(chunk_size)
+
+    written = 0
+    jobs = _with_final_flag(_read_chunks(source, chunk_size + TAG_SIZE))
+    for plaintext in _ordered_map(_decrypt_chunk, jobs, max_workers, key, header, nonce_prefix):
+        sink.write(plaintext)
+        written += len(plaintext)
+    return written
@@ -1,89 +1,432 @@
-from algopy import ARC4Contract, String
+from algopy import ARC4Contract, BoxMap, Bytes, Global, GlobalState, String, UInt64, arc4, op
 from algopy.arc4 import abimethod
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 # Xóa import Crypto.Util.Padding vì không cần thiết nữa
 import base64
+import bisect
+import heapq
 from algosdk import abi
 from algosdk.abi import UintType
 
+# Kích thước mỗi khối dữ liệu tài nguyên lưu trong box, tính bằng byte UTF-8 (bằng hạn mức đọc của
+# một box reference)
+RESOURCE_CHUNK_SIZE = 1024
+# Số byte tối đa trả về trong một lần đọc (giá trị trả về ABI nằm trong một log 1024 byte)
+MAX_READ_LENGTH = 1000
+# Số tài liệu tối đa trong một trang kết quả tìm kiếm
+MAX_PAGE_SIZE = 20
 
-class Contract(ARC4Contract):
-    resources = {}
+# Các bit quyền truy cập, lưu dưới dạng bitmask UInt64 cho mỗi cặp (tài nguyên, người dùng)
+RIGHT_READ = 1
+RIGHT_WRITE = 2
+RIGHT_DELETE = 4
+RIGHT_ADMIN = 8
+ACCESS_RIGHT_BITS = {
+    "read": RIGHT_READ,
+    "write": RIGHT_WRITE,
+    "delete": RIGHT_DELETE,
+    "admin": RIGHT_ADMIN,
+}
+# Số nhóm tối đa của một người dùng, giới hạn số lần tra box khi kiểm tra quyền
+MAX_GROUPS_PER_USER = 8
+
+
+def _parse_rights(rights: str) -> int:
+    """Chuyển chuỗi quyền dạng "read,write" thành bitmask"""
+    mask = 0
+    for action in rights.replace(",", " ").split():
+        mask |= ACCESS_RIGHT_BITS.get(action, 0)
+    return mask
+
+
+def _valid_merkle_path(leaf_count: int, proof_length: int, path_bits: int) -> bool:
+    """Kiểm tra độ dài bằng chứng khớp với độ sâu của lá trong cây có leaf_count lá
+
+    Cây gồm các cây con hoàn chỉnh theo các bit của leaf_count (lớn nhất bên trái), gộp từ phải
+    sang trái; đi từ gốc xuống theo path_bits để tìm cây con chứa lá và độ sâu tương ứng.
+    """
+    if leaf_count == 0 or path_bits >> proof_length:
+        return False
+    heights = [height for height in range(63, -1, -1) if (leaf_count >> height) & 1]
+    level = proof_length
+    index = 0
+    while index < len(heights) - 1:
+        if level == 0:
+            return False
+        level -= 1
+        if not (path_bits >> level) & 1:
+            break
+        index += 1
+    return level == heights[index]
+
+
+def _decode_key(encryption_key: str) -> bytes:
+    """Giải mã khóa base64
+
+    Hợp đồng không giữ khóa giữa các lời gọi; lưu đệm khóa thuộc về client ngoài chuỗi
+    (keystore.EnvelopeKeyring).
+    """
+    return base64.b64decode(encryption_key)
+
+
+def _trim_partial_char(data: bytes) -> bytes:
+    """Bỏ ký tự UTF-8 bị cắt dở ở cuối đoạn byte (tối đa 3 byte)"""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 != 0x80:
+            # Byte đầu của ký tự cuối: giữ lại nếu ký tự đủ byte
+            if byte < 0x80:
+                width = 1
+            elif byte < 0xE0:
+                width = 2
+            elif byte < 0xF0:
+                width = 3
+            else:
+                width = 4
+            return data if width <= back else data[:-back]
+    return data
+
+
+def _insert_posting(index: dict, key, doc_id: str) -> None:
+    """Chèn doc_id vào danh sách posting của key, giữ danh sách luôn được sắp xếp"""
+    if key not in index:
+        index[key] = []
+    postings = index[key]
+    position = bisect.bisect_left(postings, doc_id)
+    if position == len(postings) or postings[position] != doc_id:
+        postings.insert(position, doc_id)
+
+
+def _merge_postings(index: dict, key, doc_ids: list) -> None:
+    """Gộp một lô doc_id vào danh sách posting của key bằng một lần trộn duy nhất"""
+    if key not in index:
+        index[key] = []
+    merged = []
+    for doc_id in heapq.merge(index[key], sorted(doc_ids)):
+        if not merged or merged[-1] != doc_id:
+            merged.append(doc_id)
+    index[key] = merged
+
+
+def _intersect_postings(postings_lists: list, after: str = None, limit: int = None) -> list:
+    """Giao các danh sách posting đã sắp xếp, bắt đầu từ danh sách ngắn nhất
+
+    Chỉ lấy các doc_id lớn hơn after và dừng khi đủ limit kết quả.
+    """
+    postings_lists = sorted(postings_lists, key=len)
+    shortest, others = postings_lists[0], postings_lists[1:]
+    start = 0 if after is None else bisect.bisect_right(shortest, after)
+    # Vị trí tìm kiếm nhị phân trên các danh sách dài hơn chỉ tăng dần
+    lows = [0 if after is None else bisect.bisect_right(postings, after) for postings in others]
+
+    results = []
+    for position in range(start, len(shortest)):
+        doc_id = shortest[position]
+        matched = True
+        for i, postings in enumerate(others):
+            lows[i] = bisect.bisect_left(postings, doc_id, lows[i])
+            if lows[i] == len(postings):
+                return results
+            if postings[lows[i]] != doc_id:
+                matched = False
+                break
+        if matched:
+            results.append(doc_id)
+            if limit is not None and len(results) >= limit:
+                break
+    return results
+
+
+def _encode_cursor(doc_id: str) -> str:
+    """Mã hóa doc_id cuối cùng của trang thành con trỏ tiếp tục"""
+    return base64.urlsafe_b64encode(doc_id.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> str:
+    """Giải mã con trỏ tiếp tục, chuỗi rỗng nghĩa là bắt đầu từ đầu"""
+    return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8") if cursor else None
+
+
+class DocumentSummary(arc4.Struct):
+    """Thông tin tóm tắt của một tài liệu trong kết quả tìm kiếm"""
+
+    doc_id: arc4.String
+    title: arc4.String
+    author: arc4.String
+    year: arc4.UInt64
+    field: arc4.String
+
+
+class DocumentInput(arc4.Struct):
+    """Dữ liệu đầu vào của một tài liệu khi thêm theo lô"""
+
+    doc_id: arc4.String
+    title: arc4.String
+    author: arc4.String
+    year: arc4.UInt64
+    field: arc4.String
+    content: arc4.String
+
+
+class TokenTransfer(arc4.Struct):
+    """Một khoản chuyển token (người nhận, số lượng)"""
+
+    recipient: arc4.String
+    amount: arc4.UInt64
+
+
+class AccessCheck(arc4.Struct):
+    """Một yêu cầu kiểm tra quyền (tài nguyên, người dùng, bitmask quyền cần có)"""
 
+    resource_id: arc4.String
+    user_address: arc4.String
+    action: arc4.UInt64
+
+
+class DataAnchor(arc4.Struct):
+    """Thông tin neo của một hash dữ liệu: người gửi, vòng xác nhận và nhãn tùy chọn"""
+
+    submitter: arc4.Address
+    round: arc4.UInt64
+    label: arc4.String
+
+
+class MerkleBatch(arc4.Struct):
+    """Thông tin của một lô dữ liệu được neo bằng gốc Merkle"""
+
+    submitter: arc4.Address
+    round: arc4.UInt64
+    leaf_count: arc4.UInt64
+    label: arc4.String
+
+
+class Contract(ARC4Contract):
     def __init__(self):
         super().__init__()
-        self.access_rights = {}  # Biến trạng thái cho quyền truy cập
+        self.resources = BoxMap(String, UInt64, key_prefix="r")  # Kích thước dữ liệu của từng tài nguyên
+        self.resource_chunks = BoxMap(String, Bytes, key_prefix="c")  # Các khối byte UTF-8 "<resource_id>/<i>"
+        self.documents = {}  # Thông tin mô tả tài liệu
+        self.index_field = {}  # Chỉ mục tìm kiếm theo lĩnh vực
+        self.index_author = {}  # Chỉ mục tìm kiếm theo tác giả
+        self.index_year = {}  # Chỉ mục tìm kiếm theo năm
+        self.index_year_keys = []  # Các năm có trong chỉ mục, sắp xếp tăng dần để truy vấn theo khoảng
+        self.access_rights = BoxMap(String, UInt64, key_prefix="a")  # Bitmask quyền theo "<resource_id>:<address>"
+        self.group_rights = BoxMap(String, UInt64, key_prefix="g")  # Bitmask quyền theo "<resource_id>:<group_id>"
+        self.user_groups = BoxMap(String, arc4.DynamicArray[arc4.String], key_prefix="m")  # Các nhóm của người dùng
         self.resource_owners = {}  # Biến trạng thái cho quyền sở hữu tài nguyên
         self.user_tokens = {}  # Biến trạng thái cho quản lý token
+        self.data_anchors = BoxMap(Bytes, DataAnchor, key_prefix="h")  # Digest SHA-256 (32 byte) -> thông tin neo
+        self.merkle_roots = BoxMap(Bytes, MerkleBatch, key_prefix="t")  # Gốc Merkle (32 byte) -> thông tin lô
+        self.session_issuer = GlobalState(Bytes, key="session_issuer")  # Khóa công khai ed25519 phát hành token phiên
+
+    def _chunk_key(self, resource_id: String, index: int) -> String:
+        """Tạo khóa box cho khối dữ liệu thứ index của tài nguyên"""
+        return f"{resource_id}/{index}"
+
+    def _store_resource(self, resource_id: String, data: String) -> None:
+        """Ghi dữ liệu tài nguyên vào box, chia bản mã hóa UTF-8 thành các khối RESOURCE_CHUNK_SIZE byte"""
+        if resource_id in self.resources:
+            self._delete_resource(resource_id)
+
+        encoded = data.encode("utf-8")
+        for index, start in enumerate(range(0, len(encoded), RESOURCE_CHUNK_SIZE)):
+            self.resource_chunks[self._chunk_key(resource_id, index)] = encoded[start:start + RESOURCE_CHUNK_SIZE]
+        self.resources[resource_id] = UInt64(len(encoded))
+
+    def _delete_resource(self, resource_id: String) -> None:
+        """Xóa tài nguyên cùng toàn bộ các khối dữ liệu của nó"""
+        size = self.resources[resource_id]
+        for index in range((size + RESOURCE_CHUNK_SIZE - 1) // RESOURCE_CHUNK_SIZE):
+            del self.resource_chunks[self._chunk_key(resource_id, index)]
+        del self.resources[resource_id]
+
+    def _read_resource(self, resource_id: String, offset: int, length: int) -> String:
+        """Đọc đoạn byte [offset, offset + length) của tài nguyên, chỉ tải các khối cần thiết
+
+        offset phải nằm đầu một ký tự. Ký tự bị cắt dở ở cuối đoạn được bỏ đi, nên đoạn tiếp
+        theo bắt đầu tại offset + số byte UTF-8 của chuỗi trả về.
+        """
+        size = self.resources[resource_id]
+        end = min(offset + length, size)
+        if offset >= end:
+            return ""
+
+        parts = []
+        for index in range(offset // RESOURCE_CHUNK_SIZE, (end - 1) // RESOURCE_CHUNK_SIZE + 1):
+            chunk = self.resource_chunks[self._chunk_key(resource_id, index)]
+            chunk_start = index * RESOURCE_CHUNK_SIZE
+            parts.append(chunk[max(offset - chunk_start, 0):end - chunk_start])
+        data = b"".join(parts)
+        if end < size:
+            data = _trim_partial_char(data)
+        return data.decode("utf-8")
+
+    def _load_resource(self, resource_id: String) -> String:
+        """Đọc toàn bộ dữ liệu tài nguyên (chỉ dùng nội bộ cho dữ liệu nhỏ)"""
+        return self._read_resource(resource_id, 0, self.resources[resource_id])
 
     @abimethod()
     def add_resource(self, resource_id: String, resource_data: String) -> String:
         """Thêm tài nguyên mới"""
-        self.resources[resource_id] = resource_data
+        self._store_resource(resource_id, resource_data)
         return "Đã thêm tài nguyên thành công"
 
+    @abimethod(readonly=True)
+    def read_resource(self, resource_id: String, offset: UInt64, length: UInt64) -> String:
+        """Đọc một đoạn dữ liệu của tài nguyên theo (offset, length)"""
+        if resource_id not in self.resources:
+            return "Tài nguyên không tồn tại"
+
+        return self._read_resource(resource_id, offset, min(length, MAX_READ_LENGTH))
+
     @abimethod()
-    def access_resource(self, resource_id: String, user_token: String) -> String:
-        """Truy cập tài nguyên"""
+    def access_resource_with_session(
+        self, resource_id: String, user_token: String, offset: UInt64 = 0, length: UInt64 = MAX_READ_LENGTH
+    ) -> String:
+        """Đọc một đoạn tài nguyên bằng token phiên (tách tên khỏi access_resource trả bằng token)"""
         if self.verify_token(user_token):
             if resource_id in self.resources:
-                return self.resources[resource_id]
+                return self._read_resource(resource_id, offset, min(length, MAX_READ_LENGTH))
             else:
                 return "Tài nguyên không tồn tại"
         else:
             return "Không có quyền truy cập"
 
     def verify_token(self, token: String) -> bool:
-        """Xác thực token của người dùng"""
-        # Triển khai logic xác thực token
-        import hashlib
-        import time
-        
-        # Tạo một chuỗi ngẫu nhiên dựa trên thời gian hiện tại
-        random_string = str(time.time()).encode('utf-8')
-        
-        # Tạo một token ngẫu nhiên bằng cách mã hóa chuỗi ngẫu nhiên
-        valid_token = hashlib.sha256(random_string).hexdigest()
-        
-        # So sánh token nhập vào với token hợp lệ
-        return token == valid_token
+        """Xác thực token phiên của người dùng
+
+        Token có dạng base64url("<address>|<expiry>") + "." + base64url(chữ ký ed25519), được ký
+        bởi bên phát hành phiên (xem smart_contracts/_helpers/session.py).
+        """
+        payload_part, _, signature_part = token.partition(".")
+        try:
+            payload = base64.urlsafe_b64decode(payload_part)
+            signature = base64.urlsafe_b64decode(signature_part)
+            address, _, expiry = payload.decode("utf-8").partition("|")
+            expiry = int(expiry)
+        except ValueError:
+            return False
+
+        # Token chỉ dùng được cho đúng người gửi và trước thời điểm hết hạn
+        if address != self.sender or expiry <= Global.latest_timestamp:
+            return False
+        return op.ed25519verify_bare(payload, signature, self.session_issuer.value)
+
+    @abimethod()
+    def set_session_issuer(self, public_key: Bytes) -> String:
+        """Thiết lập khóa công khai dùng để xác thực token phiên (chỉ người tạo ứng dụng)"""
+        if self.sender != Global.creator_address:
+            return "Không có quyền truy cập"
+        if public_key.length != 32:
+            return "Khóa công khai không hợp lệ"
+        self.session_issuer.value = public_key
+        return "Đã thiết lập khóa phát hành phiên"
     
+    def _anchor_digest(self, digest: Bytes, label: String) -> bool:
+        """Lưu digest cùng thông tin neo, giữ nguyên lần neo đầu tiên nếu digest đã tồn tại"""
+        if digest in self.data_anchors:
+            return False
+        self.data_anchors[digest] = DataAnchor(
+            submitter=arc4.Address(self.sender),
+            round=arc4.UInt64(Global.round),
+            label=arc4.String(label),
+        )
+        return True
+
     @abimethod()
     def store_data_hash(self, data: String) -> String:
-        """Lưu trữ hash của dữ liệu trên blockchain"""
+        """Lưu trữ hash của dữ liệu trên blockchain (chỉ lưu digest, không lưu dữ liệu)"""
         import hashlib
         
         # Tạo hash từ dữ liệu
-        data_hash = hashlib.sha256(data.encode('utf-8')).hexdigest()
+        data_hash = hashlib.sha256(data.encode('utf-8')).digest()
         
         # Lưu hash vào blockchain
-        self.resources[data_hash] = data
+        self._anchor_digest(data_hash, "")
         
-        return f"Đã lưu hash của dữ liệu: {data_hash}"
+        return f"Đã lưu hash của dữ liệu: {data_hash.hex()}"
+
+    @abimethod()
+    def anchor_data_hash(self, data_hash: Bytes, label: String) -> String:
+        """Neo digest SHA-256 đã được tính ngoài chuỗi; chi phí cố định bất kể kích thước dữ liệu"""
+        if data_hash.length != 32:
+            return "Hash không hợp lệ"
+        if not self._anchor_digest(data_hash, label):
+            return "Hash của dữ liệu đã được lưu trước đó"
+        return "Đã lưu hash của dữ liệu"
+
+    @abimethod(readonly=True)
+    def verify_data_hash(self, data_hash: Bytes) -> String:
+        """Xác minh digest SHA-256 đã được neo trên blockchain"""
+        if data_hash in self.data_anchors:
+            return "Dữ liệu không bị thay đổi và toàn vẹn"
+        else:
+            return "Không tìm thấy hash của dữ liệu trên blockchain"
+
+    @abimethod(readonly=True)
+    def get_data_anchor(self, data_hash: Bytes) -> DataAnchor:
+        """Lấy thông tin neo (người gửi, vòng, nhãn) của digest"""
+        return self.data_anchors[data_hash]
 
     @abimethod()
+    def anchor_merkle_root(self, root: Bytes, leaf_count: UInt64, label: String) -> String:
+        """Neo gốc Merkle của cả một lô dữ liệu bằng một lần ghi box"""
+        if root.length != 32 or leaf_count == 0:
+            return "Gốc Merkle không hợp lệ"
+        if root in self.merkle_roots:
+            return "Gốc Merkle đã được lưu trước đó"
+        self.merkle_roots[root] = MerkleBatch(
+            submitter=arc4.Address(self.sender),
+            round=arc4.UInt64(Global.round),
+            leaf_count=arc4.UInt64(leaf_count),
+            label=arc4.String(label),
+        )
+        return "Đã lưu gốc Merkle của lô dữ liệu"
+
+    @abimethod(readonly=True)
+    def verify_merkle_inclusion(self, root: Bytes, item: Bytes, proof: Bytes, path_bits: UInt64) -> String:
+        """Xác minh một phần tử thuộc lô đã neo bằng bằng chứng Merkle
+
+        item là dữ liệu gốc, lá được tính trên chuỗi là SHA-256(0x00 | item); proof là các hash
+        anh em 32 byte nối liền từ lá lên gốc; bit i của path_bits bằng 1 khi anh em ở mức i
+        nằm bên trái. Độ dài bằng chứng phải đúng độ sâu của lá trong cây có leaf_count lá đã
+        neo (xem smart_contracts/_helpers/merkle.py).
+        """
+        if root not in self.merkle_roots:
+            return "Không tìm thấy gốc Merkle trên blockchain"
+        leaf_count = self.merkle_roots[root].leaf_count.native
+        if proof.length % 32 != 0 or not _valid_merkle_path(leaf_count, proof.length // 32, path_bits):
+            return "Bằng chứng Merkle không hợp lệ"
+
+        node = op.sha256(b"\x00" + item)
+        for level in range(proof.length // 32):
+            sibling = proof[level * 32 : (level + 1) * 32]
+            if (path_bits >> level) & 1:
+                node = op.sha256(b"\x01" + sibling + node)
+            else:
+                node = op.sha256(b"\x01" + node + sibling)
+
+        if node == root:
+            return "Dữ liệu thuộc lô đã neo và toàn vẹn"
+        else:
+            return "Bằng chứng Merkle không khớp với gốc đã neo"
+
+    @abimethod(readonly=True)
     def verify_data_integrity(self, data: String) -> String:
         """Xác minh tính toàn vẹn của dữ liệu"""
         import hashlib
         
         # Tạo hash từ dữ liệu đầu vào
-        data_hash = hashlib.sha256(data.encode('utf-8')).hexdigest()
+        data_hash = hashlib.sha256(data.encode('utf-8')).digest()
         
         # Kiểm tra xem hash có tồn tại trong blockchain không
-        if data_hash in self.resources:
-            stored_data = self.resources[data_hash]
-            if stored_data == data:
-                return "Dữ liệu không bị thay đổi và toàn vẹn"
-            else:
-                return "Dữ liệu đã bị thay đổi"
-        else:
-            return "Không tìm thấy hash của dữ liệu trên blockchain"
+        return self.verify_data_hash(data_hash)
         
     @abimethod()
-    def set_resource_owner(self, resource_id: String, owner_address: String) -> String:
+    def set_resource_owner(self, resource_id: String, owner_address: String, user_token: String) -> String:
         """Thiết lập quyền sở hữu cho tài nguyên"""
-        if self.verify_token(self.token):
+        if self.verify_token(user_token):
             if resource_id in self.resources:
                 self.resource_owners[resource_id] = owner_address
                 return f"Đã thiết lập quyền sở hữu cho tài nguyên {resource_id}"
@@ -92,36 +435,123 @@ class Contract(ARC4Contract):
         else:
             return "Không có quyền truy cập"
 
+    def _access_key(self, resource_id: String, user_address: String) -> String:
+        """Tạo khóa box quyền truy cập cho cặp (tài nguyên, người dùng)"""
+        return f"{resource_id}:{user_address}"
+
+    def _has_right(self, resource_id: String, user_address: String, right: int) -> bool:
+        """Kiểm tra quyền bằng một lần tra box; quyền được cấp riêng được ưu tiên hơn quyền chủ sở hữu"""
+        key = self._access_key(resource_id, user_address)
+        if key in self.access_rights:
+            return right != 0 and self.access_rights[key] & right == right
+        if user_address == self.resource_owners.get(resource_id):
+            return True
+        return right != 0 and self._group_mask(resource_id, user_address) & right == right
+
+    def _group_mask(self, resource_id: String, user_address: String) -> int:
+        """Gộp quyền của các nhóm mà người dùng thuộc về (tối đa MAX_GROUPS_PER_USER lần tra box)"""
+        mask = 0
+        if user_address in self.user_groups:
+            for group_id in self.user_groups[user_address]:
+                mask |= self.group_rights.get(self._access_key(resource_id, group_id.native), default=UInt64(0))
+        return mask
+
+    @abimethod()
+    def set_group_rights(self, resource_id: String, group_id: String, rights: String, user_token: String) -> String:
+        """Thiết lập quyền truy cập cho cả nhóm, chuỗi quyền rỗng để thu hồi"""
+        if self.verify_token(user_token):
+            if resource_id in self.resources:
+                key = self._access_key(resource_id, group_id)
+                mask = _parse_rights(rights)
+                if mask:
+                    self.group_rights[key] = UInt64(mask)
+                elif key in self.group_rights:
+                    del self.group_rights[key]
+                return f"Đã thiết lập quyền truy cập {rights} cho nhóm {group_id} đối với tài nguyên {resource_id}"
+            else:
+                return "Tài nguyên không tồn tại"
+        else:
+            return "Không có quyền truy cập"
+
+    @abimethod()
+    def add_group_member(self, group_id: String, user_address: String, user_token: String) -> String:
+        """Thêm người dùng vào nhóm"""
+        if self.verify_token(user_token):
+            groups = self.user_groups.get(user_address, default=arc4.DynamicArray[arc4.String]())
+            for existing in groups:
+                if existing.native == group_id:
+                    return f"Người dùng {user_address} đã thuộc nhóm {group_id}"
+            if groups.length >= MAX_GROUPS_PER_USER:
+                return f"Người dùng {user_address} đã thuộc quá {MAX_GROUPS_PER_USER} nhóm"
+            groups.append(arc4.String(group_id))
+            self.user_groups[user_address] = groups.copy()
+            return f"Đã thêm người dùng {user_address} vào nhóm {group_id}"
+        else:
+            return "Không có quyền truy cập"
+
+    @abimethod()
+    def remove_group_member(self, group_id: String, user_address: String, user_token: String) -> String:
+        """Xóa người dùng khỏi nhóm"""
+        if self.verify_token(user_token):
+            groups = self.user_groups.get(user_address, default=arc4.DynamicArray[arc4.String]())
+            remaining = arc4.DynamicArray[arc4.String]()
+            for existing in groups:
+                if existing.native != group_id:
+                    remaining.append(existing)
+            if remaining.length == groups.length:
+                return f"Người dùng {user_address} không thuộc nhóm {group_id}"
+            if remaining.length:
+                self.user_groups[user_address] = remaining.copy()
+            else:
+                del self.user_groups[user_address]
+            return f"Đã xóa người dùng {user_address} khỏi nhóm {group_id}"
+        else:
+            return "Không có quyền truy cập"
+
     @abimethod()
-    def set_access_rights(self, resource_id: String, user_address: String, rights: String) -> String:
+    def set_access_rights(
+        self, resource_id: String, user_address: String, rights: String, user_token: String
+    ) -> String:
         """Thiết lập quyền truy cập cho người dùng"""
-        if self.verify_token(self.token):
+        if self.verify_token(user_token):
             if resource_id in self.resources:
-                if resource_id not in self.access_rights:
-                    self.access_rights[resource_id] = {}
-                self.access_rights[resource_id][user_address] = rights
+                self.access_rights[self._access_key(resource_id, user_address)] = UInt64(_parse_rights(rights))
                 return f"Đã thiết lập quyền truy cập {rights} cho người dùng {user_address} đối với tài nguyên {resource_id}"
             else:
                 return "Tài nguyên không tồn tại"
         else:
             return "Không có quyền truy cập"
 
-    @abimethod()
+    @abimethod(readonly=True)
     def check_access_rights(self, resource_id: String, user_address: String, action: String) -> String:
         """Kiểm tra quyền truy cập của người dùng"""
         if resource_id in self.resources:
-            if resource_id in self.access_rights and user_address in self.access_rights[resource_id]:
-                user_rights = self.access_rights[resource_id][user_address]
-                if action in user_rights:
+            key = self._access_key(resource_id, user_address)
+            if key in self.access_rights:
+                if self._has_right(resource_id, user_address, ACCESS_RIGHT_BITS.get(action, 0)):
                     return f"Người dùng {user_address} có quyền {action} đối với tài nguyên {resource_id}"
                 else:
                     return f"Người dùng {user_address} không có quyền {action} đối với tài nguyên {resource_id}"
             elif user_address == self.resource_owners.get(resource_id):
                 return f"Người dùng {user_address} là chủ sở hữu của tài nguyên {resource_id}"
+            elif self._has_right(resource_id, user_address, ACCESS_RIGHT_BITS.get(action, 0)):
+                return f"Người dùng {user_address} có quyền {action} đối với tài nguyên {resource_id} qua nhóm"
             else:
                 return f"Người dùng {user_address} không có quyền truy cập tài nguyên {resource_id}"
         else:
             return "Tài nguyên không tồn tại"
+
+    @abimethod(readonly=True)
+    def check_access_rights_batch(self, checks: arc4.DynamicArray[AccessCheck]) -> arc4.DynamicArray[arc4.Bool]:
+        """Kiểm tra nhiều bộ (tài nguyên, người dùng, quyền) trong một lần gọi"""
+        results = arc4.DynamicArray[arc4.Bool]()
+        for check in checks:
+            resource_id = check.resource_id.native
+            allowed = resource_id in self.resources and self._has_right(
+                resource_id, check.user_address.native, check.action.native
+            )
+            results.append(arc4.Bool(allowed))
+        return results
         
     @abimethod()
     def buy_tokens(self, amount: int) -> String:
@@ -143,12 +573,31 @@ class Contract(ARC4Contract):
         if self.sender not in self.user_tokens or self.user_tokens[self.sender] < amount:
             return "Không đủ token để chuyển"
         
-        if recipient not in self.user_tokens:
-            self.user_tokens[recipient] = 0
         self.user_tokens[self.sender] -= amount
-        self.user_tokens[recipient] += amount
+        self.user_tokens[recipient] = self.user_tokens.get(recipient, 0) + amount
         return f"Đã chuyển {amount} token cho {recipient}"
 
+    @abimethod()
+    def transfer_tokens_batch(self, transfers: arc4.DynamicArray[TokenTransfer]) -> String:
+        """Chuyển token cho nhiều người nhận, kiểm tra tổng một lần và ghi mỗi số dư đúng một lần"""
+        # Gộp các khoản cùng người nhận trước khi ghi
+        totals = {}
+        total = 0
+        for transfer in transfers:
+            recipient = transfer.recipient.native
+            totals[recipient] = totals.get(recipient, 0) + transfer.amount.native
+            total += transfer.amount.native
+
+        balance = self.user_tokens.get(self.sender, 0)
+        if balance < total:
+            return "Không đủ token để chuyển"
+
+        # Khoản chuyển cho chính mình không làm thay đổi số dư
+        self.user_tokens[self.sender] = balance - total + totals.pop(self.sender, 0)
+        for recipient, amount in totals.items():
+            self.user_tokens[recipient] = self.user_tokens.get(recipient, 0) + amount
+        return String(f"Đã chuyển {total} token cho {len(totals)} người nhận")
+
     @abimethod()
     def access_resource(self, resource_id: String, token_amount: int) -> String:
         """Truy cập tài nguyên bằng cách sử dụng token"""
@@ -159,19 +608,22 @@ class Contract(ARC4Contract):
             return "Không đủ token để truy cập tài nguyên"
         
         # Kiểm tra quyền truy cập
-        access_rights = self.check_access_rights(resource_id, self.sender, "read")
-        if "không có quyền" in access_rights:
+        if not self._has_right(resource_id, self.sender, RIGHT_READ):
             return "Không có quyền truy cập tài nguyên này"
         
         # Trừ token và cho phép truy cập
         self.user_tokens[self.sender] -= token_amount
         return f"Đã truy cập tài nguyên {resource_id}. Token còn lại: {self.user_tokens[self.sender]}"
 
-    @abimethod()
+    @abimethod(readonly=True)
     def get_token_balance(self) -> int:
         """Lấy số dư token của người dùng"""
         return self.user_tokens.get(self.sender, 0)
 
+    @abimethod()
+    def pad_budget(self) -> None:
+        """Lời gọi rỗng: thêm ngân sách opcode và chỗ cho reference dùng chung trong nhóm nguyên tử"""
+
     def encrypt_data(self, data: str, key: bytes) -> str:
         """Mã hóa dữ liệu sử dụng AES-GCM"""
         nonce = get_random_bytes(12)
@@ -195,9 +647,9 @@ class Contract(ARC4Contract):
         if resource_id in self.resources:
             return "Tài nguyên đã tồn tại"
         
-        key = base64.b64decode(encryption_key)
+        key = _decode_key(encryption_key)
         encrypted_data = self.encrypt_data(resource_data, key)
-        self.resources[resource_id] = encrypted_data
+        self._store_resource(resource_id, encrypted_data)
         return f"Đã thêm và mã hóa tài nguyên {resource_id}"
 
     @abimethod()
@@ -210,14 +662,13 @@ class Contract(ARC4Contract):
             return "Không đủ token để truy cập tài nguyên"
         
         # Kiểm tra quyền truy cập
-        access_rights = self.check_access_rights(resource_id, self.sender, "read")
-        if "không có quyền" in access_rights:
+        if not self._has_right(resource_id, self.sender, RIGHT_READ):
             return "Không có quyền truy cập tài nguyên này"
         
         # Trừ token và giải mã dữ liệu
         self.user_tokens[self.sender] -= token_amount
-        key = base64.b64decode(encryption_key)
-        decrypted_data = self.decrypt_data(self.resources[resource_id], key)
+        key = _decode_key(encryption_key)
+        decrypted_data = self.decrypt_data(self._load_resource(resource_id), key)
         return f"Đã truy cập và giải mã tài nguyên {resource_id}. Nội dung: {decrypted_data}. Token còn lại: {self.user_tokens[self.sender]}"
     
     @abimethod()
@@ -226,73 +677,172 @@ class Contract(ARC4Contract):
         if doc_id in self.resources:
             return "Tài liệu đã tồn tại"
         
+        # Thông tin mô tả lưu riêng, nội dung lưu theo khối trong box
         document = {
             "title": title,
             "author": author,
             "year": year,
             "field": field,
-            "content": content
         }
-        self.resources[doc_id] = document
-        
-        # Thêm vào các chỉ mục tìm kiếm
-        if "index_field" not in self.resources:
-            self.resources["index_field"] = {}
-        if field not in self.resources["index_field"]:
-            self.resources["index_field"][field] = []
-        self.resources["index_field"][field].append(doc_id)
-        
-        if "index_author" not in self.resources:
-            self.resources["index_author"] = {}
-        if author not in self.resources["index_author"]:
-            self.resources["index_author"][author] = []
-        self.resources["index_author"][author].append(doc_id)
+        self.documents[doc_id] = document
+        self._store_resource(doc_id, content)
         
-        if "index_year" not in self.resources:
-            self.resources["index_year"] = {}
-        if year not in self.resources["index_year"]:
-            self.resources["index_year"][year] = []
-        self.resources["index_year"][year].append(doc_id)
+        # Thêm vào các chỉ mục tìm kiếm (danh sách posting được sắp xếp theo doc_id)
+        _insert_posting(self.index_field, field, doc_id)
+        _insert_posting(self.index_author, author, doc_id)
+        if year not in self.index_year:
+            bisect.insort(self.index_year_keys, year)
+        _insert_posting(self.index_year, year, doc_id)
         
         return f"Đã thêm tài liệu {doc_id} thành công"
 
     @abimethod()
-    def search_documents(self, field: str = None, author: str = None, year: int = None) -> str:
-        """Tìm kiếm tài liệu dựa trên các tiêu chí"""
-        results = set()
-        
-        if field and "index_field" in self.resources and field in self.resources["index_field"]:
-            results.update(self.resources["index_field"][field])
-        
-        if author and "index_author" in self.resources and author in self.resources["index_author"]:
-            if results:
-                results.intersection_update(self.resources["index_author"][author])
-            else:
-                results.update(self.resources["index_author"][author])
-        
-        if year and "index_year" in self.resources and year in self.resources["index_year"]:
-            if results:
-                results.intersection_update(self.resources["index_year"][year])
-            else:
-                results.update(self.resources["index_year"][year])
-        
+    def add_documents(self, documents: arc4.DynamicArray[DocumentInput]) -> String:
+        """Thêm nhiều tài liệu trong một lần gọi, mỗi danh sách posting chỉ được cập nhật một lần"""
+        new_by_field = {}
+        new_by_author = {}
+        new_by_year = {}
+        added = 0
+        skipped = 0
+        for item in documents:
+            doc_id = item.doc_id.native
+            if doc_id in self.resources:
+                skipped += 1
+                continue
+
+            year = item.year.native
+            self.documents[doc_id] = {
+                "title": item.title.native,
+                "author": item.author.native,
+                "year": year,
+                "field": item.field.native,
+            }
+            self._store_resource(doc_id, item.content.native)
+            new_by_field.setdefault(item.field.native, []).append(doc_id)
+            new_by_author.setdefault(item.author.native, []).append(doc_id)
+            new_by_year.setdefault(year, []).append(doc_id)
+            added += 1
+
+        # Cập nhật chỉ mục theo nhóm khóa thay vì từng tài liệu
+        for field, doc_ids in new_by_field.items():
+            _merge_postings(self.index_field, field, doc_ids)
+        for author, doc_ids in new_by_author.items():
+            _merge_postings(self.index_author, author, doc_ids)
+        for year, doc_ids in new_by_year.items():
+            if year not in self.index_year:
+                bisect.insort(self.index_year_keys, year)
+            _merge_postings(self.index_year, year, doc_ids)
+
+        return String(f"Đã thêm {added} tài liệu, bỏ qua {skipped} tài liệu đã tồn tại")
+
+    def _year_range_postings(self, year_from: int = None, year_to: int = None) -> list:
+        """Lấy danh sách posting (đã sắp xếp) của các tài liệu có năm trong khoảng [year_from, year_to]"""
+        low = 0 if year_from is None else bisect.bisect_left(self.index_year_keys, year_from)
+        high = len(self.index_year_keys) if year_to is None else bisect.bisect_right(self.index_year_keys, year_to)
+        years = self.index_year_keys[low:high]
+        if len(years) == 1:
+            return self.index_year[years[0]]
+
+        # Mỗi tài liệu chỉ thuộc một năm nên có thể trộn trực tiếp các danh sách đã sắp xếp
+        return list(heapq.merge(*(self.index_year[y] for y in years)))
+
+    def _query_postings(
+        self, field: str = None, author: str = None, year: int = None, year_from: int = None, year_to: int = None
+    ) -> list:
+        """Thu thập các danh sách posting tương ứng với các tiêu chí tìm kiếm"""
+        # Một tiêu chí không có trong chỉ mục nghĩa là không có tài liệu nào phù hợp
+        postings_lists = []
+        if field:
+            postings_lists.append(self.index_field.get(field, []))
+        if author:
+            postings_lists.append(self.index_author.get(author, []))
+        if year:
+            postings_lists.append(self.index_year.get(year, []))
+        if year_from is not None or year_to is not None:
+            postings_lists.append(self._year_range_postings(year_from, year_to))
+        return postings_lists
+
+    @abimethod(readonly=True)
+    def search_documents(
+        self,
+        field: str = None,
+        author: str = None,
+        year: int = None,
+        year_from: int = None,
+        year_to: int = None,
+    ) -> str:
+        """Tìm kiếm tài liệu dựa trên các tiêu chí, hỗ trợ lọc theo khoảng năm [year_from, year_to]"""
+        postings_lists = self._query_postings(field, author, year, year_from, year_to)
+        results = _intersect_postings(postings_lists) if postings_lists else []
         if not results:
             return "Không tìm thấy tài liệu phù hợp"
         
-        result_str = "Các tài liệu phù hợp:\n"
+        lines = ["Các tài liệu phù hợp:\n"]
         for doc_id in results:
-            doc = self.resources[doc_id]
-            result_str += f"ID: {doc_id}, Tiêu đề: {doc['title']}, Tác giả: {doc['author']}, Năm: {doc['year']}, Lĩnh vực: {doc['field']}\n"
+            doc = self.documents[doc_id]
+            lines.append(
+                f"ID: {doc_id}, Tiêu đề: {doc['title']}, Tác giả: {doc['author']}, "
+                f"Năm: {doc['year']}, Lĩnh vực: {doc['field']}\n"
+            )
         
-        return result_str
+        return "".join(lines)
 
-    @abimethod()
-    def get_document_content(self, doc_id: str) -> str:
-        """Lấy nội dung của tài liệu"""
-        if doc_id not in self.resources:
+    @abimethod(readonly=True)
+    def search_documents_page(
+        self,
+        field: str,
+        author: str,
+        year_from: int,
+        year_to: int,
+        limit: int,
+        cursor: str,
+    ) -> tuple[arc4.DynamicArray[DocumentSummary], String]:
+        """Tìm kiếm tài liệu theo trang, trả về danh sách tóm tắt và con trỏ cho trang tiếp theo
+
+        Chuỗi rỗng hoặc năm bằng 0 nghĩa là bỏ qua tiêu chí đó; con trỏ rỗng khi không còn kết quả.
+        """
+        postings_lists = self._query_postings(
+            field=field or None,
+            author=author or None,
+            year_from=year_from or None,
+            year_to=year_to or None,
+        )
+        page = arc4.DynamicArray[DocumentSummary]()
+        if not postings_lists:
+            return page, String("")
+
+        limit = min(limit, MAX_PAGE_SIZE) if limit else MAX_PAGE_SIZE
+        # Lấy thêm một phần tử để biết còn trang tiếp theo hay không
+        doc_ids = _intersect_postings(postings_lists, after=_decode_cursor(cursor), limit=limit + 1)
+
+        page_size = 0
+        last_doc_id = None
+        for doc_id in doc_ids[:limit]:
+            doc = self.documents[doc_id]
+            summary = DocumentSummary(
+                doc_id=arc4.String(doc_id),
+                title=arc4.String(doc["title"]),
+                author=arc4.String(doc["author"]),
+                year=arc4.UInt64(doc["year"]),
+                field=arc4.String(doc["field"]),
+            )
+            # Giữ giá trị trả về trong giới hạn kích thước log của một lần gọi
+            page_size += len(summary.bytes)
+            if page and page_size > MAX_READ_LENGTH:
+                break
+            page.append(summary)
+            last_doc_id = doc_id
+
+        has_more = len(page) < len(doc_ids)
+        return page, String(_encode_cursor(last_doc_id) if has_more else "")
+
+    @abimethod(readonly=True)
+    def get_document_content(self, doc_id: str, offset: int = 0, length: int = MAX_READ_LENGTH) -> str:
+        """Lấy nội dung thô của tài liệu theo từng đoạn (offset, length)"""
+        if doc_id not in self.documents:
             return "Tài liệu không tồn tại"
         
-        return f"Nội dung của tài liệu {doc_id}: {self.resources[doc_id]['content']}"
+        return self._read_resource(doc_id, offset, min(length, MAX_READ_LENGTH))
 
     @abimethod()
     def create_token(self, name: abi.String) -> UintType(64):
@@ -303,7 +853,7 @@ class Contract(ARC4Contract):
         self._store_token_info(token_id, name)
         return UintType(64)(token_id)
 
-    @abimethod()
+    @abimethod(readonly=True)
     def get_token_owner(self, token_id: UintType(64)) -> abi.Address:
         # Triển khai logic lấy chủ sở hữu token
         # Ví dụ:
@@ -317,7 +867,7 @@ class Contract(ARC4Contract):
         self._store_resource_info(resource_id, name)
         return UintType(64)(resource_id)
 
-    @abimethod()
+    @abimethod(readonly=True)
     def check_resource_access(self, resource_id: UintType(64), address: abi.Address) -> abi.Bool:
         # Triển khai logic kiểm tra quyền truy cập
         has_access = self._check_access(resource_id.value, address.value)
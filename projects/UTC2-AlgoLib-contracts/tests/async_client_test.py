@@ -0,0 +1,206 @@
+import asyncio
+import base64
+import collections
+import itertools
+import json
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+import msgpack
+import pytest
+from algokit_utils import Account, AlgoClientConfig
+from algosdk import abi, account, encoding
+
+from smart_contracts._helpers import async_client
+from smart_contracts._helpers.async_client import (
+    ABI_RETURN_PREFIX,
+    CREATE_RESOURCE_METHOD,
+    AsyncAlgodClient,
+    AsyncContractClient,
+    TransactionOutcomeUnknownError,
+)
+from smart_contracts._helpers.boxes import (
+    access_rights_box,
+    group_rights_box,
+    resource_size_box,
+    user_groups_box,
+)
+from smart_contracts._helpers.config import CLIENT_CONFIG
+
+CONFIG = AlgoClientConfig(server="http://algod.test", token="t")
+
+
+class FakeAlgod:
+    """algod giả: mỗi lần chờ khối tạo một khối mới chứa các giao dịch đã gửi"""
+
+    def __init__(self, boxes: dict[bytes, bytes] | None = None, return_value: bytes | None = None) -> None:
+        self.round = 10
+        self.boxes = boxes or {}
+        # Giá trị trả về ABI của mọi lời gọi, mặc định là vòng xác nhận (uint64)
+        self.return_value = return_value
+        self.sent: list[Any] = []
+        self.mempool: list[str] = []
+        self.blocks: dict[int, list[str]] = {}
+        self.calls: collections.Counter[str] = collections.Counter()
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/v2/status":
+            return self._json({"last-round": self.round})
+        if path.startswith("/v2/status/wait-for-block-after/"):
+            self.calls["wait"] += 1
+            await asyncio.sleep(0.01)
+            self.round += 1
+            self.blocks[self.round], self.mempool = self.mempool, []
+            return self._json({"last-round": self.round})
+        if path == "/v2/transactions/params":
+            self.calls["params"] += 1
+            return self._json(
+                {
+                    "fee": 0,
+                    "last-round": self.round,
+                    "genesis-hash": base64.b64encode(b"\0" * 32).decode(),
+                    "genesis-id": "testnet-v1",
+                    "consensus-version": "future",
+                    "min-fee": 1000,
+                }
+            )
+        if path == "/v2/transactions":
+            unpacker = msgpack.Unpacker()
+            unpacker.feed(request.content)
+            for stxn in unpacker:
+                signed = encoding.msgpack_decode(base64.b64encode(msgpack.packb(stxn)).decode())
+                self.sent.append(signed.transaction)
+                self.mempool.append(signed.get_txid())
+            return self._json({"txId": self.mempool[-1]})
+        if path == "/v2/applications/1/box":
+            name = base64.b64decode(request.url.params["name"].removeprefix("b64:"))
+            if name not in self.boxes:
+                return httpx.Response(404, content=b'{"message": "box not found"}')
+            return self._json({"name": "", "value": base64.b64encode(self.boxes[name]).decode()})
+        if path.startswith("/v2/blocks/"):
+            self.calls["block"] += 1
+            return self._json({"blockTxids": self.blocks.get(int(path.split("/")[3]), [])})
+        if path.startswith("/v2/transactions/pending/"):
+            confirmed_round = next((r for r, txids in self.blocks.items() if path.split("/")[-1] in txids), 0)
+            value = confirmed_round.to_bytes(8, "big") if self.return_value is None else self.return_value
+            log = base64.b64encode(ABI_RETURN_PREFIX + value).decode()
+            return self._json({"confirmed-round": confirmed_round, "logs": [log]})
+        return httpx.Response(404)
+
+    @staticmethod
+    def _json(body: dict[str, Any]) -> httpx.Response:
+        return httpx.Response(200, content=json.dumps(body).encode())
+
+
+def _sender() -> Account:
+    private_key, address = account.generate_account()
+    return Account(private_key=private_key, address=address)
+
+
+def test_concurrent_calls_share_rounds() -> None:
+    fake = FakeAlgod()
+
+    async def run() -> list[int]:
+        async with AsyncAlgodClient(CONFIG, transport=httpx.MockTransport(fake.handle)) as algod:
+            client = AsyncContractClient(algod, app_id=1, sender=_sender())
+            return await asyncio.gather(*(client.call(CREATE_RESOURCE_METHOD, [f"r{i}"]) for i in range(50)))
+
+    results = asyncio.run(run())
+    assert len(results) == 50
+    assert all(confirmed_round > 10 for confirmed_round in results)
+    # Mỗi vòng chỉ lấy suggested params và danh sách txid của khối một lần
+    assert fake.calls["params"] <= fake.calls["wait"] + 1
+    assert fake.calls["block"] <= fake.calls["wait"]
+
+
+def test_access_with_tokens_references_group_boxes() -> None:
+    sender = _sender()
+    groups = [f"nhóm {i}" for i in range(7)]
+    fake = FakeAlgod(
+        {user_groups_box(sender.address): abi.ABIType.from_string("string[]").encode(groups)},
+        return_value=abi.StringType().encode("Đã truy cập tài nguyên r1"),
+    )
+
+    async def run() -> str:
+        async with AsyncAlgodClient(CONFIG, transport=httpx.MockTransport(fake.handle)) as algod:
+            return await AsyncContractClient(algod, app_id=1, sender=sender).access_resource_with_tokens("r1", 5)
+
+    assert asyncio.run(run()) == "Đã truy cập tài nguyên r1"
+    expected = {
+        resource_size_box("r1"),
+        access_rights_box("r1", sender.address),
+        user_groups_box(sender.address),
+        *(group_rights_box("r1", group) for group in groups),
+    }
+    # 10 box vượt quá giới hạn 8 của một giao dịch nên được chia sang lời gọi pad_budget cùng nhóm
+    assert len(fake.sent) == 2
+    assert fake.sent[0].group == fake.sent[1].group is not None
+    assert {box.name for txn in fake.sent for box in txn.boxes} == expected
+
+
+@pytest.fixture
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(CLIENT_CONFIG, "backoff_base", 0)
+
+
+def _broken_wait(fake: FakeAlgod, failures: int) -> Callable[[httpx.Request], Awaitable[httpx.Response]]:
+    """Bọc fake.handle: failures lần chờ khối đầu tiên trả về phản hồi sai định dạng"""
+    broken = itertools.count()
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith("/v2/status/wait-for-block-after/") and next(broken) < failures:
+            # Khối vẫn được tạo nhưng bộ thăm dò không đọc được phản hồi
+            await fake.handle(request)
+            return FakeAlgod._json({"unexpected": True})
+        return await fake.handle(request)
+
+    return handle
+
+
+@pytest.mark.usefixtures("no_backoff")
+def test_poller_recovers_and_confirms_outstanding_calls() -> None:
+    fake = FakeAlgod()
+
+    async def run() -> int:
+        async with AsyncAlgodClient(CONFIG, transport=httpx.MockTransport(_broken_wait(fake, 3))) as algod:
+            client = AsyncContractClient(algod, app_id=1, sender=_sender())
+            return await asyncio.wait_for(client.call(CREATE_RESOURCE_METHOD, ["r"]), timeout=5)
+
+    # Giao dịch nằm trong khối bị bỏ lỡ vẫn được xác nhận khi hỏi lại sau khi thăm dò phục hồi
+    assert asyncio.run(run()) == 11
+
+
+@pytest.mark.usefixtures("no_backoff")
+def test_poller_gives_up_with_outcome_unknown(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(async_client, "MAX_POLL_FAILURES", 2)
+    fake = FakeAlgod()
+
+    async def run() -> None:
+        async with AsyncAlgodClient(CONFIG, transport=httpx.MockTransport(_broken_wait(fake, 1000))) as algod:
+            client = AsyncContractClient(algod, app_id=1, sender=_sender())
+            await asyncio.wait_for(client.call(CREATE_RESOURCE_METHOD, ["r"]), timeout=5)
+
+    # Không phải TransactionRejectedError: giao dịch có thể đã được xác nhận, không được gửi lại
+    with pytest.raises(TransactionOutcomeUnknownError):
+        asyncio.run(run())
+
+
+def test_duplicate_submission_is_treated_as_accepted() -> None:
+    fake = FakeAlgod()
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        response = await fake.handle(request)
+        if request.url.path == "/v2/transactions":
+            # Lần gửi trước đã tới algod, lần gửi lại bị báo trùng
+            message = f"TransactionPool.Remember: transaction already in ledger: {fake.mempool[-1]}"
+            return httpx.Response(400, content=json.dumps({"message": message}).encode())
+        return response
+
+    async def run() -> int:
+        async with AsyncAlgodClient(CONFIG, transport=httpx.MockTransport(handle)) as algod:
+            client = AsyncContractClient(algod, app_id=1, sender=_sender())
+            return await asyncio.wait_for(client.call(CREATE_RESOURCE_METHOD, ["r"]), timeout=5)
+
+    assert asyncio.run(run()) == 11
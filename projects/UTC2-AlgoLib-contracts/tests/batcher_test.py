@@ -0,0 +1,70 @@
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from algokit_utils import Account
+from algosdk import abi, account
+
+from smart_contracts._helpers import batcher
+from smart_contracts._helpers.batcher import CallBatcher, _References, distribute_references
+from smart_contracts._helpers.boxes import APP_CALL_OPCODE_BUDGET, resource_size_box
+
+ADD_RESOURCE = abi.Method.from_signature("add_resource(string,string)string")
+
+sent_groups: list[list[dict[str, Any]]] = []
+
+
+class FakeComposer:
+    """Thay AtomicTransactionComposer: ghi lại các lời gọi của nhóm thay vì gửi lên algod"""
+
+    def __init__(self) -> None:
+        self.calls: list[dict[str, Any]] = []
+
+    def add_method_call(self, **kwargs: Any) -> None:
+        self.calls.append(kwargs)
+
+    def execute(self, client: object, wait_rounds: int) -> SimpleNamespace:
+        sent_groups.append(self.calls)
+        return SimpleNamespace(abi_results=[SimpleNamespace(return_value=call["method_args"]) for call in self.calls])
+
+
+@pytest.fixture()
+def fake_batcher(monkeypatch: pytest.MonkeyPatch) -> CallBatcher:
+    sent_groups.clear()
+    monkeypatch.setattr(batcher, "AtomicTransactionComposer", FakeComposer)
+    private_key, address = account.generate_account()
+    algod = SimpleNamespace(suggested_params=lambda: object())
+    sender = Account(private_key=private_key, address=address)
+    return CallBatcher(algod, 1, sender, max_delay=60)  # type: ignore[arg-type]
+
+
+def test_references_are_spread_over_the_group() -> None:
+    boxes = Counter(resource_size_box(str(i)) for i in range(20))
+    refs = _References(boxes=boxes, accounts={f"A{i}" for i in range(5)})
+    assert refs.txn_count(1) == 4
+    slots = distribute_references(refs, refs.txn_count(1))
+    assert all(slot.size <= 8 and len(slot.accounts) <= 4 for slot in slots)
+    assert sum(slot.size for slot in slots) == 25
+
+
+def test_groups_fill_up_to_sixteen_calls(fake_batcher: CallBatcher) -> None:
+    with fake_batcher:
+        futures = [fake_batcher.submit(ADD_RESOURCE, [f"r{i}", "x"], [resource_size_box(f"r{i}")]) for i in range(40)]
+        fake_batcher.flush()
+        assert [future.result() for future in futures] == [[f"r{i}", "x"] for i in range(40)]
+    assert [len(group) for group in sent_groups] == [16, 16, 8]
+
+
+def test_padding_calls_cover_budget_and_references(fake_batcher: CallBatcher) -> None:
+    with fake_batcher:
+        boxes = [resource_size_box(f"r{i}") for i in range(12)]
+        fake_batcher.submit(ADD_RESOURCE, ["r", "x"], boxes, budget=3 * APP_CALL_OPCODE_BUDGET)
+    (group,) = sent_groups
+    assert [call["method"].name for call in group] == ["add_resource", "pad_budget", "pad_budget"]
+    assert sorted(name for call in group for _, name in call["boxes"]) == sorted(boxes)
+
+
+def test_rejects_calls_larger_than_a_group(fake_batcher: CallBatcher) -> None:
+    with fake_batcher, pytest.raises(ValueError):
+        fake_batcher.submit(ADD_RESOURCE, ["r", "x"], budget=17 * APP_CALL_OPCODE_BUDGET)
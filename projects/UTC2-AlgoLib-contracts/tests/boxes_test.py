@@ -0,0 +1,21 @@
+from smart_contracts._helpers.boxes import (
+    RESOURCE_CHUNK_SIZE,
+    resource_box_names,
+    resource_chunk_box,
+    resource_read_boxes,
+    utf8_size,
+)
+
+
+def test_chunks_are_counted_in_utf8_bytes() -> None:
+    # 600 ký tự tiếng Việt có dấu chiếm 1800 byte, cần 2 khối dù ít hơn 1024 ký tự
+    content = "ệ" * 600
+    assert utf8_size(content) == 1800
+    chunks = resource_box_names("doc", utf8_size(content))[1:]
+    assert chunks == [resource_chunk_box("doc", 0), resource_chunk_box("doc", 1)]
+
+
+def test_read_boxes_cover_byte_range() -> None:
+    names = resource_read_boxes("doc", RESOURCE_CHUNK_SIZE - 1, 2)
+    assert names[1:] == [resource_chunk_box("doc", 0), resource_chunk_box("doc", 1)]
+    assert resource_read_boxes("doc", 0, 0) == [resource_box_names("doc", 0)[0]]
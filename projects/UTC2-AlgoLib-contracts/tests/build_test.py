@@ -0,0 +1,131 @@
+from collections import Counter
+from pathlib import Path
+
+import httpx
+import pytest
+from algokit_utils import AlgoClientConfig
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts._helpers import build as build_module
+from smart_contracts._helpers import clients
+
+ALGOD_ADDRESS = "http://algod.test"
+
+
+@pytest.fixture
+def builds() -> list[bool]:
+    """Giá trị offline của mỗi lần biên dịch thật"""
+    return []
+
+
+@pytest.fixture
+def contract_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, builds: list[bool]) -> Path:
+    """Hợp đồng giả; _build chỉ ghi một app spec đánh số theo số lần biên dịch"""
+    source_dir = tmp_path / "src" / "demo"
+    source_dir.mkdir(parents=True)
+    (source_dir / "contract.py").write_text("x = 1\n")
+    monkeypatch.setattr(build_module, "BUILD_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(build_module, "cache_stats", Counter())
+    monkeypatch.setattr(build_module, "_compiler_version", lambda: "algokit 2.0|puyapy 1.0")
+
+    def fake_build(output_dir: Path, contract_path: Path, *, offline: bool) -> Path:
+        builds.append(offline)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        app_spec = output_dir / "Demo.arc32.json"
+        app_spec.write_text(str(len(builds)))
+        return app_spec
+
+    monkeypatch.setattr(build_module, "_build", fake_build)
+    return source_dir / "contract.py"
+
+
+def _build(tmp_path: Path, contract_path: Path, **kwargs: bool) -> str:
+    return build_module.build(tmp_path / "out", contract_path, **kwargs).read_text()
+
+
+def test_second_build_is_restored_from_cache(tmp_path: Path, contract_path: Path):
+    assert _build(tmp_path, contract_path, offline=False) == "1"
+    assert _build(tmp_path, contract_path, offline=False) == "1"
+    assert build_module.cache_stats == Counter(miss=1, hit=1)
+
+
+def test_source_change_invalidates_cache(tmp_path: Path, contract_path: Path):
+    _build(tmp_path, contract_path, offline=False)
+    # Module khác cùng thư mục cũng thuộc khóa bộ nhớ đệm
+    (contract_path.parent / "helpers.py").write_text("y = 2\n")
+    assert _build(tmp_path, contract_path, offline=False) == "2"
+    contract_path.write_text("x = 3\n")
+    assert _build(tmp_path, contract_path, offline=False) == "3"
+    assert build_module.cache_stats == Counter(miss=3)
+
+
+def test_compiler_version_invalidates_cache(tmp_path: Path, contract_path: Path, monkeypatch: pytest.MonkeyPatch):
+    _build(tmp_path, contract_path, offline=False)
+    monkeypatch.setattr(build_module, "_compiler_version", lambda: "algokit 2.1|puyapy 1.0")
+    assert _build(tmp_path, contract_path, offline=False) == "2"
+
+
+def test_offline_build_does_not_satisfy_full_build(tmp_path: Path, contract_path: Path, builds: list[bool]):
+    assert _build(tmp_path, contract_path, offline=True) == "1"
+    assert _build(tmp_path, contract_path, offline=False) == "2"
+    assert builds == [True, False]
+    assert _build(tmp_path, contract_path, offline=True) == "1"
+
+
+def test_use_cache_false_always_rebuilds(tmp_path: Path, contract_path: Path):
+    _build(tmp_path, contract_path, offline=False)
+    assert _build(tmp_path, contract_path, offline=False, use_cache=False) == "2"
+    assert build_module.cache_stats == Counter(miss=2)
+
+
+@pytest.fixture
+def algod(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> tuple[AlgodClient, list[httpx.Request]]:
+    """algod giả qua httpx.MockTransport như clients_test: biên dịch trả về hash theo độ dài mã TEAL"""
+    requests: list[httpx.Request] = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        teal = request.content.decode()
+        if "lỗi" in teal:
+            return httpx.Response(400, json={"message": "1: unknown opcode"})
+        return httpx.Response(200, json={"hash": f"HASH{len(teal)}", "result": "AQE="})
+
+    monkeypatch.setattr(build_module, "TEAL_CACHE_DIR", tmp_path / "teal")
+    monkeypatch.setitem(clients.CLIENT_CONFIG, "backoff_base", 0)
+    monkeypatch.setattr(clients, "_http_clients", {ALGOD_ADDRESS: httpx.Client(transport=httpx.MockTransport(handle))})
+    monkeypatch.setattr(clients, "_clients", {})
+    return clients.get_algod_client(AlgoClientConfig(server=ALGOD_ADDRESS, token="t")), requests
+
+
+def test_compile_teal_caches_by_source(tmp_path: Path, algod: tuple[AlgodClient, list[httpx.Request]]):
+    algod_client, requests = algod
+    teal = "#pragma version 10\nint 1\n"
+    expected = {"hash": f"HASH{len(teal)}", "result": "AQE="}
+
+    assert build_module.compile_teal(algod_client, teal) == expected
+    assert len(requests) == 1
+    assert requests[0].url.path == "/v2/teal/compile"
+    assert build_module.compile_teal(algod_client, teal) == expected
+    assert len(requests) == 1, "Lần biên dịch thứ hai phải lấy từ bộ nhớ đệm"
+
+    build_module.compile_teal(algod_client, teal + "pop\n")
+    assert len(requests) == 2
+    assert len(list((tmp_path / "teal").glob("*.json"))) == 2
+
+
+def test_compile_teal_errors_are_not_cached(tmp_path: Path, algod: tuple[AlgodClient, list[httpx.Request]]):
+    algod_client, requests = algod
+    teal = "#pragma version 10\nlỗi\n"
+    for _ in range(2):
+        with pytest.raises(AlgodHTTPError, match="unknown opcode"):
+            build_module.compile_teal(algod_client, teal)
+    assert len(requests) == 2
+    assert not (tmp_path / "teal").exists()
+
+
+def test_contracts_do_not_import_helpers():
+    # Khóa bộ nhớ đệm chỉ băm thư mục hợp đồng nên hợp đồng không được import module ngoài thư mục
+    contracts_dir = Path(build_module.__file__).parent.parent
+    for contract in contracts_dir.glob("*/contract.py"):
+        assert "smart_contracts._helpers" not in contract.read_text(), f"{contract} import smart_contracts._helpers"
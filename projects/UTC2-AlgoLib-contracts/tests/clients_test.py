@@ -0,0 +1,49 @@
+import httpx
+import pytest
+from algokit_utils import AlgoClientConfig
+from algosdk import error
+
+from smart_contracts._helpers import clients
+
+ADDRESS = "http://algod.test"
+
+
+@pytest.fixture()
+def responses(monkeypatch: pytest.MonkeyPatch) -> list[httpx.Response]:
+    """Các phản hồi lần lượt trả về cho mỗi yêu cầu, không chờ giữa các lần thử lại"""
+    queue: list[httpx.Response] = []
+    monkeypatch.setitem(clients.CLIENT_CONFIG, "backoff_base", 0)
+    monkeypatch.setattr(clients, "_http_clients", {})
+    monkeypatch.setattr(clients, "_clients", {})
+    clients._http_clients[ADDRESS] = httpx.Client(transport=httpx.MockTransport(lambda request: queue.pop(0)))
+    return queue
+
+
+def test_clients_are_shared_per_endpoint(responses: list[httpx.Response]) -> None:
+    config = AlgoClientConfig(server=ADDRESS, token="t")
+    assert clients.get_algod_client(config) is clients.get_algod_client(config)
+    assert clients.get_algod_client(config) is not clients.get_algod_client(AlgoClientConfig(ADDRESS, "other"))
+
+
+def test_retries_throttled_requests(responses: list[httpx.Response]) -> None:
+    responses += [httpx.Response(429), httpx.Response(503), httpx.Response(200, json={"last-round": 7})]
+    algod_client = clients.get_algod_client(AlgoClientConfig(server=ADDRESS, token="t"))
+    assert algod_client.status() == {"last-round": 7}
+    assert not responses
+
+
+def test_gives_up_after_max_retries(responses: list[httpx.Response], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(clients.CLIENT_CONFIG, "max_retries", 1)
+    responses += [httpx.Response(429), httpx.Response(429, json={"message": "rate limited"})]
+    algod_client = clients.get_algod_client(AlgoClientConfig(server=ADDRESS, token="t"))
+    with pytest.raises(error.AlgodHTTPError) as exc_info:
+        algod_client.status()
+    assert exc_info.value.code == 429
+
+
+def test_client_errors_are_not_retried(responses: list[httpx.Response]) -> None:
+    responses += [httpx.Response(404, json={"message": "account not found"}), httpx.Response(200, json={})]
+    algod_client = clients.get_algod_client(AlgoClientConfig(server=ADDRESS, token="t"))
+    with pytest.raises(error.AlgodHTTPError, match="account not found"):
+        algod_client.status()
+    assert len(responses) == 1
@@ -1,12 +1,12 @@
+from collections.abc import Iterator
+
 import pytest
-from algokit_utils import (
-    get_algod_client,
-    get_default_localnet_config,
-    get_indexer_client,
-)
+from algokit_utils import get_default_localnet_config
 from algosdk.v2client.algod import AlgodClient
 from algosdk.v2client.indexer import IndexerClient
 
+from smart_contracts._helpers.clients import close_clients, get_algod_client, get_indexer_client
+
 # Uncomment if you want to load network specific or generic .env file
 # @pytest.fixture(autouse=True, scope="session")
 # def environment_fixture() -> None:
@@ -24,3 +24,10 @@ def algod_client() -> AlgodClient:
 @pytest.fixture(scope="session")
 def indexer_client() -> IndexerClient:
     return get_indexer_client(get_default_localnet_config("indexer"))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def shared_connections() -> Iterator[None]:
+    # Các fixture dùng chung kết nối, đóng lại khi kết thúc phiên kiểm thử
+    yield
+    close_clients()
@@ -1,20 +1,16 @@
+from pathlib import Path
+
 import pytest
-from algosdk.v2client import algod, indexer
 from algosdk import account, transaction
 from algosdk.encoding import decode_address
 from algosdk import transaction
+from algokit_utils import ApplicationSpecification, get_localnet_default_account
 
-@pytest.fixture(scope="module")
-def algod_client():
-    algod_address = "http://localhost:4001"
-    algod_token = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
-    return algod.AlgodClient(algod_token, algod_address)
+from smart_contracts._helpers.loadtest import deploy_benchmark_app, fund_accounts
 
-@pytest.fixture(scope="module")
-def indexer_client():
-    indexer_address = "http://localhost:8980"
-    indexer_token = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
-    return indexer.IndexerClient(indexer_token, indexer_address)
+ARTIFACTS_PATH = Path(__file__).parent.parent / "smart_contracts" / "artifacts"
+
+# algod_client và indexer_client dùng kết nối chung khai báo trong conftest.py
 
 @pytest.fixture(scope="module")
 def default_account():
@@ -22,20 +18,24 @@ def default_account():
     return {"private_key": private_key, "address": address}
 
 @pytest.fixture(scope="module")
-def app_id(algod_client):
-    # Giả sử app_id đã được tạo trước đó
-    return 1  # Thay thế bằng app_id thực tế của bạn
+def dispenser(algod_client):
+    return get_localnet_default_account(algod_client)
 
 @pytest.fixture(scope="module")
-def funded_account(algod_client):
+def app_id(algod_client, dispenser):
+    # Tạo ứng dụng mới từ app spec đã build thay vì dùng app_id cố định
+    app_spec_path = next((ARTIFACTS_PATH / "contract").glob("*.arc32.json"), None)
+    if app_spec_path is None:
+        pytest.skip("Chưa build hợp đồng, chạy `python -m smart_contracts build` trước")
+    app_spec = ApplicationSpecification.from_json(app_spec_path.read_text())
+    return deploy_benchmark_app(algod_client, app_spec, dispenser, app_funds=10)
+
+@pytest.fixture(scope="module")
+def funded_account(algod_client, dispenser):
     private_key, address = account.generate_account()
     
-    # Cấp tiền cho tài khoản
-    params = algod_client.suggested_params()
-    txn = transaction.PaymentTxn(algod_client.suggested_params().min_fee, params, address, 1000000)
-    signed_txn = txn.sign("Thay thế bằng private key của tài khoản có sẵn Algos")
-    tx_id = algod_client.send_transaction(signed_txn)
-    transaction.wait_for_confirmation(algod_client, tx_id, 4)
+    # Cấp tiền cho tài khoản từ tài khoản mặc định của LocalNet
+    fund_accounts(algod_client, dispenser, [address], 1000000)
     
     return {"private_key": private_key, "address": address}
 
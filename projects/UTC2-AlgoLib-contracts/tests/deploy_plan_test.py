@@ -0,0 +1,155 @@
+import base64
+import hashlib
+from pathlib import Path
+from typing import Any
+
+import pytest
+from algokit_utils import Account, ApplicationSpecification
+from algokit_utils.application_specification import CallConfig
+from algosdk import account, transaction
+from algosdk.abi import Contract
+from algosdk.error import AlgodHTTPError
+from algosdk.logic import get_application_address
+from algosdk.transaction import StateSchema
+
+from smart_contracts._helpers import build, deploy_plan
+from smart_contracts._helpers.deploy_plan import DeployAction, DeployRecord, Schema, execute_plan, plan_deploy
+
+APPROVAL = "#pragma version 10\nint 1\n"
+CLEAR = "#pragma version 10\nint 1\n"
+
+
+class FakeAlgod:
+    """algod giả: biên dịch bằng cách băm mã TEAL, lưu ứng dụng trong bộ nhớ"""
+
+    def __init__(self) -> None:
+        self.apps: dict[int, dict[str, Any]] = {}
+        self.compiles = 0
+
+    def suggested_params(self) -> transaction.SuggestedParams:
+        return transaction.SuggestedParams(1000, 1, 1001, "genesis", "testnet-v1", flat_fee=True)
+
+    def compile(self, teal: str) -> dict[str, str]:
+        self.compiles += 1
+        program = hashlib.sha256(teal.encode()).digest()
+        return {"hash": "H", "result": base64.b64encode(program).decode()}
+
+    def application_info(self, app_id: int) -> dict[str, Any]:
+        if app_id not in self.apps:
+            raise AlgodHTTPError("application does not exist", 404)
+        return {"params": self.apps[app_id]}
+
+    def deploy(self, app_id: int, approval: str, clear: str, global_bytes: int = 1) -> None:
+        self.apps[app_id] = {
+            "approval-program": base64.b64encode(hashlib.sha256(approval.encode()).digest()).decode(),
+            "clear-state-program": base64.b64encode(hashlib.sha256(clear.encode()).digest()).decode(),
+            "global-state-schema": {"num-uint": 1, "num-byte-slice": global_bytes},
+            "local-state-schema": {},
+        }
+
+
+def _app_spec(
+    approval: str = APPROVAL, global_bytes: int = 1, *, updatable: bool = True
+) -> ApplicationSpecification:
+    bare_call_config = {"no_op": CallConfig.CREATE}
+    if updatable:
+        bare_call_config["update_application"] = CallConfig.CALL
+    return ApplicationSpecification(
+        approval_program=approval,
+        clear_program=CLEAR,
+        contract=Contract("Contract", []),
+        hints={},
+        schema={},
+        global_state_schema=StateSchema(1, global_bytes),
+        local_state_schema=StateSchema(0, 0),
+        bare_call_config=bare_call_config,  # type: ignore[arg-type]
+    )
+
+
+def _record(app_spec: ApplicationSpecification, app_id: int = 7) -> DeployRecord:
+    program_hash = hashlib.sha256(hashlib.sha256(APPROVAL.encode()).digest()).hexdigest()
+    clear_hash = hashlib.sha256(hashlib.sha256(CLEAR.encode()).digest()).hexdigest()
+    return DeployRecord(
+        app_id=app_id,
+        genesis_hash="genesis",
+        teal_hash=deploy_plan._teal_hash(app_spec),
+        approval_hash=program_hash,
+        clear_hash=clear_hash,
+        schema=Schema(1, 1, 0, 0, 0),
+    )
+
+
+@pytest.fixture(autouse=True)
+def state_dirs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(deploy_plan, "DEPLOY_STATE_DIR", tmp_path / "deploy_state")
+    monkeypatch.setattr(build, "TEAL_CACHE_DIR", tmp_path / "teal")
+
+
+def test_creates_without_record() -> None:
+    plan = plan_deploy(FakeAlgod(), _app_spec())  # type: ignore[arg-type]
+    assert plan.action == DeployAction.CREATE
+    assert plan.approval_program is not None
+
+
+def test_skips_unchanged_without_compiling() -> None:
+    algod = FakeAlgod()
+    algod.deploy(7, APPROVAL, CLEAR)
+    app_spec = _app_spec()
+    deploy_plan.save_record("testnet-v1", "Contract", _record(app_spec))
+    plan = plan_deploy(algod, app_spec)  # type: ignore[arg-type]
+    assert plan.action == DeployAction.SKIP
+    assert algod.compiles == 0
+
+
+def test_recreates_when_app_was_deleted() -> None:
+    app_spec = _app_spec()
+    deploy_plan.save_record("testnet-v1", "Contract", _record(app_spec))
+    plan = plan_deploy(FakeAlgod(), app_spec)  # type: ignore[arg-type]
+    assert plan.action == DeployAction.CREATE
+
+
+def test_updates_changed_program() -> None:
+    algod = FakeAlgod()
+    algod.deploy(7, APPROVAL, CLEAR)
+    deploy_plan.save_record("testnet-v1", "Contract", _record(_app_spec()))
+    plan = plan_deploy(algod, _app_spec(approval=APPROVAL + "int 2\n"))  # type: ignore[arg-type]
+    assert plan.action == DeployAction.UPDATE
+    assert plan.app_id == 7
+
+
+def test_replaces_on_schema_growth_or_when_not_updatable() -> None:
+    algod = FakeAlgod()
+    algod.deploy(7, APPROVAL, CLEAR)
+    deploy_plan.save_record("testnet-v1", "Contract", _record(_app_spec()))
+    grown = plan_deploy(algod, _app_spec(global_bytes=2))  # type: ignore[arg-type]
+    assert grown.action == DeployAction.REPLACE
+    locked = plan_deploy(algod, _app_spec(approval=APPROVAL + "int 2\n", updatable=False))  # type: ignore[arg-type]
+    assert locked.action == DeployAction.REPLACE
+
+
+def test_new_app_account_is_funded(monkeypatch: pytest.MonkeyPatch) -> None:
+    sent: list[transaction.Transaction] = []
+
+    def fake_send(algod_client: object, txn: transaction.Transaction, deployer: object) -> dict[str, Any]:
+        sent.append(txn)
+        return {"application-index": 9}
+
+    monkeypatch.setattr(deploy_plan, "_send", fake_send)
+    _, address = account.generate_account()
+    plan = plan_deploy(FakeAlgod(), _app_spec(), app_funds=500_000)  # type: ignore[arg-type]
+    assert "nạp 500000 microAlgo" in plan.describe()
+
+    assert execute_plan(FakeAlgod(), plan, Account(private_key="", address=address)) == 9  # type: ignore[arg-type]
+    create, payment = sent
+    assert isinstance(create, transaction.ApplicationCreateTxn)
+    assert isinstance(payment, transaction.PaymentTxn)
+    assert (payment.receiver, payment.amt) == (get_application_address(9), 500_000)
+
+
+def test_update_does_not_fund() -> None:
+    algod = FakeAlgod()
+    algod.deploy(7, APPROVAL, CLEAR)
+    deploy_plan.save_record("testnet-v1", "Contract", _record(_app_spec()))
+    plan = plan_deploy(algod, _app_spec(approval=APPROVAL + "int 2\n"), app_funds=500_000)  # type: ignore[arg-type]
+    assert plan.app_funds == 0
+    assert "nạp" not in plan.describe()
@@ -0,0 +1,87 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+import smart_contracts.__main__ as main_module
+from smart_contracts._helpers.config import SmartContract, import_deploy_config
+
+
+def _noop_deploy() -> None:
+    pass
+
+
+def _contract(name: str, *depends_on: str) -> SmartContract:
+    return SmartContract(Path(name), name, _noop_deploy, list(depends_on))
+
+
+def test_deploy_order_drops_out_of_scope_dependencies():
+    pending = main_module.deploy_order([_contract("a"), _contract("b", "a", "external"), _contract("c", "b")])
+    assert pending == {"a": set(), "b": {"a"}, "c": {"b"}}
+
+
+def test_deploy_order_rejects_cycles():
+    with pytest.raises(Exception, match="chu trình"):
+        main_module.deploy_order([_contract("a", "c"), _contract("b", "a"), _contract("c", "b"), _contract("d")])
+
+
+def test_deploy_all_waits_for_dependencies(monkeypatch: pytest.MonkeyPatch):
+    lock = threading.Lock()
+    finished: list[str] = []
+
+    def fake_deploy(app_spec: Path, deploy: object, *, dry_run: bool) -> None:
+        name = app_spec.name
+        with lock:
+            assert set(by_name[name].depends_on) <= set(finished), f"{name} được triển khai trước phụ thuộc"
+            finished.append(name)
+
+    monkeypatch.setattr(main_module, "deploy", fake_deploy)
+    selected = [_contract("d", "b", "c"), _contract("b", "a"), _contract("c", "a"), _contract("a"), _contract("e")]
+    by_name = {contract.name: contract for contract in selected}
+    timings: dict[str, dict[str, float]] = {contract.name: {} for contract in selected}
+
+    main_module.deploy_all(selected, {name: Path(name) for name in by_name}, 3, timings)
+    assert sorted(finished) == ["a", "b", "c", "d", "e"]
+    assert finished.index("d") > max(finished.index("b"), finished.index("c"))
+    assert all("deploy" in phases for phases in timings.values())
+
+
+def test_deploy_all_stops_dependents_after_failure(monkeypatch: pytest.MonkeyPatch):
+    deployed: list[str] = []
+
+    def fake_deploy(app_spec: Path, deploy: object, *, dry_run: bool) -> None:
+        if app_spec.name == "a":
+            raise RuntimeError("triển khai thất bại")
+        deployed.append(app_spec.name)
+
+    monkeypatch.setattr(main_module, "deploy", fake_deploy)
+    selected = [_contract("a"), _contract("b", "a")]
+    timings: dict[str, dict[str, float]] = {"a": {}, "b": {}}
+    with pytest.raises(RuntimeError):
+        main_module.deploy_all(selected, {"a": Path("a"), "b": Path("b")}, 2, timings)
+    assert deployed == []
+
+
+@pytest.fixture
+def contracts_package(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    package = tmp_path / "deploy_test_contracts"
+    for folder in (package, package / "plain", package / "broken", package / "ok"):
+        folder.mkdir()
+        (folder / "__init__.py").write_text("")
+    (package / "broken" / "deploy_config.py").write_text("import missing_generated_client\n")
+    (package / "ok" / "deploy_config.py").write_text("DEPENDS_ON = ['plain']\n\ndef deploy() -> None:\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package
+    for name in [name for name in sys.modules if name.startswith("deploy_test_contracts")]:
+        del sys.modules[name]
+
+
+def test_import_deploy_config(contracts_package: Path):
+    assert import_deploy_config(contracts_package / "plain") == (None, [])
+    deploy, depends_on = import_deploy_config(contracts_package / "ok")
+    assert callable(deploy)
+    assert depends_on == ["plain"]
+    # Lỗi import bên trong deploy_config.py không được coi là "không có deploy"
+    with pytest.raises(ModuleNotFoundError, match="missing_generated_client"):
+        import_deploy_config(contracts_package / "broken")
@@ -0,0 +1,36 @@
+from smart_contracts._helpers.fulltext import InvertedIndex, tokenize
+
+
+def test_tokenize_folds_vietnamese_diacritics():
+    assert tokenize("Đại học Giao thông") == ["dai", "hoc", "giao", "thong"]
+    assert tokenize("Đại học", fold_diacritics=False) == ["đại", "học"]
+
+
+def test_search_matches_all_terms_and_ranks_by_bm25():
+    index = InvertedIndex()
+    index.add_document("doc-1", "Cấu trúc dữ liệu", "Cây nhị phân và bảng băm")
+    index.add_document("doc-2", "Giải thuật", "Bảng băm, bảng băm và bảng băm")
+    index.add_document("doc-3", "Mạng máy tính", "Giao thức định tuyến")
+
+    assert index.search("bảng băm") == ["doc-2", "doc-1"], "Tài liệu có tần suất cao hơn phải xếp trước"
+    assert index.search("bang bam", rank=False) == ["doc-1", "doc-2"]
+    assert index.search("bảng định tuyến") == []
+    assert index.search("không tồn tại") == []
+
+
+def test_duplicate_doc_id_is_ignored():
+    index = InvertedIndex()
+    assert index.add_document("doc-1", "Tiêu đề", "Nội dung")
+    assert not index.add_document("doc-1", "Tiêu đề khác", "Nội dung khác")
+    assert len(index) == 1
+    assert index.search("khác") == []
+
+
+def test_postings_are_delta_encoded():
+    index = InvertedIndex()
+    for i in range(300):
+        index.add_document(f"doc-{i}", "chung", f"riêng{i}")
+
+    # 300 posting liên tiếp: mỗi posting gồm khoảng cách 1 byte và tần suất 1 byte
+    assert len(index.postings["chung"]) == 600
+    assert index.search("chung", limit=300, rank=False) == [f"doc-{i}" for i in range(300)]
@@ -0,0 +1,101 @@
+import base64
+import hashlib
+import io
+from pathlib import Path
+from typing import Any
+
+from algokit_utils import Account
+from algosdk import abi, account
+from algosdk.atomic_transaction_composer import ABI_RETURN_HASH
+from algosdk.transaction import SuggestedParams
+
+from smart_contracts._helpers.boxes import data_anchor_box
+from smart_contracts._helpers.hashing import (
+    ANCHOR_DATA_HASH_METHOD,
+    anchor_file,
+    sha256_file,
+    sha256_stream,
+    verify_file,
+)
+
+
+def _return_log(message: str) -> str:
+    return base64.b64encode(ABI_RETURN_HASH + abi.StringType().encode(message)).decode()
+
+
+class FakeAlgod:
+    """algod giả: ghi lại giao dịch đã gửi và mô phỏng verify_data_hash trên tập digest đã neo"""
+
+    def __init__(self, anchored: set[bytes] = frozenset()) -> None:
+        self.anchored = anchored
+        self.sent: list[Any] = []
+        self.simulate_requests: list[Any] = []
+
+    def suggested_params(self) -> SuggestedParams:
+        return SuggestedParams(fee=1000, first=1, last=1001, gh=base64.b64encode(b"\0" * 32).decode(), flat_fee=True)
+
+    def send_transactions(self, signed: list[Any]) -> str:
+        self.sent += signed
+        return signed[0].get_txid()
+
+    def status(self) -> dict[str, Any]:
+        return {"last-round": 1}
+
+    def pending_transaction_info(self, txid: str) -> dict[str, Any]:
+        return {"confirmed-round": 2, "logs": [_return_log("Đã lưu hash của dữ liệu")]}
+
+    def simulate_transactions(self, request: Any, **kwargs: Any) -> dict[str, Any]:
+        self.simulate_requests.append(request)
+        (group,) = request.txn_groups
+        (stxn,) = group.txns
+        digest = abi.ABIType.from_string("byte[]").decode(stxn.transaction.app_args[1])
+        if bytes(digest) in self.anchored:
+            message = "Dữ liệu không bị thay đổi và toàn vẹn"
+        else:
+            message = "Không tìm thấy hash của dữ liệu trên blockchain"
+        return {"txn-groups": [{"txn-results": [{"txn-result": {"logs": [_return_log(message)]}}]}], "last-round": 1}
+
+
+def _file(tmp_path: Path, data: bytes) -> Path:
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    return path
+
+
+def test_sha256_stream_matches_hashlib_for_any_read_size():
+    data = bytes(range(256)) * 1000
+    for read_size in (1, 7, 4096, len(data) + 1):
+        assert sha256_stream(io.BytesIO(data), read_size) == hashlib.sha256(data).digest()
+    assert sha256_stream(io.BytesIO(b"")) == hashlib.sha256(b"").digest()
+
+
+def test_sha256_file(tmp_path: Path):
+    data = b"tai lieu" * 10_000
+    assert sha256_file(_file(tmp_path, data), read_size=1000) == hashlib.sha256(data).digest()
+
+
+def test_anchor_file_sends_digest_with_anchor_box(tmp_path: Path):
+    private_key, address = account.generate_account()
+    algod = FakeAlgod()
+    path = _file(tmp_path, b"noi dung")
+
+    sender = Account(private_key=private_key, address=address)
+    digest = anchor_file(algod, 7, sender, path, "nhãn")  # type: ignore[arg-type]
+    assert digest == hashlib.sha256(b"noi dung").digest()
+    (stxn,) = algod.sent
+    txn = stxn.transaction
+    assert txn.app_args[0] == ANCHOR_DATA_HASH_METHOD.get_selector()
+    assert [box.name for box in txn.boxes] == [data_anchor_box(digest)]
+
+
+def test_verify_file_is_simulated_without_signing(tmp_path: Path):
+    _, address = account.generate_account()
+    path = _file(tmp_path, b"noi dung")
+    algod = FakeAlgod(anchored={hashlib.sha256(b"noi dung").digest()})
+
+    assert verify_file(algod, 7, address, path) == "Dữ liệu không bị thay đổi và toàn vẹn"  # type: ignore[arg-type]
+    path.write_bytes(b"noi dung da sua")
+    result = verify_file(algod, 7, address, path)  # type: ignore[arg-type]
+    assert result == "Không tìm thấy hash của dữ liệu trên blockchain"
+    assert not algod.sent, "Kiểm tra không được gửi giao dịch trả phí"
+    assert all(request.allow_empty_signatures for request in algod.simulate_requests)
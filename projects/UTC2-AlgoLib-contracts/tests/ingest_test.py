@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers.boxes import MAX_BOX_REFS_PER_TXN, MAX_GROUP_SIZE, resource_size_box
+from smart_contracts._helpers.ingest import (
+    _DOCUMENTS_ARG_BUDGET,
+    DOCUMENT_TUPLE_TYPE,
+    _record_values,
+    pack_groups,
+    read_records,
+)
+
+
+def _record(i: int, content: str = "nội dung") -> dict:
+    return {
+        "doc_id": f"doc-{i}",
+        "title": "Tiêu đề",
+        "author": "tác giả",
+        "year": 2020,
+        "field": "tin-hoc",
+        "content": content,
+    }
+
+
+def _call_size(call: list[dict]) -> int:
+    return sum(len(DOCUMENT_TUPLE_TYPE.encode(_record_values(record))) + 2 for record in call)
+
+
+def test_groups_respect_arg_and_box_budgets() -> None:
+    # Mỗi tài liệu 1500 byte UTF-8 cần 3 box (kích thước + 2 khối) nhưng ít hơn 1024 ký tự
+    records = [_record(i, "ệ" * 500) for i in range(60)]
+    groups = list(pack_groups(records))
+    assert sum(group.document_count for group in groups) == 60
+    for group in groups:
+        assert group.txn_count <= MAX_GROUP_SIZE
+        assert all(_call_size(call) <= _DOCUMENTS_ARG_BUDGET for call in group.calls)
+        assert len(group.boxes) == 3 * group.document_count
+        assert len(group.boxes) <= MAX_GROUP_SIZE * MAX_BOX_REFS_PER_TXN
+
+
+def test_small_documents_share_one_call() -> None:
+    (group,) = pack_groups([_record(i) for i in range(5)])
+    assert len(group.calls) == 1
+    assert group.boxes[0] == resource_size_box("doc-0")
+
+
+def test_oversized_document_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        list(pack_groups([_record(0, "x" * 3000)]))
+
+
+def test_read_records_from_jsonl_and_csv(tmp_path: Path) -> None:
+    jsonl = tmp_path / "docs.jsonl"
+    jsonl.write_text(json.dumps({**_record(1), "year": "2021"}, ensure_ascii=False) + "\n\n", encoding="utf-8")
+    csv_file = tmp_path / "docs.csv"
+    csv_file.write_text("doc_id,title,author,year,field,content\ndoc-2,T,A,2022,F,C\n", encoding="utf-8")
+    assert [record["year"] for record in read_records(jsonl)] == [2021]
+    assert next(read_records(csv_file))["doc_id"] == "doc-2"
+
+
+def test_read_records_reports_missing_fields(tmp_path: Path) -> None:
+    path = tmp_path / "docs.jsonl"
+    path.write_text(json.dumps({"doc_id": "doc-1"}) + "\n")
+    with pytest.raises(ValueError, match="thiếu trường"):
+        list(read_records(path))
@@ -0,0 +1,111 @@
+import base64
+import os
+from pathlib import Path
+
+import pytest
+from Crypto.Random import get_random_bytes
+
+from smart_contracts._helpers import keystore
+from smart_contracts._helpers.keystore import EnvelopeKeyring, KeyCache, unwrap_data_key, wrap_data_key
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeKeyring:
+    def __init__(self) -> None:
+        self.passwords: dict[tuple[str, str], str] = {}
+
+    def get_password(self, service: str, name: str) -> str | None:
+        return self.passwords.get((service, name))
+
+    def set_password(self, service: str, name: str, value: str) -> None:
+        self.passwords[(service, name)] = value
+
+
+@pytest.fixture
+def key_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "keys" / "master.key"
+    monkeypatch.delenv("AES_KEY", raising=False)
+    monkeypatch.setitem(keystore.KEY_STORAGE_CONFIG, "use_keyring", value=False)
+    monkeypatch.setitem(keystore.KEY_STORAGE_CONFIG, "key_file", str(path))
+    return path
+
+
+def test_key_cache_expires_and_evicts_least_recently_used():
+    clock = FakeClock(0)
+    cache = KeyCache(max_size=2, ttl=10, clock=clock)
+    cache.put(("r1", "w1"), b"k1")
+    cache.put(("r2", "w2"), b"k2")
+    assert cache.get(("r1", "w1")) == b"k1"
+    cache.put(("r3", "w3"), b"k3")
+    assert cache.get(("r2", "w2")) is None, "Mục ít được dùng nhất phải bị loại"
+    assert len(cache) == 2
+
+    clock.now = 10
+    assert cache.get(("r1", "w1")) is None
+    assert len(cache) == 1
+
+
+def test_wrap_and_unwrap_are_bound_to_resource():
+    master_key = get_random_bytes(32)
+    data_key = get_random_bytes(32)
+    wrapped = wrap_data_key(master_key, data_key, "r1")
+    assert unwrap_data_key(master_key, wrapped, "r1") == data_key
+    with pytest.raises(ValueError):
+        unwrap_data_key(master_key, wrapped, "r2")
+    with pytest.raises(ValueError):
+        unwrap_data_key(get_random_bytes(32), wrapped, "r1")
+
+
+def test_envelope_keyring_unwraps_once_per_cached_key(monkeypatch: pytest.MonkeyPatch):
+    envelope = EnvelopeKeyring(get_random_bytes(32), KeyCache(max_size=8, ttl=60))
+    data_key, wrapped = envelope.new_data_key("r1")
+    envelope.cache.clear()
+
+    calls = []
+    unwrap = keystore.unwrap_data_key
+    monkeypatch.setattr(keystore, "unwrap_data_key", lambda *args: calls.append(args) or unwrap(*args))
+    assert envelope.data_key("r1", wrapped) == data_key
+    assert envelope.data_key("r1", wrapped) == data_key
+    assert len(calls) == 1
+
+
+def test_master_key_from_environment(monkeypatch: pytest.MonkeyPatch):
+    key = get_random_bytes(32)
+    monkeypatch.setenv("AES_KEY", base64.b64encode(key).decode())
+    assert keystore.load_master_key() == key
+
+
+def test_master_key_from_keyring_is_created_once(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("AES_KEY", raising=False)
+    monkeypatch.setitem(keystore.KEY_STORAGE_CONFIG, "use_keyring", value=True)
+    monkeypatch.setattr(keystore, "keyring", FakeKeyring())
+    key = keystore.load_master_key()
+    assert len(key) == 32
+    assert keystore.load_master_key() == key
+
+
+def test_master_key_file_is_created_private_and_reused(key_file: Path):
+    key = keystore.load_master_key()
+    assert key_file.stat().st_mode & 0o777 == 0o600
+    assert keystore.load_master_key() == key
+
+
+def test_master_key_file_race_uses_winner_key(key_file: Path, monkeypatch: pytest.MonkeyPatch):
+    winner_key = get_random_bytes(32)
+    real_open = os.open
+
+    def open_after_other_process(path: Path, flags: int, mode: int = 0o777) -> int:
+        # Tiến trình khác tạo file giữa lúc kiểm tra exists() và os.open(O_EXCL)
+        Path(path).write_text(base64.b64encode(winner_key).decode())
+        return real_open(path, flags, mode)
+
+    key_file.parent.mkdir(parents=True)
+    monkeypatch.setattr(keystore.os, "open", open_after_other_process)
+    assert keystore.load_master_key() == winner_key
@@ -0,0 +1,85 @@
+import asyncio
+import random
+
+import pytest
+
+from smart_contracts._helpers import loadtest
+from smart_contracts._helpers.loadtest import (
+    WORKLOADS,
+    BenchmarkConfig,
+    _Context,
+    _drive,
+    _Sample,
+    compare_reports,
+    parse_workload,
+    percentile,
+    summarize,
+)
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7.0], 0.95) == 7
+    assert percentile([], 0.5) == 0
+
+
+def test_summary_reports_each_method_and_total() -> None:
+    samples = [_Sample("add_document", 4.0, ok=True), _Sample("add_document", 6.0, ok=False)]
+    samples += [_Sample("search_documents", 0.01, ok=True)] * 3
+    report = summarize(samples, seconds=2.0)
+    assert report["add_document"]["failure_rate"] == 0.5
+    assert report["add_document"]["mode"] == "confirmed"
+    assert report["search_documents"]["mode"] == "simulate"
+    assert report["search_documents"]["tps"] == 1.5
+    assert report["total"]["calls"] == 5
+    assert report["total"]["p99_ms"] == 4000
+
+
+def test_parse_workload() -> None:
+    assert parse_workload("search") == WORKLOADS["search"]
+    assert parse_workload("add_document=2,get_token_balance") == {"add_document": 2, "get_token_balance": 1}
+    with pytest.raises(ValueError):
+        parse_workload("drop_table")
+
+
+def test_drive_follows_the_mix_at_the_target_rate(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def instant(worker: object, ctx: object, seq: int) -> None:
+        return None
+
+    async def failing(worker: object, ctx: object, seq: int) -> None:
+        raise RuntimeError("bị từ chối")
+
+    monkeypatch.setattr(loadtest, "OPERATIONS", {"ok": instant, "fail": failing})
+    ctx = _Context(documents=[], rng=random.Random(0))
+    workers = [object()]
+    samples = asyncio.run(_drive(workers, ctx, {"ok": 3, "fail": 1}, rate=200, duration=0.5))  # type: ignore[arg-type]
+    assert len(samples) == 100
+    assert {sample.operation for sample in samples} == {"ok", "fail"}
+    assert all(sample.ok == (sample.operation == "ok") for sample in samples)
+
+
+def test_compare_reports_lists_new_and_changed_methods() -> None:
+    stats = {"tps": 10.0, "p95_ms": 100.0, "failure_rate": 0.0}
+    lines = compare_reports(
+        {"commit": "abc123", "methods": {"total": stats}},
+        {"methods": {"total": {**stats, "tps": 12.0}, "add_document": stats}},
+    )
+    assert lines[0] == "So với abc123:"
+    assert "TPS 10.0 -> 12.0" in lines[1]
+    assert lines[2] == "  add_document: mới"
+
+
+def test_benchmark_config_is_validated_up_front() -> None:
+    BenchmarkConfig(workload="ingest", seed_documents=0)
+    with pytest.raises(ValueError, match="get_document_content"):
+        BenchmarkConfig(workload="search", seed_documents=0)
+    with pytest.raises(ValueError, match="check_access_rights"):
+        BenchmarkConfig(workload="add_document=1,check_access_rights=1", seed_documents=0)
+    for kwargs in ({"rate": 0}, {"duration": -1}, {"workers": 0}, {"seed_documents": -1}):
+        with pytest.raises(ValueError):
+            BenchmarkConfig(**kwargs)  # type: ignore[arg-type]
+    for workload in ("drop_table", "add_document=0", "add_document=-1"):
+        with pytest.raises(ValueError):
+            BenchmarkConfig(workload=workload)
@@ -0,0 +1,73 @@
+import pytest
+
+from smart_contracts._helpers.merkle import (
+    MerkleProof,
+    build_merkle_tree,
+    leaf_hash,
+    node_hash,
+    valid_proof_shape,
+    verify_proof,
+)
+
+
+def _items(count: int) -> list[bytes]:
+    return [f"bản ghi {i}".encode() for i in range(count)]
+
+
+def test_root_of_four_leaves():
+    items = _items(4)
+    leaves = [leaf_hash(item) for item in items]
+    expected = node_hash(node_hash(leaves[0], leaves[1]), node_hash(leaves[2], leaves[3]))
+    assert build_merkle_tree(items).root == expected
+
+
+def test_unbalanced_tree_folds_right_to_left():
+    items = _items(3)
+    leaves = [leaf_hash(item) for item in items]
+    assert build_merkle_tree(items).root == node_hash(node_hash(leaves[0], leaves[1]), leaves[2])
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 8, 13, 33])
+def test_every_proof_verifies(count: int):
+    tree = build_merkle_tree(iter(_items(count)), proof_indices=range(count), batch_size=4)
+    assert tree.leaf_count == count
+    for index in range(count):
+        assert verify_proof(tree.root, count, tree.proofs[index]), f"Bằng chứng của lá {index} không hợp lệ"
+
+
+def test_tampered_proof_is_rejected():
+    tree = build_merkle_tree(_items(10), proof_indices=[3])
+    proof = tree.proofs[3]
+    proof.path_bits ^= 1
+    assert not verify_proof(tree.root, 10, proof)
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        build_merkle_tree([])
+    with pytest.raises(ValueError):
+        build_merkle_tree(_items(2), proof_indices=[5])
+
+
+@pytest.mark.parametrize("count", [1, 3, 6, 7, 8, 13])
+def test_proof_shapes_are_exactly_the_leaf_paths(count: int):
+    tree = build_merkle_tree(_items(count), proof_indices=range(count))
+    leaf_paths = {(len(proof.siblings), proof.path_bits) for proof in tree.proofs.values()}
+    valid = {
+        (length, path_bits)
+        for length in range(8)
+        for path_bits in range(1 << 8)
+        if valid_proof_shape(count, length, path_bits)
+    }
+    assert valid == leaf_paths
+
+
+def test_internal_node_cannot_pass_as_item():
+    items = _items(4)
+    tree = build_merkle_tree(items, proof_indices=[0])
+    right = node_hash(leaf_hash(items[2]), leaf_hash(items[3]))
+    # Coi nút trong là phần tử với bằng chứng ngắn hơn
+    forged = MerkleProof(0, b"\x01" + leaf_hash(items[0]) + leaf_hash(items[1]), [right], 0)
+    assert not verify_proof(tree.root, 4, forged)
+    assert verify_proof(tree.root, 4, tree.proofs[0])
+    assert not verify_proof(tree.root, 5, tree.proofs[0]), "Bằng chứng phải khớp số lá đã neo"
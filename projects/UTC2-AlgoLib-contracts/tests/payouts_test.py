@@ -0,0 +1,100 @@
+import base64
+
+import pytest
+from algokit_utils import Account
+from algosdk import abi, account, transaction
+
+from smart_contracts._helpers.boxes import ABI_RETURN_PREFIX, MAX_APP_ARGS_SIZE, MAX_GROUP_SIZE
+from smart_contracts._helpers.payouts import (
+    TRANSFER_TOKENS_BATCH_METHOD,
+    PayoutError,
+    net_payouts,
+    pack_payout_groups,
+    send_payouts,
+)
+
+_TRANSFERS_TYPE = TRANSFER_TOKENS_BATCH_METHOD.args[0].type
+
+
+def _recipient(index: int) -> str:
+    return f"người nhận {index:05d}"
+
+
+class FakeAlgod:
+    """algod giả: xác nhận ngay mọi giao dịch, từ chối (bằng chuỗi trả về) lời gọi có người nhận trong reject"""
+
+    def __init__(self, reject: set[str] = frozenset()) -> None:
+        self.reject = reject
+        self.sent: dict[str, transaction.ApplicationCallTxn] = {}
+        self.group_sizes: list[int] = []
+
+    def suggested_params(self) -> transaction.SuggestedParams:
+        return transaction.SuggestedParams(fee=1000, first=1, last=1001, gh=base64.b64encode(bytes(32)).decode())
+
+    def send_transactions(self, signed: list) -> str:
+        self.group_sizes.append(len(signed))
+        for stxn in signed:
+            self.sent[stxn.get_txid()] = stxn.transaction
+        return signed[0].get_txid()
+
+    def status(self) -> dict:
+        return {"last-round": 1}
+
+    def pending_transaction_info(self, txid: str) -> dict:
+        transfers = _TRANSFERS_TYPE.decode(self.sent[txid].app_args[1])
+        if any(recipient in self.reject for recipient, _ in transfers):
+            message = "Không đủ token để chuyển"
+        else:
+            message = f"Đã chuyển {sum(amount for _, amount in transfers)} token"
+        log = ABI_RETURN_PREFIX + abi.StringType().encode(message)
+        return {"confirmed-round": 2, "logs": [base64.b64encode(log).decode()]}
+
+
+def _sender() -> Account:
+    private_key, address = account.generate_account()
+    return Account(private_key=private_key, address=address)
+
+
+def test_net_payouts_merges_recipients_and_rejects_non_positive():
+    assert net_payouts([("A", 5), ("B", 1), ("A", 2)]) == {"A": 7, "B": 1}
+    with pytest.raises(ValueError):
+        net_payouts([("A", 5), ("B", 0)])
+
+
+def test_pack_payout_groups_fills_calls_and_groups():
+    payouts = {_recipient(i): i + 1 for i in range(3000)}
+    groups = list(pack_payout_groups(payouts))
+
+    packed = [item for group in groups for call in group for item in call]
+    assert packed == list(payouts.items()), "Phải giữ nguyên thứ tự và không bỏ sót khoản nào"
+    for group in groups:
+        assert 1 <= len(group) <= MAX_GROUP_SIZE
+        for call in group:
+            assert len(TRANSFER_TOKENS_BATCH_METHOD.get_selector() + _TRANSFERS_TYPE.encode(call)) <= MAX_APP_ARGS_SIZE
+    assert all(len(group) == MAX_GROUP_SIZE for group in groups[:-1]), "Chỉ nhóm cuối được thiếu lời gọi"
+
+
+def test_pack_payout_groups_empty():
+    assert list(pack_payout_groups({})) == []
+
+
+def test_send_payouts_confirms_every_group():
+    algod = FakeAlgod()
+    payouts = [(_recipient(i), 10) for i in range(2000)]
+    sent = send_payouts(algod, 1, _sender(), payouts, max_in_flight=2)
+    assert sent == len(algod.group_sizes) > 1
+    assert sum(algod.group_sizes) == len(algod.sent)
+
+
+def test_send_payouts_reports_rejected_payees():
+    rejected = _recipient(3)
+    algod = FakeAlgod(reject={rejected})
+    payouts = [(_recipient(i), i + 1) for i in range(2000)]
+    with pytest.raises(PayoutError) as exc_info:
+        send_payouts(algod, 1, _sender(), payouts)
+
+    failed = exc_info.value.failed
+    assert failed[rejected] == (4, "Không đủ token để chuyển")
+    # Cả lời gọi chứa người nhận bị từ chối đều không được thực hiện, các lời gọi khác không bị ảnh hưởng
+    assert 1 < len(failed) < len(payouts)
+    assert len(algod.group_sizes) > 1
@@ -0,0 +1,84 @@
+import base64
+
+from smart_contracts._helpers.profiler import (
+    GROUP_OPCODE_BUDGET,
+    check_regressions,
+    growth,
+    measure,
+)
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _point(size: int, opcodes: int, **metrics: int) -> dict:
+    values = {"box_refs": 1, "box_bytes_read": 0, "box_bytes_written": 0, "app_calls": 1, "inner_txns": 0}
+    return {"size": size, "opcodes": opcodes, **values, **metrics}
+
+
+def test_measure_reads_budget_boxes_and_inner_transactions() -> None:
+    box_write = {"app-state-type": "b", "operation": "w", "key": _b64(b"rdoc"), "new-value": {"bytes": _b64(b"x" * 30)}}
+    inner_appl = {"txn": {"txn": {"type": "appl"}}, "inner-txns": [{"txn": {"txn": {"type": "pay"}}}]}
+    group_result = {
+        "app-budget-consumed": 1500,
+        "unnamed-resources-accessed": {"boxes": [{"app": 1, "name": _b64(b"rdoc")}]},
+        "txn-results": [
+            {
+                "txn-result": {"inner-txns": [inner_appl]},
+                "exec-trace": {"approval-program-trace": [{"pc": 1, "state-changes": [box_write]}]},
+                "unnamed-resources-accessed": {"boxes": [{"app": 1, "name": _b64(b"cdoc/0")}]},
+            }
+        ],
+    }
+    sizes = {b"rdoc": 8, b"cdoc/0": 3000}
+    metrics = measure(group_result, sizes.__getitem__)
+    assert metrics == {
+        "opcodes": 1500,
+        # 3008 byte cần 3 reference dù chỉ chạm 2 box
+        "box_refs": 3,
+        "box_bytes_read": 3008,
+        "box_bytes_written": 30,
+        "app_calls": 2,
+        "inner_txns": 2,
+    }
+
+
+def test_growth_is_cost_per_document() -> None:
+    points = [_point(0, 100), _point(10, 300), _point(50, 1100)]
+    assert growth(points, "opcodes") == 20
+    assert growth(points[:1], "opcodes") == 0
+
+
+def test_regressions_against_baseline() -> None:
+    baseline = {"methods": {"search_documents": {"points": [_point(0, 100), _point(50, 1000)]}}}
+    current = {"methods": {"search_documents": {"points": [_point(0, 104), _point(50, 1200)]}}}
+    assert check_regressions(baseline, current, tolerance=0.05) == [
+        "search_documents @ 50 tài liệu: opcodes 1000 -> 1200"
+    ]
+
+
+def test_budget_overflow_is_reported_without_baseline() -> None:
+    current = {"methods": {"add_document": {"points": [_point(100, GROUP_OPCODE_BUDGET + 1)]}}}
+    (problem,) = check_regressions({}, current)
+    assert "vượt ngân sách nhóm" in problem
+
+
+def test_rejected_calls_are_not_compared() -> None:
+    baseline = {"methods": {"get_data_anchor": {"points": [{**_point(0, 10), "error": "assert failed"}]}}}
+    current = {"methods": {"get_data_anchor": {"points": [{**_point(0, 500), "error": "assert failed"}]}}}
+    assert check_regressions(baseline, current) == []
+
+
+def test_newly_rejected_call_is_a_regression() -> None:
+    baseline = {"methods": {"get_data_anchor": {"points": [_point(0, 10)]}}}
+    current = {"methods": {"get_data_anchor": {"points": [{**_point(0, 500), "error": "assert failed"}]}}}
+    assert check_regressions(baseline, current) == [
+        "get_data_anchor @ 0 tài liệu: baseline chạy được, nay lỗi assert failed"
+    ]
+
+
+def test_method_missing_from_current_is_a_regression() -> None:
+    baseline = {"methods": {"search_documents": {"points": [_point(0, 100)]}, "get_data_anchor": {"points": []}}}
+    current = {"methods": {"search_documents": {"points": [_point(0, 100)]}}}
+    assert check_regressions(baseline, current) == ["get_data_anchor: có trong baseline nhưng không còn được đo"]
@@ -0,0 +1,83 @@
+import base64
+from typing import Any
+
+import pytest
+from algosdk import account, encoding
+from algosdk.abi import StringType, UintType
+from algosdk.atomic_transaction_composer import ABI_RETURN_HASH
+from algosdk.transaction import SuggestedParams
+
+from smart_contracts._helpers.readonly import (
+    CHECK_ACCESS_RIGHTS_METHOD,
+    GET_TOKEN_BALANCE_METHOD,
+    ReadOnlyCallError,
+    ReadOnlyClient,
+)
+
+
+class FakeAlgod:
+    """algod giả: simulate trả về giá trị ABI là số thứ tự của giao dịch trong nhóm"""
+
+    def __init__(self, failure: str | None = None) -> None:
+        self.failure = failure
+        self.simulate_requests: list[dict[str, Any]] = []
+        self.params_calls = 0
+
+    def suggested_params(self) -> SuggestedParams:
+        self.params_calls += 1
+        return SuggestedParams(fee=1000, first=1, last=1001, gh=base64.b64encode(b"\0" * 32).decode(), flat_fee=True)
+
+    def simulate_transactions(self, request: Any, **kwargs: Any) -> dict[str, Any]:
+        self.simulate_requests.append(request)
+        (group,) = request.txn_groups
+        txn_results = []
+        for index, stxn in enumerate(group.txns):
+            method = stxn.transaction.app_args[0]
+            if method == CHECK_ACCESS_RIGHTS_METHOD.get_selector():
+                value = StringType().encode(f"ok {index}")
+            else:
+                value = UintType(64).encode(index)
+            txn_results.append({"txn-result": {"logs": [base64.b64encode(ABI_RETURN_HASH + value).decode()]}})
+        result: dict[str, Any] = {"txn-results": txn_results}
+        if self.failure:
+            result["failure-message"] = self.failure
+            result["failed-at"] = [1]
+        return {"txn-groups": [result], "last-round": 1, "version": 2}
+
+
+def _client(algod: FakeAlgod, **kwargs: Any) -> ReadOnlyClient:
+    _, address = account.generate_account()
+    return ReadOnlyClient(algod, 1, address, **kwargs)  # type: ignore[arg-type]
+
+
+def test_reads_are_batched_into_simulate_groups() -> None:
+    algod = FakeAlgod()
+    client = _client(algod)
+    results = client.call_many([(GET_TOKEN_BALANCE_METHOD, [])] * 40)
+    assert results == list(range(16)) * 2 + list(range(8))
+    assert len(algod.simulate_requests) == 3
+    assert all(request.allow_empty_signatures for request in algod.simulate_requests)
+    # Chỉ lấy suggested params một lần cho cả lô
+    assert algod.params_calls == 1
+
+
+def test_typed_wrapper_decodes_return_value() -> None:
+    client = _client(FakeAlgod())
+    assert client.check_access_rights("r", encoding.encode_address(b"\0" * 32), "read") == "ok 0"
+
+
+def test_suggested_params_expire_after_ttl() -> None:
+    now = [0.0]
+    algod = FakeAlgod()
+    client = _client(algod, params_ttl=10, clock=lambda: now[0])
+    client.get_token_balance()
+    client.get_token_balance()
+    now[0] = 11
+    client.get_token_balance()
+    assert algod.params_calls == 2
+
+
+def test_simulate_failure_names_the_method() -> None:
+    client = _client(FakeAlgod(failure="logic eval error"))
+    with pytest.raises(ReadOnlyCallError, match="get_token_balance: logic eval error"):
+        client.call_many([(GET_TOKEN_BALANCE_METHOD, [])] * 2)
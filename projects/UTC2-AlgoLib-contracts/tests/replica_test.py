@@ -0,0 +1,153 @@
+import base64
+from pathlib import Path
+from typing import Any
+
+import pytest
+from algosdk import abi
+
+from smart_contracts._helpers.boxes import ABI_RETURN_PREFIX, ADD_DOCUMENT_METHOD, ADD_DOCUMENTS_METHOD
+from smart_contracts._helpers.replica import (
+    ACCESS_ENCRYPTED_RESOURCE,
+    ACCESS_RESOURCE,
+    ADD_ENCRYPTED_RESOURCE,
+    ADD_GROUP_MEMBER,
+    ADD_RESOURCE,
+    BUY_TOKENS,
+    SET_ACCESS_RIGHTS,
+    SET_GROUP_RIGHTS,
+    SET_RESOURCE_OWNER,
+    TRANSFER_TOKENS,
+    TRANSFER_TOKENS_BATCH,
+    StateReplica,
+)
+
+APP_ID = 1234
+
+
+def _txn(sender: str, method: abi.Method, args: list, message: str, round_: int = 10) -> dict:
+    app_args = [method.get_selector()] + [arg.type.encode(value) for arg, value in zip(method.args, args, strict=True)]
+    log = ABI_RETURN_PREFIX + abi.StringType().encode(message)
+    return {
+        "sender": sender,
+        "confirmed-round": round_,
+        "application-transaction": {"application-args": [base64.b64encode(arg).decode() for arg in app_args]},
+        "logs": [base64.b64encode(log).decode()],
+    }
+
+
+class FakeIndexer:
+    """Trả về các trang giao dịch đã chuẩn bị và ghi lại các truy vấn"""
+
+    def __init__(self, pages: list[list[dict]], current_round: int) -> None:
+        self.pages = pages
+        self.current_round = current_round
+        self.queries: list[dict] = []
+
+    def search_transactions(self, **kwargs: Any) -> dict:
+        self.queries.append(kwargs)
+        index = int(kwargs["next_page"] or 0)
+        transactions = self.pages[index] if index < len(self.pages) else []
+        response = {"transactions": transactions, "current-round": self.current_round}
+        if index + 1 < len(self.pages):
+            response["next-token"] = str(index + 1)
+        return response
+
+    def health(self) -> dict:
+        return {"round": self.current_round}
+
+
+@pytest.fixture
+def replica(tmp_path: Path) -> StateReplica:
+    return StateReplica(tmp_path / "replica.db", FakeIndexer([], current_round=0), APP_ID)
+
+
+def test_only_successful_calls_are_applied(replica: StateReplica):
+    assert replica.apply_transaction(_txn("A", ADD_RESOURCE, ["r1", "dữ liệu"], "Đã thêm tài nguyên r1"))
+    assert not replica.apply_transaction(_txn("A", ADD_RESOURCE, ["r2", "x"], "Tài nguyên đã tồn tại"))
+    assert replica.get_resource("r1") == "dữ liệu"
+    assert replica.get_resource("r2") is None
+
+
+def test_token_balances(replica: StateReplica):
+    replica.apply_transaction(_txn("A", BUY_TOKENS, [100], "Đã mua 100 token"))
+    replica.apply_transaction(_txn("A", TRANSFER_TOKENS, ["B", 30], "Đã chuyển 30 token"))
+    replica.apply_transaction(_txn("A", TRANSFER_TOKENS_BATCH, [[("B", 5), ("C", 7)]], "Đã chuyển 12 token"))
+    replica.apply_transaction(_txn("B", ACCESS_RESOURCE, ["r1", 10], "Đã truy cập tài nguyên r1"))
+    replica.apply_transaction(_txn("C", ACCESS_ENCRYPTED_RESOURCE, ["r1", 2, "a2V5"], "Đã truy cập và giải mã"))
+    assert replica.get_token_balance("A") == 58
+    assert replica.get_token_balance("B") == 25
+    assert replica.get_token_balance("C") == 5
+    assert replica.get_token_balance("D") == 0
+
+
+def test_access_rights_follow_contract_precedence(replica: StateReplica):
+    replica.apply_transaction(_txn("ADMIN", SET_RESOURCE_OWNER, ["r1", "OWNER", "t"], "Đã đặt chủ sở hữu"))
+    replica.apply_transaction(_txn("ADMIN", SET_GROUP_RIGHTS, ["r1", "g1", "read,write", "t"], "Đã đặt quyền nhóm"))
+    replica.apply_transaction(_txn("ADMIN", ADD_GROUP_MEMBER, ["g1", "MEMBER", "t"], "Đã thêm thành viên"))
+    replica.apply_transaction(_txn("ADMIN", ADD_GROUP_MEMBER, ["g1", "LIMITED", "t"], "Đã thêm thành viên"))
+    replica.apply_transaction(_txn("ADMIN", SET_ACCESS_RIGHTS, ["r1", "LIMITED", "read", "t"], "Đã đặt quyền"))
+
+    assert replica.check_access_rights("r1", "OWNER", "delete")
+    assert replica.check_access_rights("r1", "MEMBER", "write")
+    assert not replica.check_access_rights("r1", "MEMBER", "delete")
+    # Quyền riêng được ưu tiên hơn quyền của nhóm
+    assert replica.check_access_rights("r1", "LIMITED", "read")
+    assert not replica.check_access_rights("r1", "LIMITED", "write")
+    assert not replica.check_access_rights("r1", "STRANGER", "read")
+
+    replica.apply_transaction(_txn("ADMIN", SET_GROUP_RIGHTS, ["r1", "g1", "", "t"], "Đã xóa quyền nhóm"))
+    assert not replica.check_access_rights("r1", "MEMBER", "read")
+
+
+def test_documents_and_encrypted_resources(replica: StateReplica):
+    replica.apply_transaction(
+        _txn("A", ADD_DOCUMENT_METHOD, ["d1", "Tiêu đề", "Tác giả", 2020, "toán", "nội dung"], "Đã thêm tài liệu d1")
+    )
+    replica.apply_transaction(_txn("A", ADD_ENCRYPTED_RESOURCE, ["e1", "bí mật", "a2V5"], "Đã thêm và mã hóa e1"))
+    assert replica.search_documents(field="toán") == [("d1", "Tiêu đề", "Tác giả", 2020, "toán")]
+    assert replica.get_resource("d1") == "nội dung"
+    assert replica.is_encrypted_resource("e1")
+    assert replica.get_resource("e1") is None
+
+
+def test_add_documents_skips_existing_resources(replica: StateReplica):
+    replica.apply_transaction(_txn("A", ADD_RESOURCE, ["r1", "tài nguyên"], "Đã thêm tài nguyên r1"))
+    replica.apply_transaction(_txn("A", ADD_ENCRYPTED_RESOURCE, ["e1", "bí mật", "a2V5"], "Đã thêm và mã hóa e1"))
+    documents = [
+        (doc_id, f"Tiêu đề {doc_id}", "Tác giả", 2021, "tin-hoc", f"nội dung {doc_id}")
+        for doc_id in ("r1", "e1", "d1", "d1")
+    ]
+    replica.apply_transaction(
+        _txn("A", ADD_DOCUMENTS_METHOD, [documents], "Đã thêm 1 tài liệu, bỏ qua 3 tài liệu đã tồn tại")
+    )
+    # Như trên chuỗi: chỉ d1 được thêm (một lần), r1 và e1 giữ nguyên
+    assert [row[0] for row in replica.search_documents(field="tin-hoc")] == ["d1"]
+    assert replica.get_resource("r1") == "tài nguyên"
+    assert replica.get_resource("e1") is None
+    assert replica.get_resource("d1") == "nội dung d1"
+
+
+def test_sync_advances_to_indexer_round_across_pages(tmp_path: Path):
+    pages = [
+        [_txn("A", BUY_TOKENS, [10], "Đã mua", round_=5)],
+        [_txn("A", BUY_TOKENS, [20], "Đã mua", round_=7)],
+    ]
+    indexer = FakeIndexer(pages, current_round=9)
+    replica = StateReplica(tmp_path / "replica.db", indexer, APP_ID)
+
+    assert replica.sync_once() == 2
+    assert replica.get_token_balance("A") == 30
+    assert replica.last_round == 9
+    assert [query["min_round"] for query in indexer.queries] == [1, 1]
+    assert replica.lag() == 0
+
+
+def test_idle_sync_keeps_lag_at_zero(tmp_path: Path):
+    indexer = FakeIndexer([], current_round=50)
+    replica = StateReplica(tmp_path / "replica.db", indexer, APP_ID)
+    assert replica.sync_once() == 0
+    indexer.current_round = 80
+    assert replica.lag() == 30
+    replica.sync_once()
+    assert replica.last_round == 80
+    assert replica.lag() == 0
@@ -0,0 +1,88 @@
+from algosdk import account
+
+from smart_contracts._helpers.session import SessionVerifier, issue_session_token, issuer_public_key
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_valid_token_is_verified_and_cached():
+    issuer_key, _ = account.generate_account()
+    _, user_address = account.generate_account()
+    clock = FakeClock(1_000)
+    verifier = SessionVerifier(issuer_public_key(issuer_key), clock=clock)
+
+    token = issue_session_token(issuer_key, user_address, now=1_000, timeout=60)
+    assert verifier.verify(token) == user_address
+    assert token in verifier._cache, "Token hợp lệ phải được lưu vào bộ nhớ đệm"
+    assert verifier.verify(token) == user_address
+
+
+def test_expired_token_is_rejected_and_evicted():
+    issuer_key, _ = account.generate_account()
+    clock = FakeClock(1_000)
+    verifier = SessionVerifier(issuer_public_key(issuer_key), clock=clock)
+
+    token = issue_session_token(issuer_key, "USER", now=1_000, timeout=60)
+    assert verifier.verify(token) == "USER"
+    clock.now = 1_060
+    assert verifier.verify(token) is None
+    assert token not in verifier._cache
+
+
+def test_token_from_other_issuer_or_tampered_is_rejected():
+    issuer_key, _ = account.generate_account()
+    other_key, _ = account.generate_account()
+    verifier = SessionVerifier(issuer_public_key(issuer_key), clock=FakeClock(1_000))
+
+    assert verifier.verify(issue_session_token(other_key, "USER", now=1_000)) is None
+    _, signature = issue_session_token(issuer_key, "USER", now=1_000).split(".")
+    forged = issue_session_token(issuer_key, "ADMIN", now=1_000).split(".")[0]
+    assert verifier.verify(f"{forged}.{signature}") is None
+    assert verifier.verify("không-phải-token") is None
+
+
+def test_cache_is_bounded():
+    issuer_key, _ = account.generate_account()
+    verifier = SessionVerifier(issuer_public_key(issuer_key), max_size=2, clock=FakeClock(1_000))
+    tokens = [issue_session_token(issuer_key, f"USER{i}", now=1_000) for i in range(3)]
+    for token in tokens:
+        verifier.verify(token)
+    assert list(verifier._cache) == tokens[1:]
+
+
+def test_malformed_tokens_are_rejected():
+    issuer_key, _ = account.generate_account()
+    verifier = SessionVerifier(issuer_public_key(issuer_key), clock=FakeClock(1_000))
+    payload = issue_session_token(issuer_key, "USER", now=1_000).split(".")[0]
+
+    # Chữ ký sai độ dài, base64 hỏng, thiếu chữ ký và hạn không phải số
+    assert verifier.verify(f"{payload}.c2hvcnQ=") is None
+    assert verifier.verify(f"{payload}.%%%") is None
+    assert verifier.verify(payload) is None
+    assert verifier.verify("VVNFUnxhYmM=.c2hvcnQ=") is None
+    assert not verifier._cache
+
+
+def test_revoked_token_stays_rejected_until_expiry():
+    issuer_key, _ = account.generate_account()
+    clock = FakeClock(1_000)
+    verifier = SessionVerifier(issuer_public_key(issuer_key), clock=clock)
+    token = issue_session_token(issuer_key, "USER", now=1_000, timeout=60)
+    other = issue_session_token(issuer_key, "OTHER", now=1_000, timeout=60)
+
+    assert verifier.verify(token) == "USER"
+    verifier.revoke(token)
+    # Chữ ký vẫn hợp lệ nhưng token không được chấp nhận lại
+    assert verifier.verify(token) is None
+    assert verifier.verify(other) == "OTHER"
+
+    # Danh sách chặn không giữ token đã hết hạn
+    clock.now = 1_060
+    verifier.revoke(other)
+    assert not verifier._revoked
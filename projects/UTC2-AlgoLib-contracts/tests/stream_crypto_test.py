@@ -0,0 +1,113 @@
+import io
+
+import pytest
+from Crypto.Random import get_random_bytes
+
+from smart_contracts._helpers.stream_crypto import (
+    _HEADER,
+    HEADER_SIZE,
+    MAGIC,
+    MAX_CHUNK_SIZE,
+    TAG_SIZE,
+    VERSION,
+    decrypt_stream,
+    encrypt_stream,
+)
+
+CHUNK_SIZE = 1024
+
+
+def _encrypt(key: bytes, data: bytes) -> bytes:
+    sink = io.BytesIO()
+    encrypt_stream(key, io.BytesIO(data), sink, chunk_size=CHUNK_SIZE, max_workers=2)
+    return sink.getvalue()
+
+
+def _decrypt(key: bytes, data: bytes) -> bytes:
+    sink = io.BytesIO()
+    decrypt_stream(key, io.BytesIO(data), sink, max_workers=2)
+    return sink.getvalue()
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK_SIZE, 10 * CHUNK_SIZE + 7])
+def test_roundtrip(size: int):
+    key = get_random_bytes(32)
+    data = get_random_bytes(size)
+    assert _decrypt(key, _encrypt(key, data)) == data
+
+
+def test_iterator_source_is_rechunked():
+    key = get_random_bytes(32)
+    pieces = [b"a" * 300, b"b" * 2000, b"c" * 5]
+    sink = io.BytesIO()
+    encrypt_stream(key, iter(pieces), sink, chunk_size=CHUNK_SIZE)
+    assert _decrypt(key, sink.getvalue()) == b"".join(pieces)
+
+
+class _ShortReads(io.RawIOBase):
+    """Luồng thô chỉ trả về tối đa 100 byte mỗi lần đọc, như socket hoặc thân phản hồi HTTP"""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        piece = self._data.read(min(len(buffer), 100))
+        buffer[: len(piece)] = piece
+        return len(piece)
+
+
+def test_short_read_sources_are_rechunked():
+    key = get_random_bytes(32)
+    data = get_random_bytes(3 * CHUNK_SIZE + 7)
+    encrypted = io.BytesIO()
+    encrypt_stream(key, _ShortReads(data), encrypted, chunk_size=CHUNK_SIZE)  # type: ignore[arg-type]
+    # Mỗi khối đủ CHUNK_SIZE byte, không bị chia theo kích thước lần đọc
+    assert len(encrypted.getvalue()) == HEADER_SIZE + len(data) + 4 * TAG_SIZE
+    decrypted = io.BytesIO()
+    decrypt_stream(key, _ShortReads(encrypted.getvalue()), decrypted)  # type: ignore[arg-type]
+    assert decrypted.getvalue() == data
+
+
+def test_reordered_chunks_are_rejected():
+    key = get_random_bytes(32)
+    encrypted = _encrypt(key, get_random_bytes(3 * CHUNK_SIZE))
+    body = encrypted[HEADER_SIZE:]
+    size = CHUNK_SIZE + TAG_SIZE
+    chunks = [body[i : i + size] for i in range(0, len(body), size)]
+    chunks[0], chunks[1] = chunks[1], chunks[0]
+    with pytest.raises(ValueError):
+        _decrypt(key, encrypted[:HEADER_SIZE] + b"".join(chunks))
+
+
+def test_truncated_stream_is_rejected():
+    key = get_random_bytes(32)
+    encrypted = _encrypt(key, get_random_bytes(3 * CHUNK_SIZE))
+    with pytest.raises(ValueError):
+        _decrypt(key, encrypted[: HEADER_SIZE + 2 * (CHUNK_SIZE + TAG_SIZE)])
+    with pytest.raises(ValueError):
+        _decrypt(key, encrypted[:HEADER_SIZE])
+
+
+def test_wrong_key_is_rejected():
+    encrypted = _encrypt(get_random_bytes(32), b"du lieu bi mat")
+    with pytest.raises(ValueError):
+        _decrypt(get_random_bytes(32), encrypted)
+
+
+@pytest.mark.parametrize("chunk_size", [0, MAX_CHUNK_SIZE + 1])
+def test_invalid_chunk_size_is_rejected(chunk_size: int):
+    with pytest.raises(ValueError):
+        encrypt_stream(get_random_bytes(32), io.BytesIO(b"x"), io.BytesIO(), chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [0, 2**32 - 1])
+def test_header_with_invalid_chunk_size_is_rejected(chunk_size: int):
+    key = get_random_bytes(32)
+    encrypted = _encrypt(key, b"du lieu")
+    _, _, _, nonce_prefix = _HEADER.unpack(encrypted[:HEADER_SIZE])
+    forged = _HEADER.pack(MAGIC, VERSION, chunk_size, nonce_prefix) + encrypted[HEADER_SIZE:]
+    with pytest.raises(ValueError, match="Kích thước khối"):
+        _decrypt(key, forged)